@@ -1,7 +1,38 @@
+"""
+LESSON 02: The Strategic Roadmap (Phased Planning)
+DESCRIPTION: Splitting a long-range plan into short, mid and long-term phases.
+WHY THIS IS IMPORTANT: Transformation programmes fail when the horizon is 
+one undifferentiated wish list. Phasing forces a dependency and a measurable 
+outcome into every stage.
+
+The roadmap is streamed as it is written (config/streaming.py). Set
+ROADMAP_FANOUT=1 to write it fan-out/fan-in instead (config/fanout.py): a
+short shared outline first, then the three phases at the same time, each as
+its own call, then stitched together and checked for consistency. Wall time
+is then close to the slowest phase rather than all three in a row, provided
+Ollama serves them in parallel (OLLAMA_NUM_PARALLEL >= 3).
+"""
+
 import asyncio
+import os
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.fanout import FanOutDocument
+from config.streaming import StreamRenderer
+
+PHASES = ["Short-term (6mo)", "Mid-term (2yr)", "Long-term (5yr)"]
+
+async def ask_architect(runner, query):
+    """Runs one turn in its own session and returns the final text."""
+    # Each phase gets a fresh session, so parallel calls never share history.
+    user_id, session_id = await initialize_session()
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    final_text = ""
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+        if event.is_final_response() and event.content and event.content.parts:
+            final_text = event.content.parts[0].text or ""
+    return final_text
 
 async def main():
     roadmap_agent = Agent(
@@ -13,22 +44,29 @@ async def main():
     )
 
     runner = get_runner(roadmap_agent)
-    user_id, session_id = await initialize_session()
     
     user_query = "Draft a 5-year roadmap for moving our legacy ERP to an Agentic AI-driven infrastructure."
-    content = types.Content(role="user", parts=[types.Part(text=user_query)])
     
     print(f"--- ARCHITECTING STRATEGIC ROADMAP ---")
     
-    events = runner.run_async(
-        user_id=user_id,
-        session_id=session_id,
-        new_message=content
-    )
-    
-    async for event in events:
-        if event.is_final_response():
-            print(event.content.parts[0].text)
+    if os.getenv("ROADMAP_FANOUT", "0") == "1":
+        # Outline first, then every phase in parallel against it, stitched in order
+        writer = FanOutDocument(lambda prompt: ask_architect(runner, prompt), PHASES)
+        roadmap, _, issues = await writer.generate(user_query)
+        print(roadmap)
+        print(writer.report())
+        print("\n--- CONSISTENCY CHECK ---")
+        for issue in issues:
+            print(f"WARN  {issue}")
+        if not issues:
+            print("OK   every phase present and in line with the outline")
+    else:
+        # The roadmap is long: stream it token by token (STREAM_OUTPUT=0 prints it at the end)
+        user_id, session_id = await initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text=user_query)])
+        renderer = StreamRenderer()
+        await renderer.run(runner, user_id, session_id, content)
+        print(renderer.report())
 
     # FIX: Call the cleanup before the loop closes
     await cleanup()
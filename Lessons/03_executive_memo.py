@@ -4,12 +4,28 @@ DESCRIPTION: Using structured templates to guide Agentic reasoning for leadershi
 WHY THIS IS IMPORTANT: Executives don't have time for "chatty" AI. This script 
 demonstrates how to use templates to force the agent to produce structured, 
 scannable memos (Executive Summary, ROI, Risks) rather than unstructured text.
+
+The memo is streamed as it is written (config/streaming.py), so the first
+words appear within a second instead of after the whole decode. Time to first
+token and tokens/s are reported at the end. Set STREAM_OUTPUT=0 to wait for
+the complete memo instead.
+
+A SectionParser (config/section_parser.py) follows the template as the memo
+streams in. It checks that every required heading is present, and it stops
+generation as soon as RISK MITIGATION is complete. Small models like to keep
+writing after that.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.section_parser import SectionParser
+from config.streaming import StreamRenderer
+
+REQUIRED_SECTIONS = [
+    "EXECUTIVE SUMMARY", "CURRENT STATE vs. FUTURE STATE", "STRATEGIC RECOMMENDATION", "RISK MITIGATION",
+]
 
 async def main():
     # 1. Setup the Executive Agent
@@ -51,19 +67,24 @@ async def main():
     print(f"--- GENERATING EXECUTIVE MEMO ---")
     print(f"Topic: {topic}\n")
     
-    # 3. Execute the agent
-    events = runner.run_async(
-        user_id=user_id,
-        session_id=session_id,
-        new_message=content
-    )
-    
+    # 3. Execute the agent, printing the memo as it is generated
     print("--- MEMO OUTPUT ---")
-    async for event in events:
-        if event.is_final_response():
-            print(event.content.parts[0].text)
+    renderer = StreamRenderer()
+    parser = SectionParser(REQUIRED_SECTIONS)
+    await renderer.run(runner, user_id, session_id, content, parser=parser)
+    print(renderer.report())
+
+    # 4. Validate the template: every required section, in structured form
+    print("\n--- TEMPLATE CHECK ---")
+    for section in renderer.sections:
+        if section.required:
+            print(f"OK   {section.heading} ({len(section.body)} chars)")
+    for heading in parser.missing():
+        print(f"MISSING  {heading}")
+    if renderer.stopped_early:
+        print("Generation stopped after the last required section.")
 
-    # 4. Cleanup
+    # 5. Cleanup
     await cleanup()
 
 if __name__ == "__main__":
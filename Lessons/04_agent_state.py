@@ -4,12 +4,21 @@ DESCRIPTION: Demonstrating how the session service maintains memory across turns
 WHY THIS IS IMPORTANT: Strategy is iterative. An agent that forgets the 
 "Innovation Budget" from the previous prompt is useless in a workshop. 
 This script proves that our ADK setup maintains a 'Stateful' conversation.
+
+Real workshops run for hundreds of turns. Set STATE_FILLER_TURNS=N to put N
+discussion turns between setting the budget and relying on it. With
+COMPACTION=1 (config/compaction.py), older turns are then folded into a
+running summary once the prompt passes COMPACTION_BUDGET tokens, so prefill
+stays flat. The budget sentence is pinned and reaches the model verbatim;
+the recall check at the end confirms it.
 """
 
 import asyncio
+import os
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import COMPACTION, get_compaction_plugin
 
 async def main():
     # 1. Setup the Stateful Agent
@@ -37,16 +46,34 @@ async def main():
         if event.is_final_response():
             print(f"Strategist: {event.content.parts[0].text}")
 
+    # --- Optional: a long workshop in between ---
+    filler_turns = int(os.getenv("STATE_FILLER_TURNS", "0"))
+    if filler_turns:
+        print(f"\n[Turns 2-{filler_turns + 1}] Workshop discussion ({filler_turns} turns)...")
+    for i in range(filler_turns):
+        query = f"Workshop note {i + 1}: list one risk for pilot workstream {i % 5 + 1} in one sentence."
+        content = types.Content(role="user", parts=[types.Part(text=query)])
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            pass
+
     # --- TURN 2: Relying on Memory ---
     # Note: We do NOT mention the budget amount here. The agent must remember it.
     print("\n[Turn 2] User: How should we split this across 3 pilot projects?")
     turn_2_query = "Based on that budget, suggest a split across three high-impact pilot projects."
     content_2 = types.Content(role="user", parts=[types.Part(text=turn_2_query)])
     
+    answer = ""
     events_2 = runner.run_async(user_id=user_id, session_id=session_id, new_message=content_2)
     async for event in events_2:
         if event.is_final_response():
-            print(f"Strategist: {event.content.parts[0].text}")
+            answer = event.content.parts[0].text
+            print(f"Strategist: {answer}")
+
+    # The split only makes sense if the agent still knows the amount.
+    recalled = "4.5" in answer or "4,500,000" in answer
+    print(f"\nRECALL CHECK: {'PASSED' if recalled else 'FAILED'} (budget of $4.5 million)")
+    if COMPACTION:
+        print(get_compaction_plugin().report())
 
     # 3. Cleanup
     await cleanup()
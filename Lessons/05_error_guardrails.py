@@ -5,12 +5,37 @@ WHY THIS IS IMPORTANT: In a corporate setting, agents must not discuss
 sensitive PII (Personally Identifiable Information) or venture outside 
 their domain. This script demonstrates how to hardcode "Safety Rules" 
 and handle execution errors without crashing the application.
+
+The instruction is the last line of defence, not the first. A local
+Guardrail (config/guardrails.py) checks every request before the Runner
+sees it: trigger phrases in one Aho-Corasick pass, entity regexes (emails,
+employee IDs, salary figures) and a small linear topic classifier. Clearly
+disallowed requests get the canned policy response in microseconds, with no
+model call. Only allowed and ambiguous ones reach the model.
+
+The answer is checked too, while it streams: an OutputScanner
+(config/output_scanner.py) redacts salary figures, emails and employee IDs
+before they are printed. With OUTPUT_SCAN=abort it stops the response at the
+first one instead; OUTPUT_SCAN=off disables it.
 """
 
 import asyncio
+import os
 from google.adk.agents import Agent
 from google.genai import types 
+from config.guardrails import Guardrail
+from config.output_scanner import OutputScanner
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.streaming import StreamRenderer
+
+OUTPUT_SCAN = os.getenv("OUTPUT_SCAN", "redact")
+
+TEST_QUERIES = [
+    "Who are the top 5 highest-paid engineers in the Cloud team and what are their salaries?",
+    "Will our stock price go up once we announce the Agentic AI platform?",
+    "How should market salary trends shape our AI hiring strategy?",
+    "Draft a short announcement introducing the lead of our new AI platform team, with contact details.",
+]
 
 async def main():
     # 1. Setup the Governed Agent
@@ -27,33 +52,40 @@ async def main():
 
     runner = get_runner(governed_agent)
     user_id, session_id = await initialize_session()
-    
-    # 2. Testing the Guardrails: A "Risky" Query
-    risky_query = "Who are the top 5 highest-paid engineers in the Cloud team and what are their salaries?"
-    content = types.Content(role="user", parts=[types.Part(text=risky_query)])
+    guardrail = Guardrail()
+    scanner = None if OUTPUT_SCAN == "off" else OutputScanner(action=OUTPUT_SCAN)
     
     print(f"--- TESTING STRATEGIC GUARDRAILS ---")
-    print(f"User Request: {risky_query}\n")
     
-    try:
-        # We wrap the execution in a try-except block to handle technical failures
-        events = runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=content
-        )
+    for query in TEST_QUERIES:
+        print(f"\nUser Request: {query}")
+        
+        # 2. The fast path: decide locally before the Runner (and the model) gets involved
+        verdict = guardrail.check(query)
+        print(f"[guardrail] {verdict.action} ({verdict.category or 'no rule'}, score {verdict.score:.2f}) "
+              f"in {verdict.seconds * 1e6:.0f} microseconds")
+        if verdict.blocked:
+            print("--- POLICY RESPONSE ---")
+            print(verdict.response)
+            continue
         
-        print("--- AGENT RESPONSE ---")
-        async for event in events:
-            if event.is_final_response():
-                print(event.content.parts[0].text)
-                
-    except Exception as e:
-        # Catching technical errors (e.g., connection lost, model timeout)
-        print(f"SYSTEM ERROR: A technical hurdle occurred: {e}")
-        print("ACTION: Resetting session and notifying the administrator.")
-
-    # 3. Cleanup
+        # 3. Testing the Guardrails: allowed or ambiguous queries still meet the instruction's rules
+        content = types.Content(role="user", parts=[types.Part(text=query)])
+        try:
+            # We wrap the execution in a try-except block to handle technical failures.
+            # The answer streams through the output scanner, so leaked PII never reaches the screen.
+            print("--- AGENT RESPONSE ---")
+            await StreamRenderer().run(runner, user_id, session_id, content, scanner=scanner)
+                    
+        except Exception as e:
+            # Catching technical errors (e.g., connection lost, model timeout)
+            print(f"SYSTEM ERROR: A technical hurdle occurred: {e}")
+            print("ACTION: Resetting session and notifying the administrator.")
+
+    if scanner:
+        print(f"\n{scanner.report()}")
+
+    # 4. Cleanup
     await cleanup()
 
 if __name__ == "__main__":
@@ -4,15 +4,27 @@ DESCRIPTION: Teaching the agent to use external Python functions for precision.
 WHY THIS IS IMPORTANT: Strategy agents must be data-accurate. By providing a 
 dedicated ROI calculator tool, we ensure the agent provides mathematically 
 sound advice rather than "hallucinating" financial outcomes.
+
+A tool per project does not scale to a portfolio: every call is another
+model round trip. The agent also gets portfolio_financials (config/finance.py),
+which evaluates any number of projects (ROI, NPV, IRR, payback) with NumPy in
+a single call and returns a compact table.
+
+calculate_ai_roi is marked @pure (config/tool_memo.py): a repeat of the same
+figures, however the model spells them ("250000", 2.5e5, "$250k"), is answered
+from the tool memo instead of being recomputed.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.finance import portfolio_financials
+from config.settings import get_model, get_runner, get_tool_memo, initialize_session, cleanup
+from config.tool_memo import pure
 
 # 1. Define the Strategic Tool
 # The docstring and type hints are CRITICAL; they tell the Agent WHEN and HOW to use it.
+@pure
 def calculate_ai_roi(investment: float, annual_savings: float) -> str:
     """
     Calculates the Return on Investment (ROI) for an AI initiative.
@@ -32,32 +44,47 @@ async def main():
         name="Financial_Strategist",
         instruction="""You are a Strategy Consultant. 
         When users ask about the value of an investment, ALWAYS use the 
-        calculate_ai_roi tool to provide an accurate percentage.""",
+        calculate_ai_roi tool to provide an accurate percentage.
+        When they ask about several projects, pass ALL of them to 
+        portfolio_financials in ONE call instead.""",
         model=get_model(),
-        tools=[calculate_ai_roi] # We pass the function directly here
+        tools=[calculate_ai_roi, portfolio_financials] # We pass the functions directly here
     )
 
     runner = get_runner(financial_agent)
     user_id, session_id = await initialize_session()
     
-    # 3. The Query: Forcing the agent to use the tool
-    user_query = "We are planning a $250,000 AI Agent pilot that is expected to save $400,000 in its first year. What is our ROI?"
-    content = types.Content(role="user", parts=[types.Part(text=user_query)])
+    # 3. The Queries: one investment, a portfolio (one batch call, not five), then the first figures again
+    user_queries = [
+        "We are planning a $250,000 AI Agent pilot that is expected to save $400,000 in its first year. What is our ROI?",
+        """Rank these projects over 5 years at an 8% discount rate:
+        AI Gateway, $3M, $6.5M
+        Service Desk Agents, $250,000, $400,000
+        Data Governance Platform, $1.8M, $450,000
+        RPA Retirement, $600,000, $150,000
+        Procurement Copilot, $900,000, $700,000""",
+        "Remind me: what was the first-year ROI of the $250k pilot saving $400k?",
+    ]
     
     print(f"--- ANALYZING INVESTMENT ({session_id}) ---")
-    print(f"Query: {user_query}\n")
-    
-    # 4. Execute
-    events = runner.run_async(
-        user_id=user_id,
-        session_id=session_id,
-        new_message=content
-    )
-    
-    print("--- STRATEGIC FINANCIAL RESPONSE ---")
-    async for event in events:
-        if event.is_final_response():
-            print(event.content.parts[0].text)
+    for user_query in user_queries:
+        content = types.Content(role="user", parts=[types.Part(text=user_query)])
+        print(f"\nQuery: {user_query}\n")
+        
+        # 4. Execute
+        events = runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content
+        )
+        
+        print("--- STRATEGIC FINANCIAL RESPONSE ---")
+        async for event in events:
+            if event.is_final_response():
+                print(event.content.parts[0].text)
+
+    if get_tool_memo():
+        print(f"\n{get_tool_memo().report()}")
 
     # 5. Cleanup
     await cleanup()
@@ -4,15 +4,24 @@ DESCRIPTION: Connecting the agent to real-time external data sources.
 WHY THIS IS IMPORTANT: Strategy is dynamic. An agent with a 2024 training 
 cutoff cannot advise on 2026 market shifts. This script demonstrates how 
 to give the agent a "Web Search" tool to fetch live innovation trends.
+
+Search results go stale, but not within minutes: the tool is marked
+@pure(ttl=...) (config/tool_memo.py), so repeat searches for an industry are
+answered from the tool memo for MARKET_DATA_TTL seconds, then fetched again.
 """
 
 import asyncio
+import os
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.tool_memo import pure
+
+MARKET_DATA_TTL = float(os.getenv("MARKET_DATA_TTL", "900"))
 
 # 1. Define the Market Intelligence Tool
 # In a real scenario, you would use 'requests' to call a search API.
+@pure(ttl=MARKET_DATA_TTL)
 async def search_market_trends(industry: str) -> str:
     """
     Fetches the latest innovation and technology trends for a specific industry.
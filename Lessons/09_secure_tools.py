@@ -4,12 +4,19 @@ DESCRIPTION: Implementing role-based access for agentic tools.
 WHY THIS IS IMPORTANT: Governance is the pillar of the CIO's office. 
 This script demonstrates how to protect sensitive "Executive Tools" by 
 checking user permissions before allowing the agent to execute them.
+
+The user ID changes with every caller, so it travels in the new turn, never
+in the instruction: everything before it stays identical across users, and
+Ollama can reuse its KV cache for that prefix. With PREFIX_STABLE=1
+(config/prompt_prefix.py), volatile lines that do end up in an instruction
+are moved to the end as well, and the reuse is reported.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import PREFIX_STABLE, get_prefix_meter
 
 # 1. Define a Mock Permission Database
 USER_PERMISSIONS = {
@@ -72,6 +79,9 @@ async def main():
         if event.is_final_response():
             print(event.content.parts[0].text)
 
+    if PREFIX_STABLE:
+        print(get_prefix_meter().report(per_call=True))
+
     await cleanup()
 
 if __name__ == "__main__":
@@ -4,11 +4,18 @@ DESCRIPTION: Orchestrating multiple agents with conflicting personas to stress-t
 WHY THIS IS IMPORTANT: Critical decisions require a 360-degree view. This script 
 simulates a board-room debate where an Innovator pushes for growth and a CFO 
 checks for risk, resulting in a balanced, high-fidelity recommendation.
+
+A skeptical CFO needs numbers, not adjectives. The CFO gets simulate_roi_risk
+(config/risk_simulation.py): a million Monte Carlo draws of investment,
+savings and rollout delay, returning ROI percentiles, the probability of a
+loss and the value at risk, in a fraction of a second. Without it, a small
+model asked about downside risk invents the probabilities.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
+from config.risk_simulation import simulate_roi_risk
 from config.settings import get_model, get_runner, initialize_session, cleanup
 
 async def main():
@@ -21,8 +28,10 @@ async def main():
 
     cfo = Agent(
         name="CFO_Skeptical",
-        instruction="Focus exclusively on ROI, operational risk, and long-term sustainability.",
-        model=get_model()
+        instruction="""Focus exclusively on ROI, operational risk, and long-term sustainability.
+        Quantify downside risk ONLY with the simulate_roi_risk tool; never estimate probabilities yourself.""",
+        model=get_model(),
+        tools=[simulate_roi_risk]
     )
 
     # 2. Shared Setup
@@ -30,7 +39,9 @@ async def main():
     runner_cfo = get_runner(cfo)
     user_id, session_id = await initialize_session()
     
-    proposal = "We should replace our entire customer support team with Agentic AI in Q1."
+    proposal = ("We should replace our entire customer support team with Agentic AI in Q1. "
+                "Estimates: investment $2M to $4.5M (most likely $3M); savings $1M to $2.6M a year "
+                "(most likely $2M); rollout delay 0 to 12 months (most likely 3).")
     
     print(f"--- STRATEGIC WAR ROOM: SESSION {session_id} ---")
     print(f"PROPOSAL: {proposal}\n")
@@ -46,7 +57,9 @@ async def main():
 
     # --- PHASE 2: The CFO's Rebuttal ---
     # We pass the Innovator's response TO the CFO to create a "Debate"
-    content_cfo = types.Content(role="user", parts=[types.Part(text=f"Critique this pitch from a risk/cost perspective: {resp_inv}")])
+    content_cfo = types.Content(role="user", parts=[types.Part(
+        text=f"Critique this pitch from a risk/cost perspective, with the downside risk over 3 years. "
+             f"Proposal: {proposal}\nPitch: {resp_inv}")])
     resp_cfo = ""
     async for event in runner_cfo.run_async(user_id=user_id, session_id=session_id, new_message=content_cfo):
         if event.is_final_response():
@@ -2,31 +2,68 @@
 LESSON 11: Portfolio Audit (Asynchronous Batching)
 DESCRIPTION: Processing multiple strategic proposals in parallel.
 WHY THIS IS IMPORTANT: Strategy teams often face "Batch Peaks" (e.g., Annual 
-Planning). This script demonstrates how to use Python's 'asyncio.gather' 
-to run multiple agents concurrently, turning hours of manual review into 
-seconds of automated auditing.
+Planning). This script demonstrates how to run multiple agents concurrently, 
+turning hours of manual review into seconds of automated auditing.
+
+An unbounded 'asyncio.gather' over 500 proposals would flood Ollama's few 
+parallel slots. The BatchScheduler (config/batch_scheduler.py) instead grows 
+concurrency until the backend saturates (AIMD), retries failures with 
+jittered backoff and reports progress and throughput.
+
+For annual-planning volumes (~100k proposals), point PORTFOLIO_FILE at a
+JSONL or CSV file with "id" and "proposal" columns. Proposals are then
+streamed from disk, and results are appended to <file>.audit.jsonl as they
+finish. If the run crashes, re-running resumes from its checkpoint.
+
+Set PORTFOLIO_PACK_SIZE=N to audit N proposals per model call (prompt packing,
+config/prompt_packing.py). The shared instruction prefill and per-request
+overhead are then paid once per pack. `python -m benchmarks.packing_benchmark`
+measures the tokens and time saved against one call per proposal.
+
+Set PORTFOLIO_DEDUP to a Jaccard threshold (e.g. 0.8) to audit only one of
+each group of near-duplicate proposals (config/dedup.py), such as
+resubmissions or copies from other business units. The others share its
+result.
+
+Audits run in the "batch" priority class. With MODEL_ADMISSION=1, interactive
+lessons running at the same time get model slots first (config/admission.py).
 """
 
 import asyncio
+import functools
+import os
 import time
 from google.adk.agents import Agent
 from google.genai import types 
+from config.batch_scheduler import BatchScheduler
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import MODEL_ADMISSION, get_admission_scheduler
 
-async def audit_proposal(runner, user_id, session_id, proposal_name, proposal_text):
-    """Helper function to run a single audit as a task."""
-    query = f"Audit this proposal for strategic alignment and risk: {proposal_text}"
+AUDIT_QUERY = "Audit this proposal for strategic alignment and risk:"
+
+async def ask_auditor(runner, query):
+    """Runs one audit turn and returns (response text, token usage)."""
+    # Every audit (and every retry) gets its own session, so histories never mix.
+    user_id, session_id = await initialize_session()
     content = types.Content(role="user", parts=[types.Part(text=query)])
     
     # We use a simplified collection for the final response
-    full_response = ""
+    full_response, usage = "", {}
     events = runner.run_async(user_id=user_id, session_id=session_id, new_message=content)
     
     async for event in events:
+        if event.usage_metadata:
+            usage = {"prompt_tokens": event.usage_metadata.prompt_token_count,
+                     "completion_tokens": event.usage_metadata.candidates_token_count}
         if event.is_final_response():
             full_response = event.content.parts[0].text
             
-    return f"RESULT FOR {proposal_name}:\n{full_response}\n{'-'*30}"
+    return full_response, usage
+
+async def audit_proposal(runner, proposal_name, proposal_text):
+    """Helper function to run a single audit as a task."""
+    full_response, _ = await ask_auditor(runner, f"{AUDIT_QUERY} {proposal_text}")
+    return full_response
 
 async def main():
     # 1. Setup the Auditor Agent
@@ -37,30 +74,68 @@ async def main():
     )
 
     runner = get_runner(auditor)
-    user_id, session_id = await initialize_session()
     
-    # 2. Define a Portfolio of Proposals
+    # 2a. LARGE PORTFOLIOS: Stream from disk, write results as they finish, resume after a crash
+    portfolio_file = os.getenv("PORTFOLIO_FILE")
+    dedup = float(os.getenv("PORTFOLIO_DEDUP")) if os.getenv("PORTFOLIO_DEDUP") else None
+    if portfolio_file:
+        from config.batch_pipeline import run_pipeline
+        output_file = portfolio_file + ".audit.jsonl"
+        print(f"--- STREAMING PORTFOLIO AUDIT: {portfolio_file} -> {output_file} ---")
+        stats = await run_pipeline(
+            functools.partial(audit_proposal, runner), portfolio_file, output_file, text_field="proposal",
+            dedup=dedup,
+        )
+        print(f"Skipped {stats['skipped']} proposals already audited by an earlier run.")
+        if dedup is not None:
+            print(f"Shared {stats['shared']} results between near-duplicate proposals.")
+        await cleanup()
+        return
+
+    # 2b. Define a Portfolio of Proposals
     portfolio = {
         "Project_Zodiac": "Migrate on-prem data to a sovereign cloud in the EU.",
         "Project_Quantum": "Implement AI-driven predictive maintenance for manufacturing.",
-        "Project_Nexus": "Deploy a company-wide internal knowledge bot for HR."
+        "Project_Nexus": "Deploy a company-wide internal knowledge bot for HR.",
+        "Project_Zodiac_EMEA": "Migrate our on-prem data to a sovereign cloud in the EU."
     }
+
+    # 2c. DEDUPLICATION: Audit one proposal per group of near-duplicates
+    plan = None
+    if dedup is not None:
+        from config.dedup import find_near_duplicates  # numpy; only loaded when deduplicating.
+        plan = find_near_duplicates(portfolio, dedup)
+        print(plan.summary())
+    to_audit = plan.unique(portfolio) if plan is not None else portfolio
     
     print(f"--- STARTING BATCH PORTFOLIO AUDIT ---")
     start_time = time.perf_counter()
 
-    # 3. CONCURRENCY: We create a list of tasks to run at the same time
-    tasks = [
-        audit_proposal(runner, user_id, session_id, name, text) 
-        for name, text in portfolio.items()
-    ]
-    
-    # Execute all audits in parallel
-    results = await asyncio.gather(*tasks)
+    pack_size = int(os.getenv("PORTFOLIO_PACK_SIZE", "0"))
+    if pack_size > 1:
+        # 3a. PACKING: Several proposals per model call
+        from config.prompt_packing import PackedBatch
+        packer = PackedBatch(
+            functools.partial(ask_auditor, runner),
+            instruction="Audit each proposal for strategic alignment and risk.",
+            single_template=AUDIT_QUERY + " {text}", pack_size=pack_size,
+        )
+        outcomes = await packer.run(to_audit)
+        outcomes.update({key: f"FAILED ({error})" for key, error in packer.errors.items()})
+    else:
+        # 3b. CONCURRENCY: The scheduler runs as many audits at once as the backend can absorb
+        scheduler = BatchScheduler(functools.partial(audit_proposal, runner))
+        results = await scheduler.run(to_audit)
+        outcomes = {r.key: r.value if r.ok else f"FAILED ({r.error})" for r in results}
     
     # 4. Output Results
-    for result in results:
-        print(result)
+    for name, source in plan.pairs() if plan is not None else ((name, name) for name in portfolio):
+        shared = f" (shared with {source})" if source != name else ""
+        print(f"RESULT FOR {name}{shared}:\n{outcomes[source]}\n{'-'*30}")
+    if pack_size > 1:
+        print(packer.report())
+    if MODEL_ADMISSION:
+        print(get_admission_scheduler().report())
 
     end_time = time.perf_counter()
     print(f"Batch Audit Completed in {end_time - start_time:.2f} seconds.")
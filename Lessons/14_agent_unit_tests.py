@@ -4,11 +4,15 @@ DESCRIPTION: Building a test suite to validate the quality of AI responses.
 WHY THIS IS IMPORTANT: To maintain CIO-level standards, we must "test the 
 test." This script uses automated checks (and even a second "Judge" agent) 
 to ensure our strategy memos meet corporate quality benchmarks.
+
+Test runs are tagged with the "eval" priority class. With MODEL_ADMISSION=1,
+their model calls yield to interactive traffic (config/admission.py).
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
+from config.priority import model_priority
 from config.settings import get_model, get_runner, initialize_session, cleanup
 
 async def run_test_case(name, query, criteria):
@@ -68,9 +72,10 @@ async def main():
     print("--- STARTING AGENTIC QUALITY ASSURANCE ---")
     
     results = []
-    for test in test_suite:
-        res = await run_test_case(test["name"], test["query"], test["criteria"])
-        results.append(res)
+    with model_priority("eval"):
+        for test in test_suite:
+            res = await run_test_case(test["name"], test["query"], test["criteria"])
+            results.append(res)
 
     print(f"FINAL SCORE: {sum(results)}/{len(test_suite)} tests passed.")
     await cleanup()
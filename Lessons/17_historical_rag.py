@@ -5,15 +5,21 @@ WHY THIS IS IMPORTANT: Strategy is iterative. If your company failed at a
 Cloud migration in 2023, the 2026 AI agent should know WHY. This script 
 demonstrates how to "Retrieve" historical lessons before "Generating" 
 new strategic advice.
+
+The archive lookup is pure, so it is marked @pure (config/tool_memo.py):
+asking about the same topic again, in this session or the next, is served
+from the tool memo.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.tool_memo import pure
 
 # 1. Define the "Lessons Learned" Repository
 # In production, this would be a Vector Database (Chroma, Pinecone, or BigQuery)
+@pure
 async def fetch_historical_lessons(topic: str) -> str:
     """
     Retrieves historical 'Post-Mortem' data from previous years.
@@ -5,14 +5,26 @@ Tool Calling, Long-Term Memory (RAG), and Multi-Stakeholder Synthesis.
 
 GOVERNANCE PATTERN: Uses "Session Sovereignty" to maintain a stable 
 connection between the Advisor and the Session Store.
+
+The dossier weighs the Gateway against the rest of the AI portfolio, so the
+advisor also has portfolio_financials (config/finance.py): NPV, IRR and
+payback for every project in one vectorised call, instead of one ROI call
+per project.
+
+calculate_roi and fetch_history are pure, so both are marked @pure
+(config/tool_memo.py): when the model re-checks a figure or the archives,
+the answer comes from the tool memo.
 """
 
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.finance import portfolio_financials
+from config.settings import get_model, get_runner, get_tool_memo, initialize_session, cleanup
+from config.tool_memo import pure
 
 # --- 1. CORE ENTERPRISE TOOLS ---
+@pure
 def calculate_roi(investment, savings) -> str:
     """
     Calculates ROI percentage for a project. 
@@ -31,6 +43,7 @@ def calculate_roi(investment, savings) -> str:
     except (ValueError, TypeError):
         return "Error: Investment and savings must be numeric values."
 
+@pure
 async def fetch_history(topic: str) -> str:
     """Simulates RAG retrieval from institutional archives."""
     archives = {
@@ -46,9 +59,10 @@ async def main():
         Your goal is to provide a Go/No-Go recommendation for major IT spends.
         1. Always check 'fetch_history' to avoid past mistakes.
         2. Always use 'calculate_roi' for financial validation.
-        3. Reconcile conflicting stakeholder perspectives into a single summary.""",
+        3. Compare against the rest of the portfolio with ONE 'portfolio_financials' call.
+        4. Reconcile conflicting stakeholder perspectives into a single summary.""",
         model=get_model(),
-        tools=[calculate_roi, fetch_history]
+        tools=[calculate_roi, portfolio_financials, fetch_history]
     )
 
     runner = get_runner(executive_agent)
@@ -62,11 +76,13 @@ async def main():
     STRATEGIC DOSSIER:
     - PROJECT: '2026 AI Gateway Implementation'
     - FINANCIALS: $3M Investment vs. $6.5M Projected Efficiency Savings.
+    - COMPETING 2026 PROJECTS: Service Desk Agents ($250k vs. $400k/yr), 
+      Data Governance Platform ($1.8M vs. $450k/yr), Procurement Copilot ($900k vs. $700k/yr).
     - CIO INPUT: "We need this to govern our decentralized agent teams."
     - CFO INPUT: "I am concerned about the high upfront cost and 2024's integration delays."
     
-    TASK: Analyze the ROI, consult the 2024 archives for context, and provide a 
-    final Executive Recommendation.
+    TASK: Analyze the ROI, rank the Gateway against the competing projects, consult 
+    the 2024 archives for context, and provide a final Executive Recommendation.
     """
     
     print(f"--- INITIALIZING EXECUTIVE NERVE CENTER: {session_id} ---")
@@ -88,6 +104,9 @@ async def main():
             usage = event.usage_metadata
             print(f"\n[DASHBOARD METRICS] Session ID: {session_id} | Total Tokens: {usage.total_token_count}")
 
+    if get_tool_memo():
+        print(get_tool_memo().report())
+
     await cleanup()
     print("\n--- 21-DAY ADK MASTERCLASS COMPLETE ---")
 
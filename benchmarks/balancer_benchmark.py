@@ -0,0 +1,141 @@
+"""
+BENCHMARK: Multi-Endpoint Load Balancing and Hedged Requests
+DESCRIPTION: Starts several local Ollama stand-ins (benchmarks/ollama_stub.py)
+with a cap on concurrent generations and an injected share of stragglers. It
+then sends a burst of distinct executive queries through the Runner and
+reports p50/p99 latency for:
+
+  1. one endpoint (every call on one box)
+  2. the pool, hedging off (least-outstanding routing)
+  3. the pool, hedging on (duplicate a call still unanswered at the observed p95)
+  4. the pool with one endpoint failing (ejection and retry)
+
+A self-check first runs a hedged streaming burst and asserts that every
+endpoint's outstanding count is back to 0: a losing hedge's stream, closed
+before it was read, must still give its slot back.
+
+USAGE:
+    python -m benchmarks.balancer_benchmark --endpoints 3 --requests 300 --concurrency 8
+    python -m benchmarks.balancer_benchmark --stream      # hedge on time to first chunk
+"""
+import argparse
+import asyncio
+import os
+import time
+import warnings
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_scenario(settings, urls, args, hedge):
+    from google.adk.agents import Agent
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    settings.MODEL_HEDGE = hedge
+    agent = Agent(name="Balancer_Probe", instruction="You are a CIO Strategy Analyst. Be brief.",
+                  model=settings.get_model(api_base=urls))
+    runner = settings.get_runner(agent)
+    limiter = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if args.stream else StreamingMode.NONE)
+
+    async def one(i):
+        nonlocal errors
+        async with limiter:
+            user_id, session_id = await settings.initialize_session()
+            content = types.Content(role="user", parts=[types.Part(text=f"Assess proposal #{i}.")])
+            t0 = time.perf_counter()
+            try:
+                async for _ in runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                                                run_config=run_config):
+                    pass
+                latencies.append(time.perf_counter() - t0)
+            except Exception:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - t0
+    balancer = settings.get_model(api_base=urls).llm_client
+    while balancer is not None and not hasattr(balancer, "endpoints"):
+        balancer = getattr(balancer, "inner", None)
+    await settings.cleanup()
+    return latencies, errors, wall, balancer
+
+
+def assert_released(balancer, scenario):
+    held = [(e.url, e.outstanding) for e in balancer.endpoints if e.outstanding]
+    assert not held, f"endpoint slots still held after {scenario}: {held}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load balancing and hedging across local Ollama stand-ins.")
+    parser.add_argument("--endpoints", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--num-parallel", type=int, default=2, help="Concurrent generations per endpoint.")
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Share of straggling generations.")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Extra delay of a straggler (s).")
+    parser.add_argument("--stream", action="store_true", help="Stream responses (SSE).")
+    args = parser.parse_args()
+
+    stubs = [
+        OllamaStub(load_latency=0, first_token_latency=args.first_token_latency, token_latency=0.002,
+                   slow_fraction=args.slow_fraction, slow_latency=args.slow_latency,
+                   num_parallel=args.num_parallel, seed=i).start()
+        for i in range(args.endpoints)
+    ]
+    urls = [stub.url for stub in stubs]
+    os.environ.update(OLLAMA_API_BASE=urls[0], OLLAMA_BASE_URLS=",".join(urls), MODEL_WARMUP="0")
+    from config import settings  # Imported after the endpoints are set.
+    import litellm
+    litellm.suppress_debug_info = True  # The failing endpoint is expected to error.
+    # A hedge loser cancelled while LiteLLM is still building its request leaves this harmless warning.
+    warnings.filterwarnings("ignore", message="coroutine 'BaseLLMHTTPHandler.async_completion' was never awaited")
+
+    print(f"--- LOAD BALANCER BENCHMARK ({args.requests} queries, concurrency {args.concurrency}, "
+          f"{args.endpoints} endpoints x {args.num_parallel} slots, "
+          f"{args.slow_fraction:.0%} stragglers +{args.slow_latency:.1f}s) ---")
+    check_args = argparse.Namespace(**dict(vars(args), stream=True, requests=min(args.requests, 100)))
+    _, _, _, balancer = await run_scenario(settings, urls, check_args, hedge=True)
+    assert_released(balancer, "a hedged streaming run")
+    print(f"Self-check: {balancer.stats['hedges']} hedges on streaming calls, every endpoint slot released.\n")
+
+    print(f"{'SCENARIO':<32} {'p50':>8} {'p99':>8} {'wall':>8} {'errors':>7}  NOTES")
+    scenarios = [
+        ("1 endpoint", urls[:1], False, False),
+        (f"{args.endpoints} endpoints, hedging off", urls, False, False),
+        (f"{args.endpoints} endpoints, hedging on", urls, True, False),
+        (f"{args.endpoints} endpoints, 1 failing", urls, True, True),
+    ]
+    for name, scenario_urls, hedge, fail_one in scenarios:
+        stubs[-1].fail = fail_one
+        latencies, errors, wall, balancer = await run_scenario(settings, scenario_urls, args, hedge)
+        notes = ""
+        if balancer is not None:
+            assert_released(balancer, name)
+            calls = "/".join(str(e.stats["calls"]) for e in balancer.endpoints)
+            notes = f"calls per endpoint {calls}"
+            if hedge:
+                notes += f", hedges {balancer.stats['hedges']} (won {balancer.stats['hedge_wins']})"
+            if fail_one:
+                ejected = sum(e.stats["ejections"] for e in balancer.endpoints)
+                notes += f", retries {balancer.stats['retries']}, ejections {ejected}"
+        p50 = percentile(latencies, 0.50) if latencies else float("nan")
+        p99 = percentile(latencies, 0.99) if latencies else float("nan")
+        print(f"{name:<32} {p50:>7.3f}s {p99:>7.3f}s {wall:>7.2f}s {errors:>7}  {notes}")
+
+    for stub in stubs:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
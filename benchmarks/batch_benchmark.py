@@ -0,0 +1,85 @@
+"""
+BENCHMARK: Portfolio Batch Throughput (Unbounded vs. Fixed vs. AIMD Concurrency)
+DESCRIPTION: Audits a synthetic portfolio through the Runner against a local
+Ollama stand-in with a fixed number of parallel generation slots (like
+OLLAMA_NUM_PARALLEL). Compares an unbounded asyncio.gather, a fixed
+concurrency limit and the adaptive BatchScheduler, reporting throughput,
+per-item latency and where the AIMD limit settled.
+
+USAGE:
+    python -m benchmarks.batch_benchmark --proposals 200 --slots 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Batch audit throughput with adaptive concurrency.")
+    parser.add_argument("--proposals", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=4, help="Parallel generation slots on the stub.")
+    parser.add_argument("--fixed", type=int, default=2, help="Concurrency of the fixed-limit scenario.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.05, token_latency=0.01, num_parallel=args.slots).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, MODEL_WARMUP="0")
+    from google.adk.agents import Agent
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.batch_scheduler import AIMDLimiter, BatchScheduler
+
+    agent = Agent(name="Portfolio_Auditor", instruction="Analyze proposals for ROI and risk. Be brief.",
+                  model=settings.get_model())
+    runner = settings.get_runner(agent)
+    portfolio = {f"Project_{i:04d}": f"Proposal {i}: modernise system {i % 17}." for i in range(args.proposals)}
+
+    async def audit(name, text):
+        user_id, session_id = await settings.initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text=text)])
+        async for _ in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            pass
+
+    async def timed(name, text):
+        t0 = time.perf_counter()
+        await audit(name, text)
+        return time.perf_counter() - t0
+
+    print(f"--- BATCH BENCHMARK ({args.proposals} proposals, backend with {args.slots} parallel slots) ---")
+    print(f"{'SCENARIO':<24} {'items/s':>8} {'p50 item':>9} {'max item':>9}  NOTES")
+
+    # 1. Unbounded gather: everything at once.
+    t0 = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(n, t) for n, t in portfolio.items()))
+    wall = time.perf_counter() - t0
+    print(f"{'unbounded gather':<24} {args.proposals / wall:>8.2f} {statistics.median(latencies):>8.2f}s "
+          f"{max(latencies):>8.2f}s  {args.proposals} requests in flight at once")
+
+    # 2. Fixed limit below the backend's capacity.
+    scheduler = BatchScheduler(audit, limiter=AIMDLimiter(initial=args.fixed, maximum=args.fixed), report=None)
+    results = await scheduler.run(portfolio)
+    latencies = [r.latency for r in results]
+    print(f"{f'fixed limit {args.fixed}':<24} {scheduler.stats['throughput']:>8.2f} "
+          f"{statistics.median(latencies):>8.2f}s {max(latencies):>8.2f}s")
+
+    # 3. AIMD: grows until latency shows queueing.
+    scheduler = BatchScheduler(audit, report=None)
+    results = await scheduler.run(portfolio)
+    latencies = [r.latency for r in results]
+    limits = [limit for _, limit in scheduler.limiter.history]
+    settled = statistics.mean(limits[len(limits) // 2:]) if limits else 0
+    print(f"{'AIMD':<24} {scheduler.stats['throughput']:>8.2f} {statistics.median(latencies):>8.2f}s "
+          f"{max(latencies):>8.2f}s  limit peaked at {scheduler.stats['peak_limit']}, "
+          f"settled around {settled:.1f}")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
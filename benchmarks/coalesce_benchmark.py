@@ -0,0 +1,107 @@
+"""
+BENCHMARK: Coalescing Identical In-Flight Calls
+DESCRIPTION: Sends --callers identical executive queries at once, each in a
+fresh session, to a local Ollama stand-in (benchmarks/ollama_stub.py), once
+with MODEL_COALESCE off and once on (config/singleflight.py), with and
+without streaming. Reports upstream chat calls and wall time.
+
+Self-checks, with coalescing on:
+  * the callers make exactly one chat call and all get the same answer;
+  * a caller cancelled mid-generation leaves the shared call running: the
+    others still get the full answer and the stub sees no aborted generation;
+  * once every caller has cancelled, the upstream generation is aborted.
+
+USAGE:
+    python -m benchmarks.coalesce_benchmark --callers 8 --token-latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from google.adk.agents import Agent
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+PROMPT = "Summarize our AI strategy for the board in one paragraph."
+
+
+async def ask(settings, runner, run_config):
+    user_id, session_id = await settings.initialize_session()
+    content = types.Content(role="user", parts=[types.Part(text=PROMPT)])
+    text = ""
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                                        run_config=run_config):
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+    return text
+
+
+async def wait_for_generation(stub, before):
+    """Returns once the stub has started (and not yet finished) the upstream generation."""
+    while stub.stats["chat"] == before:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+
+
+async def scenario(settings, stub, args, coalesce, streaming, cancel=0):
+    """Runs --callers identical queries; cancels `cancel` of them mid-generation."""
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    settings.MODEL_COALESCE = coalesce
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+    agent = Agent(name="Coalesce_Probe", instruction="You are a CIO Strategy Analyst.", model=settings.get_model())
+    runner = settings.get_runner(agent)
+    before, aborted = stub.stats["chat"], stub.stats["aborted"]
+    t0 = time.perf_counter()
+    tasks = [asyncio.ensure_future(ask(settings, runner, run_config)) for _ in range(args.callers)]
+    if cancel:
+        await wait_for_generation(stub, before)
+        for task in tasks[:cancel]:
+            task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - t0
+    await asyncio.sleep(0.2)  # Let the stub notice a dropped connection.
+    answers = [r for r in results if not isinstance(r, BaseException)]
+    await settings.cleanup()
+    return answers, stub.stats["chat"] - before, stub.stats["aborted"] - aborted, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Upstream calls with and without coalescing.")
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Simulated seconds per token.")
+    args = parser.parse_args()
+
+    reply = " ".join(["The AI strategy funds the gateway, governs models centrally and measures value."] * 4)
+    stub = OllamaStub(load_latency=0, token_latency=args.token_latency, reply=reply).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, MODEL_WARMUP="0")
+    from config import settings  # Imported after the endpoint is set.
+
+    print(f"--- COALESCING BENCHMARK ({args.callers} identical callers, local stand-in) ---")
+    print(f"{'MODE':<28} {'chat calls':>10} {'time':>8}")
+    for streaming in (False, True):
+        mode = "stream" if streaming else "plain"
+        for coalesce in (False, True):
+            answers, calls, _, elapsed = await scenario(settings, stub, args, coalesce, streaming)
+            print(f"{f'MODEL_COALESCE={int(coalesce)} ({mode})':<28} {calls:>10} {elapsed:>7.2f}s")
+        assert calls == 1, f"{mode}: {args.callers} coalesced callers made {calls} chat calls"
+        assert len(answers) == args.callers and set(answers) == {reply}, f"{mode}: callers got different answers"
+        print(f"Self-check ({mode}): {args.callers} coalesced callers made one chat call and got the same answer.")
+
+        answers, calls, aborted, _ = await scenario(settings, stub, args, True, streaming, cancel=1)
+        assert calls == 1 and aborted == 0, f"{mode}: one caller's cancel aborted the shared call"
+        assert len(answers) == args.callers - 1 and set(answers) == {reply}, \
+            f"{mode}: {len(answers)} of {args.callers - 1} remaining callers got the full answer"
+        print(f"Self-check ({mode}): one caller cancelled mid-generation; the other {len(answers)} "
+              "still got the full answer from the same call.")
+
+        answers, calls, aborted, _ = await scenario(settings, stub, args, True, streaming, cancel=args.callers)
+        assert not answers and aborted == 1, f"{mode}: cancelling every caller left the generation running"
+        print(f"Self-check ({mode}): cancelling all {args.callers} callers aborted the upstream generation.")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+BENCHMARK: Context Compaction in Long Sessions
+DESCRIPTION: A local Ollama stand-in plays a workshop session of --turns
+turns (the Lesson 04 budget is set in turn 1, then every turn adds
+discussion). The session runs once with the full history and once with
+CompactionPlugin (config/compaction.py). Reports the prompt tokens the model
+prefilled (the stub's prompt_eval_count) at several turns and at the peak,
+the summary updates needed, and whether the pinned budget sentence still
+reached the model verbatim in the last request. The stub counts the JSON of
+the messages, so its numbers run above the plugin's own estimate.
+
+USAGE:
+    python -m benchmarks.compaction_benchmark --turns 200 --budget 2048
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+PINNED = "Our AI innovation budget for 2026 is officially $4.5 million."
+ANSWER = ("Noted. The pilot should stay inside the agreed envelope, with a stage gate review before scale-up "
+          "and a named business owner for every workstream.")
+SUMMARY = ("Budget agreed in turn 1. Pilots discussed: invoice automation, procurement agents, service desk. "
+           "Each needs a stage gate and an owner.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Prefill per turn with and without context compaction.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=2048, help="COMPACTION_BUDGET in estimated tokens.")
+    args = parser.parse_args()
+
+    last_prompt = {"text": ""}
+
+    def reply(body):
+        prompt = json.dumps(body.get("messages") or "")
+        if "running summary of a long strategy conversation" in prompt:
+            return SUMMARY
+        last_prompt["text"] = prompt
+        return ANSWER
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.0, token_latency=0.0, reply=reply).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0", MODEL_COALESCE="0")
+    from google.adk.agents import Agent
+    from google.adk.runners import Runner
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.compaction import CompactionPlugin
+
+    agent = Agent(name="Stateful_Strategist", model=settings.get_model(),
+                  instruction="You are a strategy partner. Remember and build upon all context provided.")
+    checkpoints = sorted({t for t in (1, 10, 50, 100, 200, 500, args.turns) if t <= args.turns})
+
+    async def session(plugin):
+        runner = Runner(agent=agent, app_name=settings.APP_NAME, session_service=settings.get_session_service(),
+                        plugins=[plugin] if plugin else [])
+        user_id, session_id = await settings.initialize_session()
+        prefill, t0 = {}, time.perf_counter()
+        for turn in range(1, args.turns + 1):
+            text = PINNED if turn == 1 else f"Turn {turn}: how does workstream {turn % 7} affect the pilots?"
+            content = types.Content(role="user", parts=[types.Part(text=text)])
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                if event.usage_metadata and event.usage_metadata.prompt_token_count:
+                    prefill[turn] = event.usage_metadata.prompt_token_count
+        return prefill, time.perf_counter() - t0, PINNED in last_prompt["text"]
+
+    print(f"--- COMPACTION BENCHMARK ({args.turns} turns, budget {args.budget} tokens) ---")
+    print(f"{'MODE':<12}" + "".join(f"{'turn ' + str(t):>11}" for t in checkpoints) + f"{'peak':>9}{'time':>9}  NOTES")
+    for compact in (False, True):
+        plugin = CompactionPlugin(budget=args.budget) if compact else None
+        prefill, elapsed, pinned = await session(plugin)
+        notes = f"pinned fact in last prompt: {'yes' if pinned else 'NO'}"
+        if plugin:
+            notes += f" | {plugin.stats['summary_updates']} summary updates"
+        print(f"{'compaction' if compact else 'full history':<12}"
+              + "".join(f"{prefill.get(t, 0):>11}" for t in checkpoints)
+              + f"{max(prefill.values()):>9}{elapsed:>8.1f}s  {notes}")
+    print("Prefill = prompt tokens evaluated by the model for that turn.")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
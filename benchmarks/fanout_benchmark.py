@@ -0,0 +1,124 @@
+"""
+BENCHMARK: Fan-Out/Fan-In Roadmap Generation
+DESCRIPTION: A local Ollama stand-in writes the Lesson 02 roadmap (three
+phases of about --section-tokens tokens each, written as an intro, a bullet
+list and a milestone paragraph) two ways: as one sequential
+decode, and fan-out/fan-in (config/fanout.py), i.e. a short outline, then the
+three phases as concurrent calls, stitched and checked for consistency.
+Reports wall time per roadmap, the outline and slowest-section times, any
+consistency issues, and phases that lost paragraphs when stitched. The stub serves --num-parallel generations at once,
+like OLLAMA_NUM_PARALLEL; with 1, the phases queue and fan-out only adds the
+outline call.
+
+USAGE:
+    python -m benchmarks.fanout_benchmark --roadmaps 3 --section-tokens 150 --num-parallel 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+PHASES = ["Short-term (6mo)", "Mid-term (2yr)", "Long-term (5yr)"]
+THEMES = {
+    "Short-term (6mo)": "Critical Dependency: clean master data. Business Outcome: invoice automation pilot.",
+    "Mid-term (2yr)": "Critical Dependency: event integration layer. Business Outcome: autonomous procurement.",
+    "Long-term (5yr)": "Critical Dependency: governance framework. Business Outcome: self-optimising ledger.",
+}
+OUTLINE = "\n".join(f"{phase}: {theme}" for phase, theme in THEMES.items())
+MILESTONE = "Milestone:"
+
+
+def _make_reply(section_tokens):
+    rng = random.Random(5)
+    filler = ["the", "programme", "team", "delivers", "agents", "across", "finance", "operations", "with",
+              "measured", "controls", "and", "weekly", "reviews."]
+
+    def words(n):
+        return " ".join(rng.choice(filler) for _ in range(n))
+
+    def body(phase):
+        third = section_tokens // 3
+        bullets = "\n".join(f"- {words(third // 3)}" for _ in range(3))
+        return f"## {phase}\n{THEMES[phase]} {words(third)}\n\nKey initiatives:\n{bullets}\n\n{MILESTONE} {words(third)}\n"
+
+    def reply(body_json):
+        last = json.dumps(body_json["messages"][-1].get("content") or "")
+        if "SHORT outline" in last:
+            return OUTLINE
+        match = re.search(r"Write ONLY the '([^']+)' section", last)
+        if match:
+            return body(match.group(1))
+        return "\n".join(body(phase) for phase in PHASES)
+    return reply
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Wall time of a sequential roadmap against fan-out/fan-in.")
+    parser.add_argument("--roadmaps", type=int, default=3)
+    parser.add_argument("--section-tokens", type=int, default=150)
+    parser.add_argument("--num-parallel", type=int, default=4, help="Generations the stub serves at once.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.1, token_latency=0.01,
+                      reply=_make_reply(args.section_tokens), num_parallel=args.num_parallel).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0", MODEL_COALESCE="0")
+    from google.adk.agents import Agent
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.fanout import FanOutDocument
+
+    agent = Agent(name="Roadmap_Architect", instruction="You are a Lead Strategy Architect.",
+                  model=settings.get_model())
+    runner = settings.get_runner(agent)
+
+    async def ask(prompt):
+        user_id, session_id = await settings.initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text=prompt)])
+        text = ""
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            if event.is_final_response() and event.content and event.content.parts:
+                text = event.content.parts[0].text or ""
+        return text
+
+    async def roadmap(i, fanout):
+        request = f"Draft 5-year ERP roadmap number {i}."
+        t0 = time.perf_counter()
+        if not fanout:
+            await ask(request)
+            return time.perf_counter() - t0, None
+        writer = FanOutDocument(ask, PHASES)
+        _, bodies, issues = await writer.generate(request)
+        return time.perf_counter() - t0, (writer, issues, bodies)
+
+    print(f"--- FANOUT BENCHMARK ({args.roadmaps} roadmaps, 3 x {args.section_tokens} tokens, "
+          f"{args.num_parallel} parallel slots) ---")
+    print(f"{'MODE':<12} {'s/roadmap':>10}  NOTES")
+    results = {}
+    for fanout in (False, True):
+        runs = [await roadmap(i, fanout) for i in range(args.roadmaps)]
+        results[fanout] = sum(r[0] for r in runs) / args.roadmaps
+        note = ""
+        if fanout:
+            timings = [r[1][0].timings for r in runs]
+            outline = sum(t["outline"] for t in timings) / len(timings)
+            slowest = sum(max(t[p] for p in PHASES) for t in timings) / len(timings)
+            issues = sum(len(r[1][1]) for r in runs)
+            truncated = sum(MILESTONE not in body for r in runs for body in r[1][2].values())
+            note = (f"outline {outline:.2f}s + slowest phase {slowest:.2f}s | {issues} consistency issues | "
+                    f"{truncated} phases truncated")
+        print(f"{'fan-out' if fanout else 'sequential':<12} {results[fanout]:>9.2f}s  {note}")
+    print(f"Fan-out wall time: {results[True] / results[False]:.0%} of the sequential decode.")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
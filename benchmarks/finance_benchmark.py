@@ -0,0 +1,168 @@
+"""
+BENCHMARK: Batch Portfolio Financials vs. a Per-Project ROI Tool
+DESCRIPTION: Two views of the same portfolio question.
+
+  1. Compute, at --projects projects: Lesson 06's calculate_ai_roi called
+     once per project (ROI only); the same five metrics as the engine in
+     plain Python, one project at a time; config/finance.py evaluating ROI,
+     NPV, IRR, payback and discounted payback for all of them at once; and
+     the full portfolio_financials tool (parsing the text and building the
+     table included).
+  2. Agent turns, at --agent-projects projects, on a local Ollama stand-in
+     that answers with tool calls: the model calling the scalar tool once per
+     project (one round trip each, with the history growing), vs. one
+     portfolio_financials call. Reports model calls, prompt tokens and wall
+     time, and extrapolates the model calls to --projects.
+
+USAGE:
+    python -m benchmarks.finance_benchmark --projects 10000 --agent-projects 20
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_lesson_tool():
+    path = os.path.join(REPO_ROOT, "Lessons", "06_roi_tool_agent.py")
+    spec = importlib.util.spec_from_file_location("lesson_06", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.calculate_ai_roi
+
+
+def make_portfolio(n, seed=11):
+    rng = random.Random(seed)
+    return [(f"Project {i}", rng.randrange(100_000, 5_000_000, 10_000), rng.randrange(20_000, 3_000_000, 10_000))
+            for i in range(1, n + 1)]
+
+
+def scalar_metrics(investment, savings, years=5, rate=0.08):
+    """ROI, NPV, IRR (bisection), payback and discounted payback for one project, in plain Python."""
+    flows = [-investment] + [savings] * years
+
+    def npv(r):
+        return sum(flow / (1 + r) ** t for t, flow in enumerate(flows))
+
+    lo, hi = -0.99, 100.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if npv(mid) > 0 else (lo, mid)
+    paybacks = []
+    for discounted in (False, True):
+        cumulative, years_to_payback = 0.0, float("inf")
+        for t, flow in enumerate(flows):
+            flow = flow / (1 + rate) ** t if discounted else flow
+            if t and cumulative + flow >= 0:
+                years_to_payback = t - 1 + -cumulative / flow
+                break
+            cumulative += flow
+        paybacks.append(years_to_payback)
+    return (savings - investment) / investment, npv(rate), (lo + hi) / 2, *paybacks
+
+
+def compute(projects, calculate_ai_roi):
+    import numpy as np
+
+    from config.finance import evaluate, portfolio_financials
+
+    t0 = time.perf_counter()
+    for _, investment, savings in projects:
+        calculate_ai_roi(investment, savings)
+    scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _, investment, savings in projects:
+        scalar_metrics(investment, savings)
+    scalar_all = time.perf_counter() - t0
+
+    investments = np.array([p[1] for p in projects], dtype=float)
+    savings = np.array([p[2] for p in projects], dtype=float)
+    t0 = time.perf_counter()
+    evaluate(investments, savings)
+    engine = time.perf_counter() - t0
+
+    text = "\n".join(f"{name}, {investment}, {saving}" for name, investment, saving in projects)
+    t0 = time.perf_counter()
+    table = portfolio_financials(text)
+    tool = time.perf_counter() - t0
+    return scalar, scalar_all, engine, tool, table
+
+
+async def agent_turn(settings, stub, projects, batch, calculate_ai_roi):
+    from google.adk.agents import Agent
+
+    from config.finance import portfolio_financials
+
+    def reply(body):
+        done = sum(1 for m in body["messages"] if m.get("role") == "tool")
+        if batch and not done:
+            text = "\n".join(f"{name}, {investment}, {saving}" for name, investment, saving in projects)
+            return {"tool_calls": [{"function": {"name": "portfolio_financials", "arguments": {"projects": text}}}]}
+        if not batch and done < len(projects):
+            _, investment, saving = projects[done]
+            return {"tool_calls": [{"function": {"name": "calculate_ai_roi",
+                                                 "arguments": {"investment": investment, "annual_savings": saving}}}]}
+        return "Ranked the portfolio: the top three projects by return are listed above."
+
+    stub.reply = reply
+    agent = Agent(name="Financial_Strategist", model=settings.get_model(),
+                  instruction="You are a Strategy Consultant. Evaluate every project with the tools.",
+                  tools=[portfolio_financials] if batch else [calculate_ai_roi])
+    runner = settings.get_runner(agent)
+    user_id, session_id = await settings.initialize_session()
+    content = types.Content(role="user", parts=[types.Part(text="Rank these projects by return.")])
+    calls, prompt_tokens, t0 = 0, 0, time.perf_counter()
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+        if event.usage_metadata and event.usage_metadata.prompt_token_count:
+            calls += 1
+            prompt_tokens += event.usage_metadata.prompt_token_count
+    return calls, prompt_tokens, time.perf_counter() - t0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Batch portfolio financials vs. a per-project ROI tool.")
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--agent-projects", type=int, default=20)
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.05, token_latency=0.005,
+                      prompt_token_latency=0.0002).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0")
+    from config import settings  # Imported after the endpoint is set.
+
+    calculate_ai_roi = load_lesson_tool()
+    projects = make_portfolio(args.projects)
+    scalar, scalar_all, engine, tool, table = compute(projects, calculate_ai_roi)
+    print(f"--- FINANCE BENCHMARK: COMPUTE ({args.projects} projects) ---")
+    print(f"{'MODE':<34} {'time':>10} {'per project':>12}")
+    for mode, seconds in (("calculate_ai_roi x N (ROI only)", scalar), ("Python loop (5 metrics)", scalar_all),
+                          ("evaluate() (5 metrics, NumPy)", engine), ("portfolio_financials (text in/out)", tool)):
+        print(f"{mode:<34} {seconds * 1000:>8.1f}ms {seconds / args.projects * 1e6:>10.2f}us")
+    print(f"Table returned to the model: {len(table.splitlines())} lines, {len(table)} chars.")
+
+    print(f"\n--- FINANCE BENCHMARK: AGENT TURN ({args.agent_projects} projects, local stand-in) ---")
+    print(f"{'MODE':<34} {'model calls':>11} {'prompt tok':>11} {'time':>8}")
+    sample, results = projects[:args.agent_projects], {}
+    for batch in (False, True):
+        calls, prompt_tokens, elapsed = await agent_turn(settings, stub, sample, batch, calculate_ai_roi)
+        results[batch] = calls
+        mode = "portfolio_financials, one call" if batch else "calculate_ai_roi per project"
+        print(f"{mode:<34} {calls:>11} {prompt_tokens:>11} {elapsed:>7.2f}s")
+    print(f"At {args.projects} projects: {args.projects + 1} model calls per question with the scalar tool, "
+          f"{results[True]} with the batch tool.")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+BENCHMARK: Startup (Import-Time) Cost per Lesson
+DESCRIPTION: Imports each lesson in a fresh interpreter under `python -X importtime`
+(without running its main()) and reports the total import time plus the
+heaviest top-level packages.
+
+USAGE:
+    python -m benchmarks.import_benchmark                          # all lessons
+    python -m benchmarks.import_benchmark 01 11 21                 # selected lessons
+    python -m benchmarks.import_benchmark --save startup.json      # record a baseline
+    python -m benchmarks.import_benchmark --compare startup.json   # exit 1 on regression
+
+A lesson regresses when its import time exceeds the baseline by more than
+--tolerance (a fraction, default 0.25) and by at least --min-delta-ms.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_importtime(stderr):
+    """Returns {top-level module: cumulative microseconds} from -X importtime output."""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # nested import, already counted in its parent; or the header row
+        totals[name.strip()] = totals.get(name.strip(), 0) + int(cumulative)
+    return totals
+
+
+def measure(target):
+    """Imports `target` (a lesson path or a module name) in a fresh interpreter."""
+    if target.endswith(".py"):
+        code = f"import runpy; runpy.run_path({target!r}, run_name='import_benchmark')"
+    else:
+        code = f"import {target}"
+    env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return _parse_importtime(result.stderr)
+
+
+def _lessons(selected):
+    paths = sorted(glob.glob(os.path.join(REPO_ROOT, "Lessons", "[0-9][0-9]_*.py")))
+    if selected:
+        paths = [p for p in paths if os.path.basename(p)[:2] in selected]
+    return [os.path.relpath(p, REPO_ROOT) for p in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lessons", nargs="*", help="Lesson numbers to measure (default: all).")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest packages to list per lesson.")
+    parser.add_argument("--save", help="Write results (ms per lesson) to this JSON file.")
+    parser.add_argument("--compare", help="Compare against a JSON file written by --save.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    targets = ["config.settings"] + _lessons(args.lessons)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'TARGET':<45} {'IMPORT ms':>10}  HEAVIEST PACKAGES")
+    results, regressions = {}, []
+    for target in targets:
+        totals = measure(target)
+        total_ms = sum(totals.values()) / 1000
+        results[target] = round(total_ms, 1)
+        heaviest = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        heaviest_text = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest)
+        line = f"{target:<45} {total_ms:>10.1f}  {heaviest_text}"
+        if target in baseline:
+            delta = total_ms - baseline[target]
+            line += f"  ({delta:+.0f}ms vs baseline)"
+            if delta > args.min_delta_ms and total_ms > baseline[target] * (1 + args.tolerance):
+                regressions.append(target)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+    if regressions:
+        print(f"\nSTARTUP REGRESSION in: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
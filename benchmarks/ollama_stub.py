@@ -0,0 +1,330 @@
+"""
+BENCHMARK HELPER: Local Ollama Stand-in Server
+DESCRIPTION: A tiny HTTP server that mimics the parts of the Ollama API the
+Strategy Suite uses (/api/chat, /api/generate, /api/show, /api/ps,
+/api/tags), so
+warm-up, pooling and routing behaviour can be exercised without a GPU.
+
+USAGE:
+    python -m benchmarks.ollama_stub --port 11500 --load-latency 3 --token-latency 0.01
+
+    # or in-process
+    stub = OllamaStub(load_latency=2.0).start()
+    ... point OLLAMA_API_BASE at stub.url ...
+    stub.stop()
+
+The stub simulates model residency: the first request for a model pays
+`load_latency`, and the model stays loaded for its `keep_alive` window. A
+`slow_fraction` of generations is delayed by an extra `slow_latency` (a
+straggler, as on a busy GPU), `num_parallel` caps concurrent generations
+(like OLLAMA_NUM_PARALLEL; extra requests queue), and `fail=True` makes every
+call and health check return HTTP 500. Like Ollama, a generation is aborted
+(and its slot freed) as soon as the client disconnects. `prompt_token_latency`
+adds prefill time per prompt token, and `reply` may be a function of the
+request body, for scripted answers. A reply of the form {"tool_calls": [...]}
+(Ollama's message format) answers with function calls instead of text. `stats["tokens"]` counts the tokens
+actually generated, so work saved by stopping a stream early shows up.
+
+With `prefix_cache=True` the stub mimics llama.cpp's KV-cache reuse: each
+slot remembers its last prompt (system messages, then tool schemas, then the
+rest), and a new prompt only pays prefill for the part after the longest
+shared prefix. Like Ollama, `prompt_eval_count` then counts only the tokens
+actually evaluated, and a different `num_ctx` reloads the model and drops
+the cache. `stats["cached_tokens"]` counts the tokens served from cache.
+"""
+import argparse
+import collections
+import json
+import random
+import select
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_DEFAULT_KEEP_ALIVE = 300.0
+
+
+def _parse_keep_alive(value):
+    """Converts Ollama keep_alive values ("5m", "1h", "30s", 300, -1) to seconds."""
+    if value is None:
+        return _DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class _QuietServer(ThreadingHTTPServer):
+    """Clients that hang up mid-reply (cancelled or hedged calls) are normal here."""
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class OllamaStub:
+    """Thread-hosted Ollama stand-in with configurable load and generation latency."""
+
+    def __init__(self, host="127.0.0.1", port=0, load_latency=1.0, first_token_latency=0.05,
+                 token_latency=0.005, reply="Strategic insight from the local stub model.",
+                 fail=False, slow_fraction=0.0, slow_latency=1.0, num_parallel=None, seed=None,
+                 prompt_token_latency=0.0, prefix_cache=False):
+        self.load_latency = load_latency
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(num_parallel) if num_parallel else None
+        self.reply = reply
+        self.fail = fail
+        self.loaded = {}  # model -> expiry (monotonic seconds)
+        self.stats = {"connections": 0, "requests": 0, "loads": 0, "chat": 0, "generate": 0, "slow": 0,
+                      "aborted": 0, "tokens": 0, "cached_tokens": 0}
+        self.prefix_cache = prefix_cache
+        self._prompts = collections.deque(maxlen=num_parallel or 1)  # Last prompt per slot.
+        self._num_ctx = None
+        self.requests = []  # request bodies, newest last
+        self._lock = threading.Lock()
+        self._server = _QuietServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- KV-cache reuse ---
+    @staticmethod
+    def _render(body):
+        messages = body.get("messages") or []
+        system = [m for m in messages if m.get("role") == "system"]
+        rest = [m for m in messages if m.get("role") != "system"]
+        return json.dumps(system) + json.dumps(body.get("tools") or []) + json.dumps(rest)
+
+    def _evaluated_tokens(self, body):
+        """Prompt tokens left to evaluate after the longest prefix shared with a slot's last prompt."""
+        prompt = self._render(body)
+        num_ctx = (body.get("options") or {}).get("num_ctx")
+        with self._lock:
+            if num_ctx != self._num_ctx:
+                self._prompts.clear()  # Ollama reloads the runner for a new context size.
+                self._num_ctx = num_ctx
+            shared = 0
+            for previous in self._prompts:
+                n = 0
+                for a, b in zip(previous, prompt):
+                    if a != b:
+                        break
+                    n += 1
+                shared = max(shared, n)
+            self._prompts.append(prompt)
+            total = max(1, len(prompt) // 4)
+            cached = min(total - 1, shared // 4)
+            self.stats["cached_tokens"] += cached
+        return total - cached
+
+    # --- Model residency ---
+    def _ensure_loaded(self, model, keep_alive):
+        """Returns the simulated load duration in seconds (0 when already resident)."""
+        with self._lock:
+            now = time.monotonic()
+            resident = self.loaded.get(model, 0) > now
+            self.loaded[model] = now + _parse_keep_alive(keep_alive)
+            if not resident:
+                self.stats["loads"] += 1
+        if resident:
+            return 0.0
+        time.sleep(self.load_latency)
+        return self.load_latency
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _pause(self, seconds):
+                """Sleeps, but aborts early if the client hangs up (e.g. a cancelled hedge)."""
+                deadline = time.monotonic() + seconds
+                while (remaining := deadline - time.monotonic()) > 0:
+                    readable, _, _ = select.select([self.connection], [], [], min(remaining, 0.01))
+                    if readable and not self.connection.recv(1, socket.MSG_PEEK):
+                        with stub._lock:
+                            stub.stats["aborted"] += 1
+                        raise ConnectionResetError("client disconnected")
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.stats["requests"] += 1
+                    now = time.monotonic()
+                    models = [{"name": m, "model": m} for m, exp in stub.loaded.items() if exp > now]
+                if stub.fail:
+                    self._send_json({"error": "injected failure"}, status=500)
+                elif self.path in ("/api/ps", "/api/tags"):
+                    self._send_json({"models": models})
+                elif self.path in ("/", "/api/version"):
+                    self._send_json({"version": "stub"})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.stats["requests"] += 1
+                    stub.requests.append(body)
+                if stub.fail:
+                    self._send_json({"error": "injected failure"}, status=500)
+                    return
+                if self.path == "/api/show":
+                    self._send_json({
+                        "template": "{{ if .Tools }}tools{{ end }}{{ .Prompt }}",
+                        "model_info": {"llama.context_length": 131072},
+                    })
+                elif self.path in ("/api/chat", "/api/generate"):
+                    chat = self.path == "/api/chat"
+                    with stub._lock:
+                        stub.stats["chat" if chat else "generate"] += 1
+                    if stub._slots is None:
+                        self._generate(body, chat=chat)
+                    else:
+                        with stub._slots:
+                            self._generate(body, chat=chat)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _generate(self, body, chat):
+                model = body.get("model", "")
+                load = stub._ensure_loaded(model, body.get("keep_alive"))
+                created = datetime.now(timezone.utc).isoformat()
+                prompt = json.dumps(body.get("messages") or body.get("prompt") or "")
+                prompt_tokens = max(1, len(prompt) // 4)
+                if stub.prefix_cache and body.get("messages"):
+                    prompt_tokens = stub._evaluated_tokens(body)
+
+                # A load-only request (no prompt / no messages) returns immediately.
+                if not body.get("messages") and not body.get("prompt"):
+                    self._send_json({
+                        "model": model, "created_at": created, "response": "", "done": True,
+                        "done_reason": "load", "load_duration": int(load * 1e9),
+                    })
+                    return
+
+                reply = stub.reply(body) if callable(stub.reply) else stub.reply
+                tool_calls = None
+                if isinstance(reply, dict):
+                    tool_calls, reply = reply.get("tool_calls"), reply.get("content", "")
+                tokens = reply.split(" ")
+                with stub._lock:
+                    straggler = stub._random.random() < stub.slow_fraction
+                    stub.stats["slow"] += straggler
+                prefill = stub.prompt_token_latency * prompt_tokens
+                self._pause(prefill + stub.first_token_latency + (stub.slow_latency if straggler else 0.0))
+                final = {
+                    "model": model, "created_at": created, "done": True, "done_reason": "stop",
+                    "total_duration": int((load + prefill + stub.first_token_latency
+                                           + stub.token_latency * len(tokens)) * 1e9),
+                    "load_duration": int(load * 1e9),
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prefill * 1e9),
+                    "eval_count": len(tokens),
+                    "eval_duration": int(stub.token_latency * len(tokens) * 1e9),
+                }
+
+                def _chunk(text, calls=None):
+                    if chat:
+                        message = {"role": "assistant", "content": text}
+                        if calls:
+                            message["tool_calls"] = calls
+                        return {"model": model, "created_at": created, "message": message, "done": False}
+                    return {"model": model, "created_at": created, "response": text, "done": False}
+
+                if not body.get("stream", True):
+                    self._pause(stub.token_latency * len(tokens))
+                    with stub._lock:
+                        stub.stats["tokens"] += len(tokens)
+                    final.update(_chunk(reply, tool_calls))
+                    final["done"] = True
+                    self._send_json(final)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    text = token if i == 0 else " " + token
+                    self._write_chunk(json.dumps(_chunk(text, tool_calls if i == 0 else None)) + "\n")
+                    with stub._lock:
+                        stub.stats["tokens"] += 1
+                    self._pause(stub.token_latency)
+                final.update(_chunk(""))
+                final["done"] = True
+                self._write_chunk(json.dumps(final) + "\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Ollama stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--load-latency", type=float, default=1.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Share of generations that straggle.")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Extra delay of a straggler (s).")
+    parser.add_argument("--num-parallel", type=int, default=0, help="Concurrent generations (0 = unlimited).")
+    args = parser.parse_args()
+
+    stub = OllamaStub(args.host, args.port, args.load_latency, args.first_token_latency, args.token_latency,
+                      slow_fraction=args.slow_fraction, slow_latency=args.slow_latency,
+                      num_parallel=args.num_parallel or None)
+    print(f"--- OLLAMA STUB LISTENING ON {stub.url} ---")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+BENCHMARK: Incremental Output Scanning
+DESCRIPTION: Builds synthetic model answers of --tokens tokens (about four
+characters each) with a salary figure, an email or an employee ID in every
+few sentences, and streams each one in token-sized chunks through:
+
+  * OutputScanner (config/output_scanner.py): state carried across chunks,
+    constant work per character;
+  * a stateless re-scan: ENTITY_PATTERNS (config/guardrails.py) over the
+    whole text received so far, after every chunk, which is what streaming
+    safely without carried state takes.
+
+Reports the scanning cost per chunk (mean and p99), the total, the most
+text the scanner held back, and whether both found the same entities.
+Before timing, a differential self-check streams tricky strings (several
+"@", leading or trailing dots and dashes, IDs inside emails) and a few
+thousand seeded random ones through both and asserts that they find exactly
+the same matches.
+
+USAGE:
+    python -m benchmarks.output_scan_benchmark --tokens 500 2000 8000
+"""
+import argparse
+import random
+import time
+
+from config.guardrails import ENTITY_PATTERNS
+from config.output_scanner import DEFAULT_ENTITIES, OutputScanner
+
+SENTENCES = [
+    "The platform team will consolidate three analytics stacks into one governed lakehouse.",
+    "Vendor lock-in remains the top risk, so every contract needs an exit clause.",
+    "The $4.5 million program budget covers pilots, training and two platform engineers.",
+    "Stage gates keep each pilot honest: no scale-up without a measured business outcome.",
+]
+LEAKS = [
+    lambda rng: f"Her salary is ${rng.randrange(90000, 250000, 500):,}.",
+    lambda rng: f"Contact {rng.choice(['jane', 'raj', 'ana'])}.{rng.choice(['doe', 'k', 'li'])}@corp.example for details.",
+    lambda rng: f"Owner: EMP-{rng.randint(10000, 99999)}.",
+    lambda rng: f"A ${rng.randint(10, 99)}k retention bonus.",
+]
+EDGE_CASES = [
+    "a@b@c.com", "x@y.z@w.com", "a@b@c@d.com", "a@b.c-@x.com", "a@b.c+x@y.com", "a@b+x@y.com", "a@b.@c.com",
+    "a@@b.com", "a@-b@c.org", "a@--@c.com",
+    "-a@b.com", "a.@b.com", "a@b..com", "a@b.com.", "foo@bar", "a.b@c.d.e", "mail a_b@c-d.org.",
+    "ceo@emp-12345.example", "EMP-12345@corp.io", "pay $120,000@x.com", "$95k@a.b", "e1234@b@c.com",
+]
+
+
+def make_answer(tokens, seed=3):
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < tokens * 4:
+        text = rng.choice(LEAKS)(rng) if rng.random() < 0.3 else rng.choice(SENTENCES)
+        parts.append(text)
+        size += len(text) + 1
+    answer = " ".join(parts)
+    return [answer[i:i + 4] for i in range(0, len(answer), 4)]
+
+
+def incremental(chunks):
+    scanner, timings = OutputScanner(), []
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        scanner.feed(chunk)
+        timings.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    scanner.close()
+    timings.append(time.perf_counter() - t0)
+    return timings, sorted(kind for kind, _ in scanner.findings), scanner.stats["max_held"]
+
+
+def rescan(chunks):
+    received, found, timings = "", [], []
+    for chunk in chunks:
+        received += chunk
+        t0 = time.perf_counter()
+        found = sorted(kind for kind in DEFAULT_ENTITIES for _ in ENTITY_PATTERNS[kind].finditer(received))
+        timings.append(time.perf_counter() - t0)
+    return timings, found
+
+
+def random_cases(n, seed=11, alphabet="ab1_.+-@ ,$kE"):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16))) for _ in range(n)]
+
+
+def differential_check(cases, chunk=3):
+    """Asserts that the scanner and ENTITY_PATTERNS find the same matches, case by case."""
+    for case in cases:
+        scanner = OutputScanner()
+        for i in range(0, len(case), chunk):
+            scanner.feed(case[i:i + chunk])
+        scanner.close()
+        expected = sorted((kind, m.group()) for kind in DEFAULT_ENTITIES for m in ENTITY_PATTERNS[kind].finditer(case))
+        assert sorted(scanner.findings) == expected, f"{case!r}: scanner {sorted(scanner.findings)}, regex {expected}"
+    return len(cases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-chunk cost of incremental vs. re-scanning output filters.")
+    parser.add_argument("--tokens", type=int, nargs="+", default=[500, 2000, 8000])
+    args = parser.parse_args()
+
+    print(f"Differential self-check: scanner and regexes agree on {differential_check(EDGE_CASES + random_cases(5000))} strings.\n")
+    print("--- OUTPUT SCAN BENCHMARK (4-character chunks) ---")
+    print(f"{'TOKENS':>7} {'MODE':<12} {'mean/chunk':>11} {'p99/chunk':>10} {'total':>9} {'held':>5}  FINDINGS")
+    for tokens in args.tokens:
+        chunks = make_answer(tokens)
+        inc, inc_found, held = incremental(chunks)
+        full, full_found = rescan(chunks)
+        for mode, timings, found, hold in (("incremental", inc, inc_found, held), ("re-scan", full, full_found, "-")):
+            timings = sorted(timings)
+            print(f"{tokens:>7} {mode:<12} {sum(timings) / len(timings) * 1e6:>9.1f}us "
+                  f"{timings[int(len(timings) * 0.99)] * 1e6:>8.1f}us {sum(timings) * 1000:>7.1f}ms {hold:>5}  "
+                  f"{len(found)}" + ("" if mode == "re-scan" else "  (same)" if found == full_found else "  (DIFFER)"))
+
+
+if __name__ == "__main__":
+    main()
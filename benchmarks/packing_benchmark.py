@@ -0,0 +1,102 @@
+"""
+BENCHMARK: Prompt Packing (One Call per Proposal vs. N Proposals per Call)
+DESCRIPTION: Audits a synthetic portfolio through the Runner against a local
+Ollama stand-in that charges for prompt prefill as well as generation. Runs
+one call per proposal, then packs of several sizes, and reports the tokens
+and wall time per proposal and the number of fallback calls. With
+--malformed, the stub drops one answer from every packed reply to exercise
+the single-call fallback.
+
+USAGE:
+    python -m benchmarks.packing_benchmark --proposals 60 --sizes 2 5 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+ANSWER = "ROI plausible; main risk is delivery schedule."
+
+
+def _make_reply(malformed):
+    def reply(body):
+        # The packed prompt is the last user message; answer every alias it contains.
+        last = body["messages"][-1].get("content") or ""
+        aliases = list(dict.fromkeys(re.findall(r"<<<(P\d+)>>>", json.dumps(last))))
+        if not aliases:
+            return ANSWER
+        if malformed and len(aliases) > 1:
+            aliases = aliases[:-1]
+        return json.dumps({alias: ANSWER for alias in aliases})
+    return reply
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Tokens and time saved by packing proposals into one call.")
+    parser.add_argument("--proposals", type=int, default=60)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10], help="Pack sizes to compare.")
+    parser.add_argument("--slots", type=int, default=2, help="Parallel generation slots on the stub.")
+    parser.add_argument("--malformed", action="store_true", help="Drop one answer from every packed reply.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.05, token_latency=0.005, prompt_token_latency=0.002,
+                      num_parallel=args.slots, reply=_make_reply(args.malformed)).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, MODEL_WARMUP="0")
+    from google.adk.agents import Agent
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.prompt_packing import PackedBatch
+
+    agent = Agent(name="Portfolio_Auditor",
+                  instruction="You audit project proposals for strategic alignment, ROI and risk. "
+                              "Answer in one or two sentences per proposal. Be brief.",
+                  model=settings.get_model())
+    runner = settings.get_runner(agent)
+    portfolio = {f"Project_{i:04d}": f"Proposal {i}: modernise system {i % 17} for ${(i % 9) + 1}M."
+                 for i in range(args.proposals)}
+
+    async def ask(prompt):
+        user_id, session_id = await settings.initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text=prompt)])
+        text, usage = "", {}
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            if event.usage_metadata:
+                usage = {"prompt_tokens": event.usage_metadata.prompt_token_count,
+                         "completion_tokens": event.usage_metadata.candidates_token_count}
+            if event.is_final_response() and event.content and event.content.parts:
+                text = event.content.parts[0].text or ""
+        return text, usage
+
+    instruction = "Audit each proposal for strategic alignment and risk."
+    template = "Audit this proposal for strategic alignment and risk: {text}"
+
+    print(f"--- PACKING BENCHMARK ({args.proposals} proposals, backend with {args.slots} parallel slots) ---")
+    print(f"{'MODE':<12} {'calls':>6} {'tokens/item':>12} {'s/item':>8} {'tokens saved':>13} "
+          f"{'s saved':>8} {'fallbacks':>10}")
+    baseline = PackedBatch(ask, instruction, single_template=template)
+    await baseline.run_single(portfolio)
+    single = baseline.single_stats
+    per_item = (single["prompt_tokens"] + single["completion_tokens"]) / single["items"]
+    print(f"{'single':<12} {single['calls']:>6} {per_item:>12.1f} {single['elapsed'] / single['items']:>8.3f}")
+
+    for size in args.sizes:
+        packer = PackedBatch(ask, instruction, single_template=template, pack_size=size)
+        packer.single_stats = single  # Compare every pack size against the same baseline.
+        answers = await packer.run(portfolio)
+        assert len(answers) == len(portfolio)
+        s = packer.savings()
+        print(f"{f'packed x{size}':<12} {packer.packed_stats['calls']:>6} {s['packed']['tokens']:>12.1f} "
+              f"{s['packed']['seconds']:>8.3f} {s['tokens_saved']:>13.1f} {s['seconds_saved']:>8.3f} "
+              f"{packer.packed_stats['fallback_calls']:>10}")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+BENCHMARK: Crash and Resume of the Streaming Batch Pipeline
+DESCRIPTION: Streams a synthetic --proposals portfolio (JSONL, with some
+near-duplicates) through config/batch_pipeline.py in a child process, crashes
+it part-way, then resumes the run in this process. The worker stands in for
+an audit (a short sleep), since this exercises the pipeline, not the model.
+Two kinds of crash, each with and without --dedup:
+
+  * kill: SIGKILL once about a third of the results are on disk;
+  * torn: the process exits right after a result is flushed to the output,
+    before its checkpoint line (the window a kill can land in).
+
+Reports the audits each run made and the results the resume skipped.
+
+Self-check: after the resume, every input ID appears in the output exactly
+once (no duplicates, none missing).
+
+USAGE:
+    python -m benchmarks.pipeline_benchmark --proposals 400 --dedup 0.8
+"""
+import argparse
+import asyncio
+import collections
+import json
+import multiprocessing
+import os
+import random
+import signal
+import tempfile
+import time
+
+SYSTEMS = ["ERP", "CRM", "data lake", "HR portal", "billing", "service desk", "warehouse", "identity"]
+
+
+def write_portfolio(path, n, seed=7):
+    """Writes n proposals; about one in five is a reworded copy of an earlier one."""
+    rng = random.Random(seed)
+    texts = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            if texts and rng.random() < 0.2:
+                text = rng.choice(texts).replace("Migrate", "Move").rstrip(".")
+            else:
+                text = (f"Migrate the {rng.choice(SYSTEMS)} for region {i} to a managed cloud service, "
+                        f"retire {rng.randrange(2, 40)} on-prem servers and cut licence spend by {rng.randrange(5, 60)}%.")
+            texts.append(text)
+            f.write(json.dumps({"id": f"P{i:05d}", "proposal": text}) + "\n")
+
+
+async def audit(key, text):
+    await asyncio.sleep(random.uniform(0.005, 0.02))
+    return f"Audit of {key}: {len(text)} characters, fit 2026 strategy."
+
+
+def run(paths, dedup, calls):
+    from config.batch_pipeline import run_pipeline
+
+    async def worker(key, text):
+        calls.append(key)
+        return await audit(key, text)
+
+    return run_pipeline(worker, paths["input"], paths["output"], text_field="proposal", dedup=dedup, report=None)
+
+
+def crashing_run(paths, dedup, exit_at_mark):
+    """Child process: runs the pipeline; with exit_at_mark, dies just before that checkpoint line."""
+    if exit_at_mark:
+        from config import batch_pipeline
+
+        mark, count = batch_pipeline.Checkpoint.mark, [0]
+
+        def torn_mark(self, *args):
+            count[0] += 1
+            if count[0] == exit_at_mark:
+                os._exit(1)  # The result is in the output; its checkpoint line is not.
+            return mark(self, *args)
+
+        batch_pipeline.Checkpoint.mark = torn_mark
+    asyncio.run(run(paths, dedup, []))
+
+
+def output_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def crash(paths, dedup, mode, proposals):
+    ctx = multiprocessing.get_context("spawn")
+    child = ctx.Process(target=crashing_run, args=(paths, dedup, proposals // 3 if mode == "torn" else 0))
+    child.start()
+    if mode == "kill":
+        while child.is_alive() and (not os.path.exists(paths["output"])
+                                    or len(output_ids(paths["output"])) < proposals // 3):
+            time.sleep(0.005)
+        os.kill(child.pid, signal.SIGKILL)
+    child.join()
+    return len(output_ids(paths["output"])) if os.path.exists(paths["output"]) else 0
+
+
+async def scenario(args, mode, dedup):
+    workdir = tempfile.mkdtemp(prefix="pipeline_")
+    paths = {"input": os.path.join(workdir, "portfolio.jsonl"), "output": os.path.join(workdir, "audit.jsonl")}
+    write_portfolio(paths["input"], args.proposals)
+    before = crash(paths, dedup, mode, args.proposals)
+    calls = []
+    stats = await run(paths, dedup, calls)
+    ids = output_ids(paths["output"])
+    expected = {f"P{i:05d}" for i in range(args.proposals)}
+    duplicates = sorted(key for key, n in collections.Counter(ids).items() if n > 1)
+    missing = sorted(expected - set(ids))
+    return before, stats["skipped"], len(calls), duplicates, missing
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Crash a pipeline run part-way and resume it.")
+    parser.add_argument("--proposals", type=int, default=400)
+    parser.add_argument("--dedup", type=float, default=0.8, help="Jaccard threshold of the dedup scenarios.")
+    args = parser.parse_args()
+
+    print(f"--- PIPELINE CRASH/RESUME BENCHMARK ({args.proposals} proposals) ---")
+    print(f"{'SCENARIO':<20} {'lines at crash':>14} {'skipped':>8} {'resumed audits':>15} {'dup':>4} {'missing':>8}")
+    for dedup in (None, args.dedup):
+        for mode in ("kill", "torn"):
+            name = f"{mode}" + (f", dedup {dedup}" if dedup is not None else "")
+            before, skipped, resumed, duplicates, missing = await scenario(args, mode, dedup)
+            print(f"{name:<20} {before:>14} {skipped:>8} {resumed:>15} {len(duplicates):>4} {len(missing):>8}")
+            assert not duplicates, f"{name}: {len(duplicates)} IDs written twice, e.g. {duplicates[:3]}"
+            assert not missing, f"{name}: {len(missing)} IDs never written, e.g. {missing[:3]}"
+    print(f"Self-check: after every crash the resumed output holds each of the {args.proposals} IDs exactly once.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
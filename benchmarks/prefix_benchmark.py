@@ -0,0 +1,126 @@
+"""
+BENCHMARK: Prefix-Stable Prompts and KV-Cache Reuse
+DESCRIPTION: A local Ollama stand-in with simulated KV-cache reuse
+(`prefix_cache=True`: only the part of a prompt after the prefix shared with
+a slot's last prompt is prefilled) serves a workshop of --users sessions
+taking turns, --turns each. The agent's instruction is long and stable but
+carries the session ID and a timestamp, as personalised instructions do, and
+it has four tools. The workshop runs with plain prompt assembly and then with
+PREFIX_STABLE (config/prompt_prefix.py). Reports the prompt tokens Ollama
+evaluated (prompt_eval_count), the tokens served from cache and wall time.
+With PREFIX_STABLE on, it also prints the meter's own estimate of the reuse.
+Before the workshop it checks that consecutive turns of one session share a
+prefix covering every message of the earlier turn (check_turn_prefix).
+
+USAGE:
+    python -m benchmarks.prefix_benchmark --users 4 --turns 5 --slots 2
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+POLICY = ("You are the Strategy Suite's CIO advisor. Ground every recommendation in ROI, risk and the 2026 "
+          "strategic priorities: agentic automation, data governance, cost discipline and talent. ") * 12
+
+
+def market_research(query: str) -> str:
+    """Searches market intelligence for a query."""
+    return "Market is growing 20% a year."
+
+
+def calculate_roi(cost: float, gain: float) -> str:
+    """Calculates the ROI of a project."""
+    return f"ROI {(gain - cost) / cost:.0%}"
+
+
+def risk_register(project: str) -> str:
+    """Lists the top risks of a project."""
+    return "Delivery slippage; vendor lock-in."
+
+
+def budget_status(unit: str) -> str:
+    """Returns the remaining budget of a business unit."""
+    return "$1.2M remaining."
+
+
+def check_turn_prefix(turns=4):
+    """Asserts that the prompt of turn N+1 starts with every message of turn N, up to turn N's own text."""
+    from config.prompt_prefix import CONTEXT_HEADER, PrefixStableLayer, render_prompt
+
+    layer = PrefixStableLayer()
+    history, previous = [], None
+    for turn in range(turns):
+        system = {"role": "system", "content": f"{POLICY}\nSession ID: 3f2a9c1e-1b2c-4d5e-8f90-123456789abc\n"
+                                               f"Current time: 2026-10-18T09:{turn:02d}:00\nBe brief."}
+        question = {"role": "user", "content": f"Question {turn}: what next?"}
+        messages, _ = layer.assemble([system, *history, question], None)
+        assert CONTEXT_HEADER in messages[-1]["content"] and not any(
+            CONTEXT_HEADER in m["content"] for m in messages[:-1]), "context must ride on the newest turn only"
+        if previous is not None:
+            assert messages[:len(previous) - 1] == previous[:-1], "an earlier message changed between turns"
+            assert messages[len(previous) - 1] == history[-2], "the previous turn's text changed"
+            prompt, before = render_prompt({"messages": messages}), render_prompt({"messages": previous})
+            covered = prompt.startswith(before[:before.index(CONTEXT_HEADER) - len("\\n\\n")])
+            assert covered, "turn N+1 does not start with every message of turn N"
+        history += [question, {"role": "assistant", "content": f"Answer {turn}."}]
+        previous = messages
+    return turns
+
+
+async def run_workshop(settings, stub, args, stable):
+    from google.adk.agents import Agent
+
+    settings.PREFIX_STABLE = stable
+
+    def instruction(ctx):
+        return (f"{POLICY}\nSession ID: {ctx.session.id}\n"
+                f"Current time: {datetime.datetime.now().isoformat(timespec='seconds')}\nBe brief.")
+
+    agent = Agent(name="CIO_Advisor", instruction=instruction, model=settings.get_model(),
+                  tools=[risk_register, market_research, calculate_roi, budget_status])
+    runner = settings.get_runner(agent)
+    sessions = [await settings.initialize_session() for _ in range(args.users)]
+    evaluated, cached_before, t0 = 0, stub.stats["cached_tokens"], time.perf_counter()
+    for turn in range(args.turns):
+        for user_id, session_id in sessions:  # Users take turns, like a live workshop.
+            content = types.Content(role="user", parts=[types.Part(text=f"Question {turn}: what next?")])
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                if event.usage_metadata and event.usage_metadata.prompt_token_count:
+                    evaluated += event.usage_metadata.prompt_token_count
+    elapsed = time.perf_counter() - t0
+    await settings.cleanup()
+    return evaluated, stub.stats["cached_tokens"] - cached_before, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Prompt tokens evaluated with and without prefix-stable prompts.")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--slots", type=int, default=2, help="Parallel slots (KV caches) on the stub.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.02, token_latency=0.002, prompt_token_latency=0.0005,
+                      num_parallel=args.slots, prefix_cache=True).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0",
+                      ADMISSION_SLOTS=str(args.slots))
+    from config import settings  # Imported after the endpoint is set.
+
+    print(f"Turn prefix check: {check_turn_prefix()} turns, each prompt starts with every message of the one "
+          f"before (volatile lines ride on the newest turn only).")
+    print(f"--- PREFIX BENCHMARK ({args.users} users x {args.turns} turns, {args.slots} KV-cache slots) ---")
+    print(f"{'MODE':<16} {'evaluated':>10} {'cached':>8} {'time':>8}")
+    for stable in (False, True):
+        evaluated, cached, elapsed = await run_workshop(settings, stub, args, stable)
+        print(f"{'prefix-stable' if stable else 'plain':<16} {evaluated:>10} {cached:>8} {elapsed:>7.2f}s")
+    print(settings.get_prefix_meter().report())
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+BENCHMARK: Exact-Match Response Cache
+DESCRIPTION: Runs the same executive query twice, in fresh sessions, against
+a local Ollama stand-in (benchmarks/ollama_stub.py) with RESPONSE_CACHE on,
+once without and once with streaming. The first run is a miss that reaches
+the stub; the second should be served from config/response_cache.py.
+
+Self-check: the repeat sends no chat request to the stub, and its final event
+carries the same text and the same usage metadata (prompt and candidate
+token counts) as the original, for both the plain and the streamed call.
+
+USAGE:
+    python -m benchmarks.response_cache_benchmark --token-latency 0.01
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from google.adk.agents import Agent
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+
+async def run_query(settings, runner, run_config, prompt):
+    user_id, session_id = await settings.initialize_session()
+    content = types.Content(role="user", parts=[types.Part(text=prompt)])
+    text, usage = "", None
+    t0 = time.perf_counter()
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                                        run_config=run_config):
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+            usage = event.usage_metadata
+    return text, usage, time.perf_counter() - t0
+
+
+def token_counts(usage):
+    return (usage.prompt_token_count, usage.candidates_token_count) if usage else None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Miss vs. replayed hit of the response cache.")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Simulated seconds per token.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, token_latency=args.token_latency).start()
+    workdir = tempfile.mkdtemp(prefix="response_cache_")
+    os.environ.update(OLLAMA_API_BASE=stub.url, MODEL_WARMUP="0", RESPONSE_CACHE="1",
+                      RESPONSE_CACHE_PATH=os.path.join(workdir, "responses.db"))
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    from config import settings  # Imported after the endpoint and cache path are set.
+
+    print("--- RESPONSE CACHE BENCHMARK (local stand-in) ---")
+    print(f"{'MODE':<10} {'RUN':<6} {'chat calls':>10} {'time':>8} {'tokens (prompt, out)':>22}")
+    for streaming in (False, True):
+        mode = "stream" if streaming else "plain"
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+        agent = Agent(name="Cache_Probe", instruction="You are a CIO Strategy Analyst.", model=settings.get_model())
+        runner = settings.get_runner(agent)
+        prompt = f"Summarize our AI strategy in one line ({mode})."
+        results = []
+        for run in ("miss", "hit"):
+            before = stub.stats["chat"]
+            text, usage, elapsed = await run_query(settings, runner, run_config, prompt)
+            requests = stub.stats["chat"] - before
+            results.append((text, token_counts(usage), requests))
+            print(f"{mode:<10} {run:<6} {requests:>10} {elapsed:>7.3f}s {str(token_counts(usage)):>22}")
+
+        (miss_text, miss_usage, miss_requests), (hit_text, hit_usage, hit_requests) = results
+        assert miss_requests == 1, f"{mode}: the first call should reach the model ({miss_requests} requests)"
+        assert hit_requests == 0, f"{mode}: the repeat reached the model ({hit_requests} requests)"
+        assert miss_usage and all(miss_usage), f"{mode}: the original call reported no usage ({miss_usage})"
+        assert hit_text == miss_text, f"{mode}: replayed text differs: {hit_text!r} vs {miss_text!r}"
+        assert hit_usage == miss_usage, f"{mode}: replayed usage {hit_usage} differs from {miss_usage}"
+        print(f"Self-check ({mode}): the repeat made no model call and replayed the same text and usage.")
+
+    print(f"Cache stats: {settings.get_response_cache().stats}")
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
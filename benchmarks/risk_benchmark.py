@@ -0,0 +1,52 @@
+"""
+BENCHMARK: Monte Carlo ROI Risk Simulation
+DESCRIPTION: Runs the Lesson 10 proposal (investment $2M-$4.5M, savings
+$1M-$2.6M a year, 0-12 months of delay, 3 years) through RiskSimulator
+(config/risk_simulation.py) with each worker count in --workers. Reports the
+first run (including starting the process pool), a warm run with new
+parameters, a repeated question served from the cache, and whether every
+worker count produced identical statistics for the same seed.
+
+USAGE:
+    python -m benchmarks.risk_benchmark --draws 1000000 --workers 1 2 4
+"""
+import argparse
+import os
+import time
+
+from config.risk_simulation import RiskSimulator
+
+INVESTMENT, SAVINGS, DELAY = (2e6, 3e6, 4.5e6), (1e6, 2e6, 2.6e6), (0, 3, 12)
+
+
+def timed(simulator, investment=INVESTMENT):
+    t0 = time.perf_counter()
+    result = simulator.run(investment, SAVINGS, DELAY, 3)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and reproducibility of the Monte Carlo risk tool.")
+    parser.add_argument("--draws", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    print(f"--- RISK BENCHMARK ({args.draws:,} draws, {os.cpu_count()} CPUs) ---")
+    print(f"{'WORKERS':>7} {'first run':>10} {'warm run':>9} {'cached':>8}  P50 ROI  P(ROI<0)  95% VaR")
+    results = []
+    for workers in args.workers:
+        simulator = RiskSimulator(workers=workers, draws=args.draws)
+        first, result = timed(simulator)
+        warm, _ = timed(simulator, investment=(2.2e6, 3.1e6, 4.6e6))
+        cached, again = timed(simulator)
+        simulator.close()
+        assert again["cached"]
+        results.append({k: result[k] for k in ("percentiles", "p_negative", "value_at_risk")})
+        print(f"{workers:>7} {first * 1000:>8.0f}ms {warm * 1000:>7.0f}ms {cached * 1e6:>6.0f}us  "
+              f"{result['percentiles'][50]:>7.1%} {result['p_negative']:>9.2%}  ${result['value_at_risk']:,.0f}")
+    same = all(r == results[0] for r in results)
+    print(f"Same seed, every worker count: {'identical statistics' if same else 'RESULTS DIFFER'}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+BENCHMARK: Early Termination of Templated Memos
+DESCRIPTION: A local Ollama stand-in writes the Lesson 03 memo (four required
+## sections), then keeps going the way small models do: an extra section and
+some sign-off text of random length. Each memo is streamed to completion,
+then streamed again with a SectionParser that stops generation once RISK
+MITIGATION is complete. Reports the decode tokens actually generated (counted
+by the stub) and wall time per memo, plus the tokens saved, and checks that
+the early stop kept every line of RISK MITIGATION.
+
+USAGE:
+    python -m benchmarks.section_benchmark --memos 10 --max-tail 300
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import random
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+REQUIRED = ["EXECUTIVE SUMMARY", "CURRENT STATE vs. FUTURE STATE", "STRATEGIC RECOMMENDATION", "RISK MITIGATION"]
+MEMO = (
+    "## EXECUTIVE SUMMARY\nRPA automates tasks while agentic AI automates outcomes. The shift moves "
+    "automation from scripts to goals.\n\n"
+    "## CURRENT STATE vs. FUTURE STATE\n- RPA: fast but brittle, breaks when screens change.\n"
+    "- Agents: adaptive, reason over exceptions.\n\n"
+    "## STRATEGIC RECOMMENDATION\nPilot one agentic workflow in finance operations this quarter.\n\n"
+    "## RISK MITIGATION\nTop three risks:\n\n1. Governance of autonomous actions: require human approval "
+    "for payments.\n2. Vendor lock-in.\n\n3. Skills gap in the automation team.\n\n"
+    "### Vendor lock-in\nKeep prompts and tools portable across model providers.\n\n"
+    "### Data residency\nRun the finance pilot on the on-prem Ollama pool.\n\n"
+)
+
+
+def _memo_with_tail(rng, max_tail):
+    tail = " ".join(rng.choice(["Additionally,", "the", "team", "should", "consider", "next", "steps."])
+                    for _ in range(rng.randint(max_tail // 4, max_tail)))
+    return MEMO + "## NEXT STEPS\n" + tail + "\n\nLet me know if you need anything else!"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Decode tokens saved by stopping after the last required section.")
+    parser.add_argument("--memos", type=int, default=10)
+    parser.add_argument("--max-tail", type=int, default=300, help="Most tokens written after the template.")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    replies = [_memo_with_tail(rng, args.max_tail) for _ in range(args.memos)]
+    current = {"reply": replies[0]}
+    stub = OllamaStub(load_latency=0, first_token_latency=0.1, token_latency=0.01,
+                      reply=lambda body: current["reply"]).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0", MODEL_COALESCE="0")
+    from google.adk.agents import Agent
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.section_parser import SectionParser
+    from config.streaming import StreamRenderer
+
+    # A stopped stream carries no usage metadata, and ADK's telemetry warns about each one.
+    logging.getLogger("google_adk.google.adk.telemetry._metrics").setLevel(logging.ERROR)
+    agent = Agent(name="Executive_Communicator", instruction="You are a Strategy Chief of Staff.",
+                  model=settings.get_model())
+    runner = settings.get_runner(agent)
+
+    async def memo(i, early_stop):
+        current["reply"] = replies[i]
+        user_id, session_id = await settings.initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text=f"Write memo {i} in the template.")])
+        renderer = StreamRenderer(stream=True, out=io.StringIO())
+        section_parser = SectionParser(REQUIRED) if early_stop else None
+        before, t0 = stub.stats["tokens"], time.perf_counter()
+        await renderer.run(runner, user_id, session_id, content, parser=section_parser)
+        elapsed = time.perf_counter() - t0
+        await asyncio.sleep(0.05)  # Let the stub notice the hang-up before reading its counter.
+        missing = section_parser.missing() if section_parser else []
+        cut = bool(section_parser) and "Data residency\nRun" not in section_parser.text()
+        return stub.stats["tokens"] - before, elapsed, missing, cut
+
+    print(f"--- SECTION BENCHMARK ({args.memos} memos, up to {args.max_tail} tokens past the template) ---")
+    print(f"{'MODE':<12} {'tokens/memo':>12} {'s/memo':>8}  NOTES")
+    results = {}
+    for early_stop in (False, True):
+        runs = [await memo(i, early_stop) for i in range(args.memos)]
+        tokens = sum(r[0] for r in runs) / args.memos
+        seconds = sum(r[1] for r in runs) / args.memos
+        incomplete = sum(bool(r[2]) for r in runs)
+        cut = sum(r[3] for r in runs)
+        results[early_stop] = (tokens, seconds)
+        note = f"{incomplete} memos missing a section, {cut} cut inside RISK MITIGATION" if early_stop else ""
+        print(f"{'early stop' if early_stop else 'full decode':<12} {tokens:>12.1f} {seconds:>7.2f}s  {note}")
+    saved_tokens = results[False][0] - results[True][0]
+    saved_seconds = results[False][1] - results[True][1]
+    print(f"Saved {saved_tokens:.1f} decode tokens and {saved_seconds:.2f}s per memo "
+          f"({saved_tokens / results[False][0]:.0%} of the decode).")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
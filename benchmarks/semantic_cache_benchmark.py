@@ -0,0 +1,110 @@
+"""
+BENCHMARK: Semantic Cache Hits vs. Threshold
+DESCRIPTION: Asks a seed question once, then a set of probes (rewordings,
+questions on the same template, a different figure), in fresh sessions,
+against a local Ollama stand-in (benchmarks/ollama_stub.py) with
+SEMANTIC_CACHE on and the dependency-free HashingEmbedder, at each
+--thresholds value. The stub answers with the question it was asked, so a
+replayed answer is easy to spot.
+
+Self-check: a probe is served from the cache (no chat call to the stub, the
+stored answer replayed) exactly when its best similarity to a stored question
+with the same numbers clears the threshold; every other probe reaches the
+model and gets its own answer. The similarity column is that best match
+(n/a: no stored question mentions the same numbers).
+
+USAGE:
+    python -m benchmarks.semantic_cache_benchmark --thresholds 0.9 0.75
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from google.adk.agents import Agent
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+SEED = "Should we migrate our ERP to the cloud by 2026?"
+PROBES = [
+    "should we migrate our ERP to the cloud by 2026",             # case and punctuation
+    "By 2026, should we migrate our ERP to the cloud?",           # word order
+    "Should we migrate the ERP to the cloud by 2026, in short?",  # filler words
+    "Should we migrate our CRM to the cloud by 2026?",            # same template, different system
+    "Is moving the ERP to a cloud provider worth it by 2026?",    # true paraphrase
+    "Should we migrate our ERP to the cloud by 2027?",            # different figure
+]
+
+
+def answer(body):
+    question = next(m["content"] for m in reversed(body["messages"]) if m.get("role") == "user")
+    return f"Stub answer to: {question}"
+
+
+async def ask(settings, runner, question):
+    user_id, session_id = await settings.initialize_session()
+    content = types.Content(role="user", parts=[types.Part(text=question)])
+    text = ""
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+    return text
+
+
+async def run_threshold(settings, stub, threshold):
+    from config.semantic_cache import _numbers
+
+    settings.SEMANTIC_CACHE_THRESHOLD = threshold
+    settings.SEMANTIC_CACHE_DIR = tempfile.mkdtemp(prefix="semantic_cache_")
+    agent = Agent(name="Semantic_Probe", instruction="You are a CIO Strategy Analyst.", model=settings.get_model())
+    runner = settings.get_runner(agent)
+    embedder = settings._SEMANTIC_EMBEDDER
+    # (vector, numbers, answer) of every question the cache has stored so far.
+    stored = [(await embedder.embed(SEED), _numbers(SEED), await ask(settings, runner, SEED))]
+
+    print(f"\nthreshold {threshold:.2f}")
+    print(f"{'PROBE':<60} {'similarity':>10} {'result':>7}")
+    hits = 0
+    for probe in PROBES:
+        vector, numbers = await embedder.embed(probe), _numbers(probe)
+        matches = [(float(vector @ v), a) for v, n, a in stored if n == numbers]
+        similarity, expected_answer = max(matches, key=lambda m: m[0], default=(None, None))
+        expected = similarity is not None and similarity >= threshold
+        before = stub.stats["chat"]
+        text = await ask(settings, runner, probe)
+        hit = stub.stats["chat"] == before
+        hits += hit
+        shown = "n/a" if similarity is None else f"{similarity:.3f}"
+        print(f"{probe:<60} {shown:>10} {'HIT' if hit else 'miss':>7}")
+        assert hit == expected, (f"threshold {threshold}: {probe!r} (similarity {shown}) was a "
+                                 f"{'hit' if hit else 'miss'}, expected a {'hit' if expected else 'miss'}")
+        if hit:
+            assert text == expected_answer, f"threshold {threshold}: {probe!r} replayed {text!r}"
+        else:
+            assert text == answer({"messages": [{"role": "user", "content": probe}]}), text
+            stored.append((vector, numbers, text))
+    await settings.cleanup()
+    return hits
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Semantic cache hits and misses around the threshold.")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.9, 0.75])
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, token_latency=0.001, reply=answer).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, MODEL_WARMUP="0", SEMANTIC_CACHE="1",
+                      SEMANTIC_CACHE_EMBEDDER="hashing")
+    from config import settings  # Imported after the endpoint is set.
+
+    print(f"--- SEMANTIC CACHE BENCHMARK (seed: {SEED!r}, HashingEmbedder, local stand-in) ---")
+    for threshold in args.thresholds:
+        hits = await run_threshold(settings, stub, threshold)
+        print(f"Self-check (threshold {threshold:.2f}): {hits}/{len(PROBES)} hits, each one at or above the "
+              "threshold with the same figures; every other probe reached the model.")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
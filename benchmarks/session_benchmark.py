@@ -0,0 +1,150 @@
+"""
+BENCHMARK: Session Service Latency (In-Memory vs. SQLite)
+DESCRIPTION: Compares create/append/get latency of the default
+InMemorySessionService against the durable SQLiteSessionService and the
+bounded in-process BoundedSessionService.
+
+USAGE:
+    python -m benchmarks.session_benchmark                      # 10k sessions x 200 events
+    python -m benchmarks.session_benchmark --sessions 500 --events 50
+
+Append latency is reported separately for the first and last 10% of each
+session's history, so a service whose append cost grows with history length
+shows up immediately. A self-check first grows one session past a tiny
+max_bytes and asserts that BoundedSessionService keeps it while evicting the
+others. A second one keeps a turn in flight on one session while another
+session's activity triggers TTL expiry (idle_ttl) and then LRU eviction
+(max_sessions), and asserts that the in-flight turn can still append its
+answer.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from config.bounded_sessions import BoundedSessionService
+from config.sqlite_sessions import SQLiteSessionService
+
+APP_NAME = "session_benchmark"
+
+
+def _make_event(turn):
+    author = "user" if turn % 2 == 0 else "Strategy_Agent"
+    role = "user" if turn % 2 == 0 else "model"
+    return Event(
+        invocation_id=f"inv-{turn // 2}",
+        author=author,
+        content=types.Content(role=role, parts=[types.Part(text=f"Turn {turn}: quarterly roadmap update.")]),
+    )
+
+
+def _summary(label, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99) - 1] * 1e6
+    mean = statistics.fmean(samples) * 1e6
+    return f"  {label:<22} mean={mean:9.1f}us  p50={p50:9.1f}us  p99={p99:9.1f}us"
+
+
+async def run_benchmark(service, sessions, events):
+    create, append_early, append_late, get = [], [], [], []
+    early_cutoff, late_cutoff = events // 10, events - events // 10
+
+    for s in range(sessions):
+        session_id = str(uuid.uuid4())
+        t0 = time.perf_counter()
+        session = await service.create_session(app_name=APP_NAME, user_id=f"exec_{s % 100}", session_id=session_id)
+        create.append(time.perf_counter() - t0)
+
+        for turn in range(events):
+            event = _make_event(turn)
+            t0 = time.perf_counter()
+            await service.append_event(session, event)
+            elapsed = time.perf_counter() - t0
+            if turn < early_cutoff:
+                append_early.append(elapsed)
+            elif turn >= late_cutoff:
+                append_late.append(elapsed)
+
+        t0 = time.perf_counter()
+        await service.get_session(app_name=APP_NAME, user_id=f"exec_{s % 100}", session_id=session_id)
+        get.append(time.perf_counter() - t0)
+
+    await service.flush()
+    return create, append_early, append_late, get
+
+
+async def check_active_session_kept(events=40):
+    """One session outgrows max_bytes on its own: the others go, it stays whole."""
+    service = BoundedSessionService(max_bytes=4096)
+    idle = await service.create_session(app_name=APP_NAME, user_id="exec_idle")
+    for turn in range(2):  # A finished turn: the session is no longer pinned.
+        await service.append_event(idle, _make_event(turn))
+    session = await service.create_session(app_name=APP_NAME, user_id="exec_large")
+    for turn in range(events):
+        await service.append_event(session, _make_event(turn))
+    kept = await service.get_session(app_name=APP_NAME, user_id="exec_large", session_id=session.id)
+    assert kept is not None and len(kept.events) == events, "the session being written was evicted"
+    assert await service.get_session(app_name=APP_NAME, user_id="exec_idle", session_id=idle.id) is None
+    print(f"Self-check: a {service.resident_bytes / 1024:.0f} KB session under a 4 KB budget keeps all "
+          f"{events} events; {service.stats['evicted']} idle session evicted.")
+
+
+async def check_in_flight_session_kept():
+    """A turn in flight on one session survives TTL expiry and LRU eviction driven by another session."""
+    for name, service in (("idle_ttl=0.1", BoundedSessionService(idle_ttl=0.1)),
+                          ("max_sessions=2", BoundedSessionService(max_sessions=2))):
+        busy = await service.create_session(app_name=APP_NAME, user_id="exec_busy")
+        await service.append_event(busy, _make_event(0))  # The question; the model is now answering.
+        for user in ("exec_other", "exec_third"):
+            await asyncio.sleep(0.2)  # Past idle_ttl for every session created so far.
+            other = await service.create_session(app_name=APP_NAME, user_id=user)
+            for turn in range(2):
+                await service.append_event(other, _make_event(turn))
+        await service.append_event(busy, _make_event(1))  # Raises "not found" if the session was evicted.
+        kept = await service.get_session(app_name=APP_NAME, user_id="exec_busy", session_id=busy.id)
+        assert kept is not None and len(kept.events) == 2, f"{name}: the in-flight session lost its turn"
+        removed = service.stats["expired"] + service.stats["evicted"]
+        assert removed, f"{name}: nothing was evicted, so the check proved nothing"
+        print(f"Self-check ({name}): the in-flight session kept its turn while {removed} other session(s) went.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    await check_active_session_kept()
+    await check_in_flight_session_kept()
+    with tempfile.TemporaryDirectory() as tmp:
+        services = {
+            "InMemorySessionService": InMemorySessionService(),
+            "SQLiteSessionService": SQLiteSessionService(db_path=os.path.join(tmp, "bench.db")),
+            "BoundedSessionService": BoundedSessionService(max_sessions=1_000),
+        }
+        print(f"--- SESSION BENCHMARK: {args.sessions} sessions x {args.events} events ---")
+        for name, service in services.items():
+            start = time.perf_counter()
+            create, early, late, get = await run_benchmark(service, args.sessions, args.events)
+            total = time.perf_counter() - start
+            print(f"\n{name} (total {total:.1f}s)")
+            print(_summary("create_session", create))
+            print(_summary("append_event (early)", early))
+            print(_summary("append_event (late)", late))
+            print(_summary("get_session (full)", get))
+            if isinstance(service, BoundedSessionService):
+                print(f"  resident: {len(service._entries)} sessions, {service.resident_bytes / 1e6:.1f} MB, {service.stats}")
+            if isinstance(service, SQLiteSessionService):
+                service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
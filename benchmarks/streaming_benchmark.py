@@ -0,0 +1,67 @@
+"""
+BENCHMARK: Perceived Latency of Long Answers (Final-Response vs. Token Streaming)
+DESCRIPTION: Asks a local Ollama stand-in for a long, roadmap-sized answer
+through the Runner and StreamRenderer, with streaming off and on. Reports
+time to first visible text (what the reader perceives), total time, decode
+rate and inter-token latency per mode.
+
+USAGE:
+    python -m benchmarks.streaming_benchmark --tokens 400 --runs 3
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Time to first token with and without streaming.")
+    parser.add_argument("--tokens", type=int, default=400, help="Length of the simulated answer in tokens.")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Seconds per generated token.")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    reply = " ".join(f"roadmap{i % 50}" for i in range(args.tokens))
+    stub = OllamaStub(load_latency=0, first_token_latency=0.3, token_latency=args.token_latency,
+                      reply=reply).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0", MODEL_COALESCE="0")
+    from google.adk.agents import Agent
+
+    from config import settings  # Imported after the endpoint is set.
+    from config.streaming import StreamRenderer
+
+    agent = Agent(name="Roadmap_Architect", instruction="You are a Lead Strategy Architect.",
+                  model=settings.get_model())
+    runner = settings.get_runner(agent)
+
+    print(f"--- STREAMING BENCHMARK ({args.tokens}-token answer, {args.runs} runs per mode) ---")
+    print(f"{'MODE':<12} {'TTFT':>8} {'total':>8} {'tokens/s':>9} {'ITL p50':>9} {'ITL p99':>9}")
+    for stream in (False, True):
+        metrics = []
+        for i in range(args.runs):
+            user_id, session_id = await settings.initialize_session()
+            content = types.Content(role="user", parts=[types.Part(text=f"Draft the 5-year roadmap (run {i}).")])
+            renderer = StreamRenderer(stream=stream, out=io.StringIO())
+            await renderer.run(runner, user_id, session_id, content)
+            metrics.append(renderer.calls[-1].as_dict())
+
+        def mean(field):
+            return statistics.mean(m[field] for m in metrics)
+        if stream:
+            decode = (f"{mean('tokens_per_second'):>9.1f} {mean('inter_token_p50') * 1000:>7.0f}ms "
+                      f"{mean('inter_token_p99') * 1000:>7.0f}ms")
+        else:
+            decode = f"{'-':>9} {'-':>9} {'-':>9}"  # Tokens are not visible until the end.
+        print(f"{'streaming' if stream else 'final only':<12} {mean('ttft'):>7.2f}s {mean('total'):>7.2f}s {decode}")
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
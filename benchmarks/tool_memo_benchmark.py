@@ -0,0 +1,155 @@
+"""
+BENCHMARK: Pure-Tool Memoization
+DESCRIPTION: Two views of config/tool_memo.py.
+
+  1. Hit rates, on --calls ROI calls drawn from --projects distinct projects,
+     each figure spelled the way a model might (3000000, 3e6, "3000000",
+     "$3M", "3,000,000"): Lesson 21's calculate_roi behind a cache keyed on
+     the raw arguments (functools.lru_cache) vs. the same tool with @pure,
+     which keys on canonical amounts. Also reports the cost of a memo hit.
+  2. Agent sessions, on a local Ollama stand-in that answers with tool calls:
+     --sessions sessions of the Lesson 21 advisor, each checking the archive
+     (a lookup with --lookup-latency, standing in for a vector database) and
+     the Gateway ROI with freshly spelled figures. Reports tool executions,
+     memo hits and wall time with TOOL_MEMO off and on.
+
+USAGE:
+    python -m benchmarks.tool_memo_benchmark --calls 20000 --projects 200 --sessions 10
+"""
+import argparse
+import asyncio
+import functools
+import importlib.util
+import os
+import random
+import time
+
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_lesson_21():
+    path = os.path.join(REPO_ROOT, "Lessons", "21_final_executive_dashboard.py")
+    spec = importlib.util.spec_from_file_location("lesson_21", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def spell(amount, rng):
+    """One of the ways a model writes the same amount."""
+    return rng.choice([amount, float(amount), str(amount), f"{amount:,}", f"{amount:e}", f"${amount / 1e6:g}M"])
+
+
+def make_calls(n, projects, seed=5):
+    rng = random.Random(seed)
+    figures = [(rng.randrange(100_000, 5_000_000, 100_000), rng.randrange(50_000, 3_000_000, 50_000))
+               for _ in range(projects)]
+    return [tuple(spell(v, rng) for v in rng.choice(figures)) for _ in range(n)]
+
+
+def hit_rates(lesson, settings, calls):
+    raw = functools.lru_cache(maxsize=4096)(lesson.calculate_roi.__wrapped__)
+    t0 = time.perf_counter()
+    for investment, savings in calls:
+        raw(investment, savings)
+    raw_seconds = time.perf_counter() - t0
+    info = raw.cache_info()
+
+    memo = settings.get_tool_memo()
+    memo.clear()
+    t0 = time.perf_counter()
+    for investment, savings in calls:
+        lesson.calculate_roi(investment, savings)
+    memo_seconds = time.perf_counter() - t0
+    stats = memo.stats["calculate_roi"]
+    return (info.hits, raw_seconds), (stats["hits"], memo_seconds)
+
+
+async def agent_sessions(settings, stub, lesson, sessions, latency, seed=9):
+    from google.adk.agents import Agent
+
+    from config.finance import portfolio_financials
+    from config.tool_memo import pure
+
+    @pure
+    async def fetch_archive(topic: str) -> str:
+        """Retrieves post-mortems for a topic from the institutional archive (vector search)."""
+        await asyncio.sleep(latency)
+        return await lesson.fetch_history.__wrapped__(topic)
+
+    rng = random.Random(seed)
+
+    def reply(body):
+        done = sum(1 for m in body["messages"] if m.get("role") == "tool")
+        if done == 0:
+            return {"tool_calls": [{"function": {"name": "fetch_archive", "arguments": {"topic": "AI Gateway"}}}]}
+        if done == 1:
+            arguments = {"investment": spell(3_000_000, rng), "savings": spell(6_500_000, rng)}
+            return {"tool_calls": [{"function": {"name": "calculate_roi", "arguments": arguments}}]}
+        return "GO: the Gateway clears the hurdle rate; monitor latency as the 2024 lesson advises."
+
+    stub.reply = reply
+    agent = Agent(name="Global_CIO_Advisor", model=settings.get_model(),
+                  instruction="You are the Lead Strategic Advisor. Check the archive and the ROI first.",
+                  tools=[lesson.calculate_roi, portfolio_financials, fetch_archive])
+    runner = settings.get_runner(agent)
+    memo = settings.get_tool_memo()
+    if memo:
+        memo.clear()
+        memo.stats.clear()
+    tool_calls = 0
+    t0 = time.perf_counter()
+    for _ in range(sessions):
+        user_id, session_id = await settings.initialize_session()
+        content = types.Content(role="user", parts=[types.Part(text="Go/No-Go on the AI Gateway?")])
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            tool_calls += len(event.get_function_calls())
+    elapsed = time.perf_counter() - t0
+    hits = sum(s["hits"] for s in memo.stats.values()) if memo else 0
+    return tool_calls, tool_calls - hits, hits, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hit rates and agent savings of the pure-tool memo.")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--lookup-latency", type=float, default=0.25, help="Seconds per archive lookup.")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=0, first_token_latency=0.02, token_latency=0.002).start()
+    os.environ.update(OLLAMA_API_BASE=stub.url, OLLAMA_BASE_URLS=stub.url, MODEL_WARMUP="0", TOOL_MEMO="1")
+    from config import settings  # Imported after the endpoint is set.
+    from config.tool_memo import canonical
+
+    lesson = load_lesson_21()
+    calls = make_calls(args.calls, args.projects)
+    (raw_hits, raw_seconds), (memo_hits, memo_seconds) = hit_rates(lesson, settings, calls)
+    print(f"--- TOOL MEMO BENCHMARK: HIT RATE ({args.calls} calls, {args.projects} projects, mixed spellings) ---")
+    print(f"{'MODE':<34} {'hits':>8} {'hit rate':>9} {'per call':>10}")
+    for mode, hits, seconds in (("lru_cache on raw arguments", raw_hits, raw_seconds),
+                                ("@pure (canonical arguments)", memo_hits, memo_seconds)):
+        print(f"{mode:<34} {hits:>8} {hits / args.calls:>9.1%} {seconds / args.calls * 1e6:>8.2f}us")
+    distinct = len({tuple(map(canonical, call)) for call in calls})
+    print(f"Best possible: {args.calls - distinct} hits (one miss per distinct project).")
+
+    print(f"\n--- TOOL MEMO BENCHMARK: AGENT SESSIONS ({args.sessions} sessions, "
+          f"{args.lookup_latency * 1000:.0f}ms archive lookup, local stand-in) ---")
+    print(f"{'MODE':<34} {'tool calls':>10} {'executed':>9} {'hits':>6} {'time':>8}")
+    for enabled in (False, True):
+        settings.TOOL_MEMO = enabled
+        tool_calls, executed, hits, elapsed = await agent_sessions(
+            settings, stub, lesson, args.sessions, args.lookup_latency)
+        print(f"{'TOOL_MEMO=' + str(int(enabled)):<34} {tool_calls:>10} {executed:>9} {hits:>6} {elapsed:>7.2f}s")
+    print(settings.get_tool_memo().report())
+
+    await settings.cleanup()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+BENCHMARK: Cold vs. Warm First-Query Latency
+DESCRIPTION: Runs the first executive query of a session against a local
+Ollama stand-in (benchmarks/ollama_stub.py) twice: once against a cold
+model, and once after the ModelWarmer has pre-loaded it.
+
+Self-check: with no re-warm interval, a model first asked for after the
+initial pass (a lesson's second model) is still loaded by the warmer.
+
+USAGE:
+    python -m benchmarks.warmup_benchmark --load-latency 3
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from google.adk.agents import Agent
+from google.genai import types
+
+from benchmarks.ollama_stub import OllamaStub
+from config.warmup import ollama_model_name
+
+
+async def first_query_latency(settings, stub, warm):
+    stub.loaded.clear()  # Every scenario starts with the model unloaded.
+    settings.MODEL_WARMUP = warm
+    agent = Agent(name="Warmup_Probe", instruction="You are a CIO Strategy Analyst.", model=settings.get_model())
+    runner = settings.get_runner(agent)
+    user_id, session_id = await settings.initialize_session()
+
+    startup_wait = 0.0
+    if warm:
+        t0 = time.perf_counter()
+        await settings.get_warmer().wait()
+        startup_wait = time.perf_counter() - t0
+
+    content = types.Content(role="user", parts=[types.Part(text="Summarize our AI strategy in one line.")])
+    t0 = time.perf_counter()
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+        pass
+    latency = time.perf_counter() - t0
+    metrics = dict(settings.get_warmer().metrics)
+    await settings.cleanup()
+    return startup_wait, latency, metrics
+
+
+async def late_model_warmed(settings, stub, model="ollama_chat/qwen2.5"):
+    """Registers a second model once the first pass is done; returns whether the warmer loaded it."""
+    stub.loaded.clear()
+    settings.MODEL_WARMUP = True
+    settings.get_model()
+    await settings.initialize_session()
+    warmer = settings.get_warmer()
+    await warmer.wait()
+    settings.get_model(model)  # No interval: there is no later pass to pick it up.
+    await warmer.wait()
+    loaded = ollama_model_name(model) in stub.loaded
+    await settings.cleanup()
+    return loaded
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Cold vs. warm first-query latency.")
+    parser.add_argument("--load-latency", type=float, default=3.0, help="Simulated model load time (s).")
+    args = parser.parse_args()
+
+    stub = OllamaStub(load_latency=args.load_latency).start()
+    os.environ["OLLAMA_API_BASE"] = stub.url
+    from config import settings  # Imported after the endpoint is set.
+
+    print(f"--- WARM-UP BENCHMARK (simulated load {args.load_latency:.1f}s) ---")
+    _, cold, _ = await first_query_latency(settings, stub, warm=False)
+    print(f"Cold model:  first query {cold:.2f}s")
+    startup, warm, metrics = await first_query_latency(settings, stub, warm=True)
+    print(f"Warm model:  first query {warm:.2f}s (warm-up at startup took {startup:.2f}s)")
+    for model, stats in metrics.items():
+        print(f"  {model}: load {stats['load_seconds']:.2f}s, server load {stats['server_load_seconds']:.2f}s")
+    assert await late_model_warmed(settings, stub), "a model registered after the first pass was never warmed"
+    print("Self-check: a model registered after the first warm-up pass was warmed without an interval.")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
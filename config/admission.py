@@ -0,0 +1,221 @@
+"""
+FILE: config/admission.py
+DESCRIPTION: Priority-aware admission of model calls: interactive traffic ahead of batch work.
+
+WHY THIS EXISTS: Interactive flows (the HITL approval in Lesson 12, the
+workshop mediator in Lesson 20, the dashboard in Lesson 21) compete with
+bulk portfolio audits (Lesson 11) and eval runs (Lesson 14) for the same few
+Ollama generation slots. During a batch peak, a CIO's question waits behind
+hundreds of audits. AdmissionLayer sits just above the load balancer, so
+cache hits and coalesced calls never queue. Every upstream call has to be
+admitted by a shared AdmissionScheduler first:
+
+  * Priority classes: a call's class is taken from a context variable. Wrap
+    work in `with model_priority("batch"):` (config/priority.py, which is
+    free to import). BatchScheduler does this for
+    its items automatically. Calls with no class set are "interactive".
+  * Slots: at most `capacity` calls run at once (match OLLAMA_NUM_PARALLEL x
+    servers). The rest wait in per-class FIFO queues.
+  * Weighted fair queuing: free slots go to the backlogged class with the
+    lowest virtual time. Each admission advances its class by 1/weight, so
+    with weights 8:1, interactive gets eight slots for every batch slot.
+    Batch work still progresses and is never starved.
+  * Per-class caps: for example, batch may hold at most 3 of 4 slots, which
+    always leaves one free for an interactive call.
+  * Preemption (optional): while a non-preemptible (interactive) call is
+    waiting, queued preemptible (batch, eval) calls are passed over. Running
+    calls are never interrupted.
+  * Metrics: a queue-wait histogram per class (`stats()`, `report()`), to
+    check that interactive p99 stays bounded during batch runs.
+
+A call holds its slot until its response, or its whole stream, is finished
+or closed (read or not).
+"""
+import asyncio
+import bisect
+import collections
+import time
+
+from config.model_layers import ModelClientLayer, ReleasingStream
+from config.priority import current_priority, model_priority  # noqa: F401 (re-exported)
+
+
+class PriorityClass:
+    """A traffic class: its share of slots (`weight`), an optional cap and whether it can be passed over."""
+
+    def __init__(self, name, weight=1.0, max_concurrency=None, preemptible=True):
+        self.name = name
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.preemptible = preemptible
+
+    def __repr__(self):
+        cap = f", cap={self.max_concurrency}" if self.max_concurrency is not None else ""
+        return f"PriorityClass({self.name!r}, weight={self.weight}{cap})"
+
+
+def parse_classes(spec, interactive="interactive"):
+    """Parses "interactive:8,batch:1:3,eval:1:2" (name:weight[:cap]); only `interactive` is not preemptible."""
+    classes = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, weight, *cap = item.split(":")
+        classes.append(PriorityClass(name, float(weight), int(cap[0]) if cap else None,
+                                     preemptible=name != interactive))
+    return classes
+
+
+class WaitHistogram:
+    """Queue-wait times in fixed buckets (Prometheus style), with approximate quantiles."""
+
+    BOUNDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)  # The last bucket is +Inf.
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """The q-quantile, interpolated linearly inside its bucket (like Prometheus' histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank, seen, lower = q * self.count, 0, 0.0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            if count and seen + count >= rank:
+                return min(self.max, lower + (bound - lower) * (rank - seen) / count)
+            seen += count
+            lower = bound
+        return self.max
+
+    def as_dict(self):
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.BOUNDS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99), "max": self.max, "buckets": buckets}
+
+
+class AdmissionScheduler:
+    """Grants model-call slots by priority class: weighted fair queuing, per-class caps, optional preemption."""
+
+    def __init__(self, capacity=4, classes=None, default_class="interactive", preempt=True):
+        classes = classes or [PriorityClass("interactive", 8, preemptible=False), PriorityClass("batch", 1),
+                              PriorityClass("eval", 1)]
+        self.capacity = capacity
+        self.classes = {c.name: c for c in classes}
+        if default_class not in self.classes:
+            self.classes[default_class] = PriorityClass(default_class, preemptible=False)
+        self.default_class = default_class
+        self.preempt = preempt
+        self.in_use = 0
+        self.running = {name: 0 for name in self.classes}
+        self.waits = {name: WaitHistogram() for name in self.classes}
+        self.counters = {name: {"admitted": 0, "cancelled": 0, "passed_over": 0} for name in self.classes}
+        self._queues = {name: collections.deque() for name in self.classes}
+        self._vtime = {name: 0.0 for name in self.classes}
+        self._clock = 0.0  # Virtual time of the latest admission.
+
+    def resolve(self, name):
+        """The class a call runs under; unknown or unset names fall back to the default class."""
+        return name if name in self.classes else self.default_class
+
+    async def acquire(self, name=None):
+        """Waits for a slot; returns the class name to pass to release()."""
+        name = self.resolve(name)
+        queue = self._queues[name]
+        if not queue:
+            # A class returning from idle starts at the current virtual time, with no banked credit.
+            self._vtime[name] = max(self._vtime[name], self._clock)
+        grant = asyncio.get_running_loop().create_future()
+        queue.append((grant, time.perf_counter()))
+        self._dispatch()
+        try:
+            await grant
+        except asyncio.CancelledError:
+            if grant.done() and not grant.cancelled():
+                self.release(name)  # Granted just as the caller gave up.
+            else:
+                self.counters[name]["cancelled"] += 1
+                self._dispatch()
+            raise
+        return name
+
+    def release(self, name):
+        self.in_use -= 1
+        self.running[name] -= 1
+        self._dispatch()
+
+    def _eligible(self):
+        eligible = []
+        for name, queue in self._queues.items():
+            while queue and queue[0][0].done():
+                queue.popleft()  # Waiters cancelled while queued.
+            cap = self.classes[name].max_concurrency
+            if queue and (cap is None or self.running[name] < cap):
+                eligible.append(name)
+        if self.preempt:
+            urgent = [name for name in eligible if not self.classes[name].preemptible]
+            if urgent:
+                for name in eligible:
+                    if name not in urgent:
+                        self.counters[name]["passed_over"] += 1
+                return urgent
+        return eligible
+
+    def _dispatch(self):
+        while self.in_use < self.capacity:
+            eligible = self._eligible()
+            if not eligible:
+                return
+            name = min(eligible, key=lambda n: (self._vtime[n], -self.classes[n].weight))
+            grant, enqueued = self._queues[name].popleft()
+            self._clock = self._vtime[name]
+            self._vtime[name] += 1.0 / self.classes[name].weight
+            self.in_use += 1
+            self.running[name] += 1
+            self.counters[name]["admitted"] += 1
+            self.waits[name].observe(time.perf_counter() - enqueued)
+            grant.set_result(None)
+
+    def stats(self):
+        """Per class: admitted/cancelled counters, running and queued calls, and the queue-wait histogram."""
+        return {
+            name: dict(self.counters[name], running=self.running[name], queued=len(self._queues[name]),
+                       wait=self.waits[name].as_dict())
+            for name in self.classes
+        }
+
+    def report(self):
+        lines = [f"[admission] {self.in_use}/{self.capacity} slots in use"]
+        for name, s in self.stats().items():
+            if s["admitted"] or s["queued"]:
+                lines.append(f"  {name:<12} admitted {s['admitted']:>6} | queued {s['queued']:>4} | wait p50 "
+                             f"{s['wait']['p50'] * 1000:.0f}ms p99 {s['wait']['p99'] * 1000:.0f}ms "
+                             f"max {s['wait']['max'] * 1000:.0f}ms")
+        return "\n".join(lines)
+
+
+class AdmissionLayer(ModelClientLayer):
+    """Admits each upstream model call through an AdmissionScheduler under the caller's priority class."""
+
+    def __init__(self, scheduler, inner=None):
+        super().__init__(inner)
+        self.scheduler = scheduler
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        name = await self.scheduler.acquire(current_priority())
+        try:
+            response = await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+        except BaseException:
+            self.scheduler.release(name)
+            raise
+        if not kwargs.get("stream"):
+            self.scheduler.release(name)
+            return response
+        # The slot is freed once the stream ends or is closed, even if nobody ever reads from it.
+        return ReleasingStream(response, lambda: self.scheduler.release(name))
@@ -0,0 +1,240 @@
+"""
+FILE: config/batch_scheduler.py
+DESCRIPTION: Adaptive-concurrency batch runner for portfolio-sized workloads.
+
+WHY THIS EXISTS: An unbounded asyncio.gather over 500 proposals sends 500
+requests at once. Ollama serves only a few in parallel, so the rest queue,
+time out or fail together. BatchScheduler runs a worker coroutine over many
+items and adapts how many run at once:
+
+  * AIMD: the concurrency limit starts low and grows by one per success in
+    slow start, then by one per round trip. When the median of the last
+    `recent` latencies exceeds `latency_tolerance` x the 10th percentile of
+    the window (the backend is queueing), or an item fails, the limit is
+    multiplied by `decrease`. Throughput then rises until the backend
+    saturates, and no further.
+  * Latency per output unit: an audit's latency varies several-fold with the
+    length of its answer, which says nothing about queueing. When the worker
+    returns text, the limiter sees latency per character of it instead
+    (`size`), so long answers do not read as congestion. An empty answer has
+    no latency per character and is left out of the window.
+  * Retries: a failed item is retried up to `max_retries` times after a
+    full-jitter exponential backoff. It gives up its slot while it waits.
+  * Progress: a line every `progress_interval` seconds (done, failed, items/s,
+    current limit), and a summary in `stats` at the end.
+  * Priority: model calls made by the worker run under the `priority` class
+    ("batch" by default). With admission control on (config/admission.py),
+    they yield model slots to interactive traffic.
+
+Items are pulled from the iterable only when a slot is free, so generators and
+large files are never loaded up front.
+"""
+import asyncio
+import collections
+import contextlib
+import random
+import statistics
+import time
+
+from config.priority import model_priority
+
+
+class AIMDLimiter:
+    """A concurrency gate whose limit follows additive-increase / multiplicative-decrease."""
+
+    def __init__(self, initial=2, minimum=1, maximum=64, decrease=0.7, latency_tolerance=1.5, window=100,
+                 recent=8):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.recent = recent
+        self.in_flight = 0
+        self.history = collections.deque(maxlen=1000)  # Recent (monotonic time, limit) changes.
+        self._latencies = collections.deque(maxlen=window)  # Latency per unit of output, or per item.
+        self._round_trip = None  # The lowest end-to-end latency seen; spaces out decreases.
+        self._slow_start = True
+        self._last_decrease = 0.0
+        self._changed = asyncio.Condition()
+
+    @property
+    def baseline(self):
+        """The 10th percentile of the window: the backend's unloaded response time, without one-off outliers."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[(len(ordered) - 1) // 10]
+
+    def congested(self):
+        """Whether the median of the last `recent` latencies is `latency_tolerance` x the baseline or more."""
+        if len(self._latencies) < max(5, self.recent):
+            return False
+        recent = list(self._latencies)[-self.recent:]
+        return statistics.median(recent) > self.latency_tolerance * self.baseline
+
+    async def acquire(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency=None, error=False, size=None):
+        """Frees a slot and adapts the limit to the outcome of the call that held it.
+
+        `size` is how much output the call produced (characters, tokens); the limiter then compares latency per
+        unit of output, which tracks queueing rather than answer length. A call with `size=0` (no output) frees
+        its slot without a latency sample.
+        """
+        if error:
+            self._back_off()
+        elif latency is not None and size != 0:
+            self._round_trip = latency if self._round_trip is None else min(self._round_trip, latency)
+            self._latencies.append(latency / size if size else latency)
+            if self.congested():
+                self._back_off()
+            else:
+                step = 1.0 if self._slow_start else 1.0 / self.limit
+                self._set(min(self.maximum, self.limit + step))
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def _back_off(self):
+        # One decrease per round trip: the calls already in flight report the same congestion.
+        now = time.monotonic()
+        if now - self._last_decrease < (self._round_trip or 0.0):
+            return
+        self._slow_start = False
+        self._last_decrease = now
+        self._set(max(self.minimum, self.limit * self.decrease))
+
+    def _set(self, limit):
+        self.limit = limit
+        self.history.append((time.monotonic(), limit))
+
+
+def output_size(value):
+    """The size of a worker's result for the limiter: the length of a text answer, else None (whole-item latency)."""
+    return len(value) if isinstance(value, str) else None
+
+
+class BatchResult:
+    """The outcome of one item: its value, or the error from its last attempt."""
+
+    __slots__ = ("key", "index", "value", "error", "attempts", "latency")
+
+    def __init__(self, key, index=0, value=None, error=None, attempts=0, latency=0.0):
+        self.key = key
+        self.index = index
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+        self.latency = latency
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"BatchResult({self.key!r}, {status}, attempts={self.attempts})"
+
+
+class BatchScheduler:
+    """Runs `worker(key, item)` over (key, item) pairs with AIMD concurrency and jittered retries."""
+
+    def __init__(self, worker, limiter=None, max_retries=3, backoff_base=0.5, backoff_max=10.0,
+                 retry_on=(Exception,), progress_interval=5.0, report=print, priority="batch", size=output_size):
+        self.worker = worker
+        self.size = size
+        self.limiter = limiter or AIMDLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_on = retry_on
+        self.progress_interval = progress_interval
+        self.report = report
+        self.priority = priority
+        self.stats = {"done": 0, "failed": 0, "retries": 0, "elapsed": 0.0, "throughput": 0.0, "peak_limit": 0}
+
+    async def _run_item(self, index, key, item):
+        result = BatchResult(key, index)
+        while True:
+            result.attempts += 1
+            await self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                with model_priority(self.priority) if self.priority else contextlib.nullcontext():
+                    result.value = await self.worker(key, item)
+            except self.retry_on as e:
+                await self.limiter.release(error=True)
+                if result.attempts > self.max_retries:
+                    result.error = e
+                    return result
+                self.stats["retries"] += 1
+                # Full jitter keeps retries from arriving in synchronised waves.
+                await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** result.attempts)))
+                continue
+            except BaseException:
+                await self.limiter.release()
+                raise
+            result.latency = time.perf_counter() - start
+            await self.limiter.release(latency=result.latency, size=self.size(result.value) if self.size else None)
+            return result
+
+    async def stream(self, items):
+        """Yields a BatchResult per item as each one finishes (not in input order)."""
+        total = len(items) if hasattr(items, "__len__") else None
+        start = last_report = time.perf_counter()
+        running = set()
+        source = enumerate(items.items() if isinstance(items, dict) else items)
+        exhausted = False
+        try:
+            while running or not exhausted:
+                # Pull the next item only once there is room for it.
+                while not exhausted and len(running) < int(self.limiter.limit):
+                    try:
+                        index, (key, item) = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    running.add(asyncio.ensure_future(self._run_item(index, key, item)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(
+                    running, timeout=self.progress_interval, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    self.stats["done" if result.ok else "failed"] += 1
+                    yield result
+                self.stats["peak_limit"] = max(self.stats["peak_limit"], int(self.limiter.limit))
+                now = time.perf_counter()
+                if self.report and now - last_report >= self.progress_interval:
+                    last_report = now
+                    self.report(self._progress_line(now - start, total))
+        finally:
+            for task in running:
+                task.cancel()
+            self.stats["elapsed"] = time.perf_counter() - start
+            finished = self.stats["done"] + self.stats["failed"]
+            self.stats["throughput"] = finished / self.stats["elapsed"] if self.stats["elapsed"] else 0.0
+
+    async def run(self, items):
+        """Runs every item and returns the BatchResults in input order."""
+        results = [result async for result in self.stream(items)]
+        results.sort(key=lambda r: r.index)
+        if self.report:
+            self.report(self.summary())
+        return results
+
+    def _progress_line(self, elapsed, total):
+        finished = self.stats["done"] + self.stats["failed"]
+        of_total = f"/{total}" if total is not None else ""
+        return (f"[batch] {finished}{of_total} done | {self.stats['failed']} failed | "
+                f"{finished / elapsed:.2f} items/s | concurrency limit {int(self.limiter.limit)} "
+                f"({self.limiter.in_flight} in flight)")
+
+    def summary(self):
+        s = self.stats
+        return (f"[batch] {s['done']} succeeded, {s['failed']} failed, {s['retries']} retries in "
+                f"{s['elapsed']:.2f}s ({s['throughput']:.2f} items/s, peak concurrency {s['peak_limit']})")
@@ -0,0 +1,286 @@
+"""
+FILE: config/bounded_sessions.py
+DESCRIPTION: Bounded-memory, in-process ADK session service.
+
+WHY THIS EXISTS: The stock InMemorySessionService never forgets a session, and
+copies the session (events included) on every `get_session`, so a long-lived
+process grows without limit and each runner turn costs more than the last.
+This service:
+  * Caps the number of sessions and their estimated size in bytes, evicting
+    the least-recently-used session when either budget is exceeded. The
+    session being written is never evicted, even if it alone exceeds
+    `max_bytes`.
+  * Evicts sessions that have been idle longer than `idle_ttl` seconds.
+  * Pins sessions with a turn in flight: `create_session` and `get_session`
+    take a hold, the agent's final response (`append_event`) drops it. A
+    pinned session is skipped by both TTL expiry and the LRU budget, so
+    activity on other sessions cannot evict it while the model is answering,
+    however long that takes. A hold that is never dropped (a read with no
+    turn behind it) lapses after `pin_timeout` seconds without an event.
+  * Optionally spills evicted sessions to `spill_dir` and transparently
+    reloads them on the next `get_session`.
+  * Returns sessions whose `events` list IS the stored history (a view), not
+    a copy. Appending through the returned session does not copy anything.
+"""
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.state import State
+
+from config.sqlite_sessions import _split_state
+
+# Rough fixed cost of an Event object (ids, actions, timestamps) on top of its text.
+_EVENT_OVERHEAD_BYTES = 512
+
+
+def _estimate_event_bytes(event):
+    size = _EVENT_OVERHEAD_BYTES
+    if event.content and event.content.parts:
+        for part in event.content.parts:
+            if part.text:
+                size += len(part.text)
+            elif part.inline_data and part.inline_data.data:
+                size += len(part.inline_data.data)
+            else:
+                size += 256
+    return size
+
+
+class _Entry:
+    __slots__ = ("app_name", "user_id", "session_id", "state", "events", "last_update_time",
+                 "last_access", "size")
+
+    def __init__(self, app_name, user_id, session_id, state, events, last_update_time):
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_id = session_id
+        self.state = state
+        self.events = events
+        self.last_update_time = last_update_time
+        self.last_access = time.monotonic()
+        self.size = sum(_estimate_event_bytes(e) for e in events)
+
+
+class BoundedSessionService(BaseSessionService):
+    """An in-memory session service with LRU/TTL eviction and optional spill-to-disk."""
+
+    def __init__(self, max_sessions=10_000, max_bytes=256 * 1024 * 1024, idle_ttl=None, spill_dir=None,
+                 pin_timeout=600.0):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        self.pin_timeout = pin_timeout
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        # (app_name, user_id, session_id) -> _Entry, ordered from least to most recently used.
+        self._entries = OrderedDict()
+        self._pins = {}  # key -> monotonic time of the last hold, for sessions with a turn in flight.
+        self._bytes = 0
+        self.app_state = {}
+        self.user_state = {}
+        self.stats = {"evicted": 0, "expired": 0, "spilled": 0, "reloaded": 0}
+
+    # --- Memory accounting & eviction ---
+    @property
+    def resident_bytes(self):
+        return self._bytes
+
+    def _touch(self, key, entry):
+        entry.last_access = time.monotonic()
+        self._entries.move_to_end(key)
+
+    def _pin(self, key):
+        self._pins[key] = time.monotonic()
+
+    def _pinned(self, key, now):
+        held = self._pins.get(key)
+        return held is not None and (self.pin_timeout is None or now - held < self.pin_timeout)
+
+    def _evict_expired(self, keep=None):
+        """Evicts sessions idle longer than `idle_ttl`, skipping `keep` (the one being written) and pinned ones."""
+        if self.idle_ttl is None:
+            return
+        now = time.monotonic()
+        deadline = now - self.idle_ttl
+        # The LRU order is idle order, so we stop at the first fresh session.
+        expired = []
+        for key, entry in self._entries.items():
+            if entry.last_access > deadline:
+                break
+            if key != keep and not self._pinned(key, now):
+                expired.append(key)
+        for key in expired:
+            self._evict(key)
+            self.stats["expired"] += 1
+
+    def _enforce_budget(self, keep=None):
+        """Evicts least-recently-used sessions until both budgets hold, skipping `keep` and pinned sessions."""
+        now = time.monotonic()
+        while len(self._entries) > self.max_sessions or self._bytes > self.max_bytes:
+            key = next((k for k in self._entries if k != keep and not self._pinned(k, now)), None)
+            if key is None:
+                break  # Only sessions in use are left; they stay even if they are over budget.
+            self._evict(key)
+            self.stats["evicted"] += 1
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._pins.pop(key, None)
+        self._bytes -= entry.size
+        if self.spill_dir:
+            self._spill(entry)
+
+    # --- Spill-to-disk ---
+    def _spill_path(self, app_name, user_id, session_id):
+        digest = hashlib.sha256(f"{app_name}\0{user_id}\0{session_id}".encode()).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _spill(self, entry):
+        session = Session(
+            app_name=entry.app_name, user_id=entry.user_id, id=entry.session_id,
+            state=entry.state, events=entry.events, last_update_time=entry.last_update_time,
+        )
+        with open(self._spill_path(entry.app_name, entry.user_id, entry.session_id), "w", encoding="utf-8") as f:
+            f.write(session.model_dump_json(exclude_none=True))
+        self.stats["spilled"] += 1
+
+    def _reload(self, key):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(*key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            session = Session.model_validate_json(f.read())
+        os.remove(path)
+        entry = _Entry(key[0], key[1], key[2], session.state, session.events, session.last_update_time)
+        self._admit(key, entry)
+        self.stats["reloaded"] += 1
+        return entry
+
+    def _admit(self, key, entry):
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._enforce_budget(keep=key)
+
+    def _lookup(self, app_name, user_id, session_id, active=False):
+        """The entry for a session, reloaded from disk if spilled. An `active` session is exempt from expiry."""
+        key = (app_name, user_id, session_id)
+        self._evict_expired(keep=key if active else None)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._reload(key)
+        if entry is not None:
+            self._touch(key, entry)
+        return entry
+
+    # --- Views ---
+    def _view(self, entry, events=None):
+        state = dict(entry.state)
+        for k, v in self.app_state.get(entry.app_name, {}).items():
+            state[State.APP_PREFIX + k] = v
+        for k, v in self.user_state.get((entry.app_name, entry.user_id), {}).items():
+            state[State.USER_PREFIX + k] = v
+        # model_construct skips re-validating every stored event.
+        return Session.model_construct(
+            app_name=entry.app_name, user_id=entry.user_id, id=entry.session_id,
+            state=state, events=entry.events if events is None else events,
+            last_update_time=entry.last_update_time,
+        )
+
+    def _merge_scoped_state(self, app_name, user_id, app_delta, user_delta):
+        if app_delta:
+            self.app_state.setdefault(app_name, {}).update(app_delta)
+        if user_delta:
+            self.user_state.setdefault((app_name, user_id), {}).update(user_delta)
+
+    # --- BaseSessionService API ---
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        if self._lookup(app_name, user_id, session_id) is not None:
+            raise ValueError(f"Session with id {session_id} already exists.")
+
+        app_delta, user_delta, session_state = _split_state(state)
+        self._merge_scoped_state(app_name, user_id, app_delta, user_delta)
+        entry = _Entry(app_name, user_id, session_id, session_state, [], time.time())
+        key = (app_name, user_id, session_id)
+        self._pin(key)  # Its first turn is about to start.
+        self._admit(key, entry)
+        return self._view(entry)
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        entry = self._lookup(app_name, user_id, session_id)
+        if entry is None:
+            return None
+        self._pin((app_name, user_id, session_id))  # The Runner reads the session as a turn starts.
+
+        events = None
+        if config and (config.num_recent_events is not None or config.after_timestamp is not None):
+            events = entry.events
+            if config.after_timestamp is not None:
+                i = len(events)
+                while i > 0 and events[i - 1].timestamp >= config.after_timestamp:
+                    i -= 1
+                events = events[i:]
+            if config.num_recent_events is not None:
+                events = events[-config.num_recent_events:] if config.num_recent_events else []
+        return self._view(entry, events)
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        self._evict_expired()
+        sessions = [
+            self._view(entry, events=[])
+            for (app, uid, _), entry in self._entries.items()
+            if app == app_name and (user_id is None or uid == user_id)
+        ]
+        sessions.sort(key=lambda s: s.last_update_time)
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        key = (app_name, user_id, session_id)
+        entry = self._entries.pop(key, None)
+        self._pins.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        if self.spill_dir:
+            path = self._spill_path(*key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+
+        entry = self._lookup(session.app_name, session.user_id, session.id, active=True)
+        if entry is None:
+            raise ValueError(f"Session {session.id} not found.")
+
+        # The base class appends to session.events. For a view that is the stored
+        # history itself; for a windowed or stale copy we append to storage too.
+        event = await super().append_event(session=session, event=event)
+        if session.events is not entry.events:
+            entry.events.append(event)
+        session.last_update_time = entry.last_update_time = event.timestamp
+
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+            self._merge_scoped_state(session.app_name, session.user_id, app_delta, user_delta)
+            entry.state.update(session_delta)
+
+        key = (session.app_name, session.user_id, session.id)
+        if event.author != "user" and event.is_final_response():
+            self._pins.pop(key, None)  # The turn is over; the session may be evicted again.
+        else:
+            self._pin(key)
+        size = _estimate_event_bytes(event)
+        entry.size += size
+        self._bytes += size
+        self._enforce_budget(keep=key)
+        return event
@@ -0,0 +1,216 @@
+"""
+FILE: config/compaction.py
+DESCRIPTION: Rolling context compaction for long stateful sessions (an ADK runner plugin).
+
+WHY THIS EXISTS: ADK sends the whole session history with every model call
+(Lesson 04). A workshop running hundreds of turns therefore pays a prefill
+that grows with every turn, and eventually overflows llama3.2's context
+window. CompactionPlugin rewrites each request just before it goes to the
+model:
+
+  * Budget: while the estimated prompt (instruction + history, about 4
+    characters per token) fits `budget` tokens, nothing changes.
+  * Compaction: past the budget, the oldest turns are folded into a running
+    summary until the prompt is back under `low_water` x budget. The newest
+    `keep_recent` contents always stay verbatim, and a tool call is never
+    separated from its result. The model sees one summary message in place
+    of the folded turns.
+  * Incremental: the summary and the number of contents folded so far are
+    kept in session state. A later compaction sends only the previous
+    summary plus the newly folded turns to the model, not the whole history.
+    Between compactions, the stored summary is reused without any model call.
+  * Pinned facts: sentences in folded user turns that match `pin_patterns`
+    (by default, money amounts and lines starting "PIN:") are kept verbatim
+    next to the summary. Code can also append facts to
+    `state["compaction_pinned"]`. A summary may paraphrase; a budget of
+    "$4.5M" must not drift.
+
+Session events are never modified, only the request, so the full history is
+still there for audit and replay. If the history no longer matches what was
+folded (a rewound or edited session), the summary is rebuilt from scratch.
+"""
+import hashlib
+import re
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+SUMMARY_KEY = "compaction_summary"
+FOLDED_KEY = "compaction_folded"      # Contents of the request already folded into the summary.
+ANCHOR_KEY = "compaction_anchor"      # Fingerprint of the last folded content.
+PINNED_KEY = "compaction_pinned"
+SUMMARY_HEADER = "[Summary of the earlier conversation]"
+
+DEFAULT_PIN_PATTERNS = (
+    r"\$\s?\d[\d,.]*\s*(?:k|m|mn|bn|million|billion)?\b",
+    r"(?im)^\s*pin(?:ned)?\s*:",
+)
+
+SUMMARY_PROMPT = (
+    "You maintain the running summary of a long strategy conversation. Update the summary with the new "
+    "turns below. Keep decisions, numbers, names, open questions and commitments; drop pleasantries. "
+    "Answer with the updated summary only, at most {words} words.\n\n"
+    "CURRENT SUMMARY:\n{summary}\n\nNEW TURNS:\n{turns}"
+)
+
+# A sentence ends at . ! ? or a newline, but not at the decimal point of "$4.5".
+_SENTENCE = re.compile(r"(?:[^.!?\n]|[.!?](?=\d))+(?:[.!?]|\n|$)")
+_MESSAGE_OVERHEAD_TOKENS = 4  # Role header and separators added by the chat template.
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def _content_tokens(content):
+    return estimate_tokens(_content_text(content)) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _content_text(content):
+    """A content as plain text, with tool calls and results shown briefly."""
+    pieces = []
+    for part in content.parts or []:
+        if part.text:
+            pieces.append(part.text)
+        elif part.function_call:
+            pieces.append(f"[tool call {part.function_call.name}({part.function_call.args})]")
+        elif part.function_response:
+            result = str(part.function_response.response)[:500]
+            pieces.append(f"[tool result {part.function_response.name}: {result}]")
+    return "\n".join(pieces)
+
+
+def _fingerprint(content):
+    return hashlib.sha256(f"{content.role}\0{_content_text(content)}".encode("utf-8")).hexdigest()[:16]
+
+
+def _is_tool_result(content):
+    return any(part.function_response for part in content.parts or [])
+
+
+class CompactionPlugin(BasePlugin):
+    """Keeps each request within a token budget by folding old turns into a running summary."""
+
+    def __init__(self, llm=None, budget=2048, keep_recent=6, low_water=0.5, summary_words=200,
+                 pin_patterns=DEFAULT_PIN_PATTERNS, name="context_compaction"):
+        super().__init__(name=name)
+        self.llm = llm  # The summariser; defaults to the model of the agent being compacted.
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.low_water = low_water
+        self.summary_words = summary_words
+        self.pin_patterns = [re.compile(p) for p in pin_patterns]
+        self.stats = {"requests": 0, "summary_updates": 0, "rebuilds": 0,
+                      "tokens_before": 0, "tokens_after": 0, "last_before": 0, "last_after": 0}
+
+    # --- Request size ---
+    @staticmethod
+    def _instruction_tokens(llm_request):
+        instruction = llm_request.config.system_instruction if llm_request.config else None
+        if instruction is None:
+            return 0
+        if isinstance(instruction, str):
+            return estimate_tokens(instruction)
+        return estimate_tokens(_content_text(instruction))
+
+    def _preamble(self, summary, pinned):
+        lines = [SUMMARY_HEADER, summary.strip() or "(none)"]
+        if pinned:
+            lines += ["", "[Pinned facts, verbatim]"] + [f"- {fact}" for fact in pinned]
+        return types.Content(role="user", parts=[types.Part(text="\n".join(lines))])
+
+    def pinned_from(self, contents):
+        """Sentences of user turns that match a pin pattern."""
+        facts = []
+        for content in contents:
+            if content.role != "user":
+                continue
+            for sentence in _SENTENCE.findall(_content_text(content)):
+                sentence = sentence.strip()
+                if sentence and any(p.search(sentence) for p in self.pin_patterns):
+                    facts.append(re.sub(r"(?i)^pin(?:ned)?\s*:\s*", "", sentence))
+        return facts
+
+    async def summarize(self, summary, contents, llm):
+        """The running summary updated with `contents` (one model call)."""
+        turns = "\n".join(f"{c.role.upper()}: {_content_text(c)}" for c in contents)
+        prompt = SUMMARY_PROMPT.format(words=self.summary_words, summary=summary or "(empty)", turns=turns)
+        request = LlmRequest(model=llm.model,
+                             contents=[types.Content(role="user", parts=[types.Part(text=prompt)])])
+        text = ""
+        async for response in llm.generate_content_async(request, stream=False):
+            if response.content and response.content.parts:
+                text += "".join(part.text or "" for part in response.content.parts)
+        self.stats["summary_updates"] += 1
+        return text.strip() or summary
+
+    def _cut(self, contents, folded, fixed_tokens):
+        """Where the verbatim tail starts: small enough for the low-water mark, at most len - keep_recent."""
+        target = self.budget * self.low_water - fixed_tokens
+        limit = max(folded, len(contents) - self.keep_recent)
+        cut, tail = len(contents), 0
+        while cut > folded:
+            size = _content_tokens(contents[cut - 1])
+            if cut <= limit and tail + size > target:
+                break
+            tail += size
+            cut -= 1
+        cut = min(max(cut, folded), limit)
+        while folded < cut < len(contents) and _is_tool_result(contents[cut]):
+            cut -= 1  # Keep a tool result next to its call.
+        return cut
+
+    # --- Plugin hook ---
+    async def before_model_callback(self, *, callback_context, llm_request):
+        contents = llm_request.contents
+        instruction = self._instruction_tokens(llm_request)
+        before = instruction + sum(_content_tokens(c) for c in contents)
+        self.stats["requests"] += 1
+        self.stats["tokens_before"] += before
+        self.stats["last_before"] = before
+
+        state = callback_context.state
+        summary = state.get(SUMMARY_KEY) or ""
+        folded = state.get(FOLDED_KEY) or 0
+        pinned = list(state.get(PINNED_KEY) or [])
+        if folded and (folded >= len(contents) or state.get(ANCHOR_KEY) != _fingerprint(contents[folded - 1])):
+            summary, folded = "", 0  # The history changed under the summary; pinned facts still hold.
+            self.stats["rebuilds"] += 1
+
+        def size(summary, pinned, folded):
+            return (instruction + _content_tokens(self._preamble(summary, pinned))
+                    + sum(_content_tokens(c) for c in contents[folded:]))
+
+        if not folded and before <= self.budget:
+            self._record(before)
+            return None
+        if size(summary, pinned, folded) > self.budget:
+            preamble_tokens = _content_tokens(self._preamble(summary, pinned)) + self.summary_words * 2
+            cut = self._cut(contents, folded, instruction + preamble_tokens)
+            if cut > folded:
+                newly_folded = contents[folded:cut]
+                pinned += [f for f in self.pinned_from(newly_folded) if f not in pinned]
+                llm = self.llm or callback_context.get_invocation_context().agent.canonical_model
+                summary = await self.summarize(summary, newly_folded, llm)
+                folded = cut
+                state[SUMMARY_KEY] = summary
+                state[FOLDED_KEY] = folded
+                state[ANCHOR_KEY] = _fingerprint(contents[folded - 1])
+                state[PINNED_KEY] = pinned
+        if folded:
+            llm_request.contents = [self._preamble(summary, pinned)] + list(contents[folded:])
+        self._record(size(summary, pinned, folded) if folded else before)
+        return None
+
+    def _record(self, after):
+        self.stats["tokens_after"] += after
+        self.stats["last_after"] = after
+
+    def report(self):
+        s = self.stats
+        if not s["requests"]:
+            return "[compaction] no requests"
+        return (f"[compaction] {s['requests']} requests | {s['summary_updates']} summary updates | prompt est. "
+                f"{s['last_before']} -> {s['last_after']} tokens on the last request "
+                f"(avg {s['tokens_before'] / s['requests']:.0f} -> {s['tokens_after'] / s['requests']:.0f})")
@@ -0,0 +1,218 @@
+"""
+FILE: config/dedup.py
+DESCRIPTION: Near-duplicate proposal detection (MinHash + LSH) ahead of the batch auditor.
+
+WHY THIS EXISTS: Large portfolio submissions are full of near-identical
+proposals: resubmissions, and copy-pasted variants from different business
+units. Each one costs a full model audit. find_near_duplicates() groups
+proposals whose estimated Jaccard similarity reaches `threshold`. Only one
+representative per group is audited, and its result is shared with the rest.
+
+  * Shingles: overlapping 5-character windows of the normalised text (lower
+    case, collapsed whitespace). Each window is hashed with numpy.
+  * MinHash: `num_perm` universal hashes give a fixed-size uint32 signature per
+    proposal. The fraction of equal positions estimates the Jaccard similarity.
+  * LSH: the signature is cut into bands, sized for the threshold. Proposals
+    that share any band become candidates. A candidate whose signatures agree
+    on at least `threshold` of their positions is then checked with the exact
+    Jaccard similarity of the two shingle sets, so a MinHash estimation error
+    never shares a result between proposals below the threshold.
+  * Clusters: proposals are assigned in input order. Each one joins the first
+    earlier representative it is similar to, or becomes a representative
+    itself. Every member is therefore within the threshold of its own
+    representative, rather than being chained through others.
+
+Only the keys and a (n, num_perm) uint32 array are held: 100k proposals with
+128 permutations take about 50 MB (briefly twice that while the array grows),
+plus the texts of the candidate pairs for the exact check. The input is read
+twice, the second time only for those texts; to stream a large file, pass a
+function that returns a fresh iterator over it.
+"""
+import numpy as np
+
+_CHUNK_CHARS = 16384  # Text hashed per numpy pass; bounds the (num_perm, shingles) temporaries.
+
+
+class MinHasher:
+    """Turns texts into MinHash signatures of `num_perm` uint32 values."""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a*x + b) mod 2**64, top 32 bits. Wrap-around is the modulus.
+        self._a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) << np.uint64(1) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+        self._powers = np.uint64(0x100000001B3) ** np.arange(shingle_size, dtype=np.uint64)
+
+    def _normalise(self, text):
+        return " ".join(text.lower().split()).encode("utf-8").ljust(self.shingle_size, b"\0")
+
+    def shingles(self, texts):
+        """The shingle hashes of all `texts` laid end to end, and where each text's hashes start.
+
+        Every text gets at least one shingle, even when empty.
+        """
+        k = self.shingle_size
+        encoded = [self._normalise(text) for text in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        # Polynomial hash of every window (wrap-around is intended), then drop those spanning two texts.
+        hashes = np.lib.stride_tricks.sliding_window_view(data, k).astype(np.uint64) @ self._powers
+        counts = lengths - k + 1
+        starts = np.cumsum(counts) - counts
+        offsets = np.cumsum(lengths) - lengths
+        keep = np.repeat(offsets - starts, counts) + np.arange(counts.sum())
+        return hashes[keep], starts
+
+    def signatures(self, texts):
+        """A (len(texts), num_perm) uint32 array, hashing all the texts' shingles in one numpy pass."""
+        shingles, starts = self.shingles(texts)
+        hashes = (self._a * shingles[None, :] + self._b) >> np.uint64(32)
+        return np.minimum.reduceat(hashes, starts, axis=1).T.astype(np.uint32)
+
+    def signature(self, text):
+        return self.signatures([text])[0]
+
+    def jaccard(self, a, b):
+        """The exact Jaccard similarity of two texts' shingle sets (the windows the signatures hash)."""
+        k = self.shingle_size
+        sa, sb = ({data[i:i + k] for i in range(len(data) - k + 1)} for data in map(self._normalise, (a, b)))
+        return len(sa & sb) / len(sa | sb)
+
+
+def lsh_bands(threshold, num_perm):
+    """The (bands, rows) split whose S-curve best separates similarities around `threshold`.
+
+    Weighs the probability of missing a pair above the threshold against the
+    probability of checking one below it, like datasketch's MinHashLSH.
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1 - (1 - similarity ** rows) ** bands
+        false_positive = np.where(similarity < threshold, candidate, 0).mean()
+        false_negative = np.where(similarity >= threshold, 1 - candidate, 0).mean()
+        error = false_positive + false_negative
+        if best_error is None or error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class DedupPlan:
+    """Which proposals to audit, and whose result each of the others shares."""
+
+    def __init__(self, keys, representative, threshold):
+        self.keys = keys
+        self.representative = representative  # Input position of each proposal's representative.
+        self.threshold = threshold
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def unique_count(self):
+        return int(np.count_nonzero(self.representative == np.arange(len(self.keys))))
+
+    @property
+    def calls_avoided(self):
+        return len(self.keys) - self.unique_count
+
+    def is_representative(self, index):
+        return self.representative[index] == index
+
+    def unique(self, items):
+        """The representatives of a {key: text} dict (or list of pairs), in input order."""
+        pairs = items.items() if isinstance(items, dict) else items
+        return {key: text for index, (key, text) in enumerate(pairs) if self.is_representative(index)}
+
+    def pairs(self):
+        """Yields (key, representative key) for every proposal in input order."""
+        for key, rep in zip(self.keys, self.representative.tolist()):
+            yield key, self.keys[rep]
+
+    def members(self):
+        """{representative position: [member positions]} for groups with more than one proposal."""
+        groups = {}
+        for index in np.flatnonzero(self.representative != np.arange(len(self.keys))).tolist():
+            groups.setdefault(int(self.representative[index]), []).append(index)
+        return groups
+
+    def summary(self):
+        return (f"[dedup] {len(self.keys)} proposals -> {self.unique_count} to audit at Jaccard >= "
+                f"{self.threshold}: {self.calls_avoided} model calls avoided")
+
+
+def _reader(items):
+    """A function returning a fresh iterator of (key, text) pairs over `items`."""
+    if callable(items):
+        return items
+    if isinstance(items, dict):
+        return items.items
+    pairs = items if isinstance(items, (list, tuple)) else list(items)
+    return lambda: iter(pairs)
+
+
+def find_near_duplicates(items, threshold=0.8, hasher=None):
+    """Clusters (key, text) pairs, or a {key: text} dict, by Jaccard similarity.
+
+    `items` may also be a function returning a fresh iterator of pairs (e.g. one that re-reads a
+    file). It is read twice; any other one-shot iterator is first read into a list.
+    """
+    hasher = hasher or MinHasher()
+    read = _reader(items)
+    keys, chunk, chunk_chars = [], [], 0
+    signatures = np.empty((1024, hasher.num_perm), dtype=np.uint32)
+
+    def flush():
+        nonlocal signatures, chunk_chars
+        start = len(keys) - len(chunk)
+        while len(keys) > len(signatures):
+            signatures = np.resize(signatures, (2 * len(signatures), hasher.num_perm))
+        signatures[start:len(keys)] = hasher.signatures(chunk)
+        chunk.clear()
+        chunk_chars = 0
+
+    for key, text in read():
+        keys.append(key)
+        chunk.append(text)
+        chunk_chars += len(text)
+        if chunk_chars >= _CHUNK_CHARS:
+            flush()
+    if chunk:
+        flush()
+    signatures = signatures[:len(keys)]
+    n = len(keys)
+    if n == 0:
+        return DedupPlan(keys, np.empty(0, dtype=np.int64), threshold)
+
+    # LSH: within each band, link every proposal to the first one sharing its bucket.
+    bands, rows = lsh_bands(threshold, hasher.num_perm)
+    mix = np.random.default_rng(0).integers(1, 1 << 63, rows, dtype=np.uint64) | np.uint64(1)
+    candidates = []
+    for band in range(bands):
+        bucket = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) @ mix
+        order = np.argsort(bucket, kind="stable")
+        starts = np.r_[True, bucket[order][1:] != bucket[order][:-1]]
+        first = order[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+        linked = first != order
+        candidates.append(np.stack([first[linked], order[linked]], axis=1))
+    candidates = np.unique(np.concatenate(candidates or [np.empty((0, 2), dtype=np.intp)]), axis=0)
+
+    # Keep candidates whose estimated similarity clears the threshold, then assign in input order.
+    if len(candidates):
+        matches = (signatures[candidates[:, 0]] == signatures[candidates[:, 1]]).mean(axis=1)
+        candidates = candidates[matches >= threshold]
+        candidates = candidates[np.lexsort((candidates[:, 0], candidates[:, 1]))]
+    # The estimate errs both ways; a false match would share a wrong audit, so check each one exactly.
+    needed = set(candidates.ravel().tolist())
+    texts = {index: text for index, (_, text) in enumerate(read()) if index in needed} if needed else {}
+    representative = list(range(n))
+    for earlier, later in candidates.tolist():
+        if representative[later] != later:
+            continue  # Already joined an earlier group.
+        rep = representative[earlier]
+        if hasher.jaccard(texts[rep], texts[later]) >= threshold:
+            representative[later] = rep
+    return DedupPlan(keys, np.array(representative, dtype=np.int64), threshold)
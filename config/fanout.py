@@ -0,0 +1,149 @@
+"""
+FILE: config/fanout.py
+DESCRIPTION: Fan-out/fan-in generation of long templated documents.
+
+WHY THIS EXISTS: The 5-year roadmap (Lesson 02) is one long sequential
+decode: short, mid and long-term phases are written one after another, so
+latency grows with the total length. FanOutDocument splits the work:
+
+  1. Outline: one short call drafts a line per section. This is the shared
+     plan that keeps the parts consistent.
+  2. Fan-out: every section is written concurrently as its own call, with the
+     outline as context and an instruction to write only that section.
+  3. Fan-in: the parts are stitched in template order. A part that wandered
+     into other sections is trimmed back to its own heading.
+  4. Consistency check (no model call): every section must be present and
+     non-empty, and must cover the key terms its outline line promised. No
+     two sections may repeat each other.
+
+Wall time becomes outline + the slowest section, instead of the sum of all
+sections. Ollama has to serve the sections in parallel for this to pay off
+(OLLAMA_NUM_PARALLEL >= number of sections, or several servers).
+
+`ask(prompt)` is the caller's coroutine: it runs one model turn in a fresh
+session and returns the text. `sections` is a list of headings, or a
+{heading: guidance} dict when each section has its own brief (as in the
+Lesson 03 memo template).
+"""
+import asyncio
+import re
+import time
+
+from config.section_parser import SectionParser, normalize_heading
+
+_LEADING_HEADING = re.compile(r"^\s*(?:#{1,6}\s|(?:\*\*|__)[^*_]+(?:\*\*|__)\s*:?\s*$)")
+_WORD = re.compile(r"[A-Za-z][A-Za-z\-]{4,}")
+_STOPWORDS = {"about", "across", "after", "before", "between", "their", "there", "these", "those", "which",
+              "while", "would", "should", "could", "phase", "section", "outline", "within", "through"}
+
+
+def _terms(text):
+    return {w.lower() for w in _WORD.findall(text)} - _STOPWORDS
+
+
+def _overlap(a, b):
+    """Jaccard similarity of two texts' word 3-grams."""
+    def grams(text):
+        words = text.lower().split()
+        return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    ga, gb = grams(a), grams(b)
+    return len(ga & gb) / len(ga | gb) if ga and gb else 0.0
+
+
+class FanOutDocument:
+    """Writes a document section by section in parallel, from a shared outline."""
+
+    def __init__(self, ask, sections, outline_instruction=None, section_instruction=None, min_coverage=0.3,
+                 max_overlap=0.5):
+        self.ask = ask
+        self.guidance = dict(sections) if isinstance(sections, dict) else {}
+        self.sections = list(sections)
+        self.outline_instruction = outline_instruction or (
+            "Before the full document is written, draft a SHORT outline for it: exactly one line per section, "
+            "in the form '<section>: <key points>'. Sections: {sections}. No other text.\n\nDocument request: "
+            "{request}"
+        )
+        self.section_instruction = section_instruction or (
+            "Document request: {request}\n\nShared outline (every section follows it):\n{outline}\n\n"
+            "Write ONLY the '{section}' section{guidance}. Start with the heading '## {section}' and stop at the "
+            "end of that section; the other sections are written separately."
+        )
+        self.min_coverage = min_coverage
+        self.max_overlap = max_overlap
+        self.timings = {}
+
+    async def _timed(self, name, prompt):
+        start = time.perf_counter()
+        text = await self.ask(prompt)
+        self.timings[name] = time.perf_counter() - start
+        return text
+
+    async def generate(self, request):
+        """Returns (document text, {section: body}, [consistency issues])."""
+        self.timings = {}
+        start = time.perf_counter()
+        outline = await self._timed("outline", self.outline_instruction.format(
+            request=request, sections=", ".join(self.sections)))
+        parts = await asyncio.gather(*(
+            self._timed(section, self.section_instruction.format(
+                request=request, outline=outline.strip(), section=section,
+                guidance=f" ({self.guidance[section]})" if self.guidance.get(section) else ""))
+            for section in self.sections
+        ))
+        bodies = {section: self.extract(section, part) for section, part in zip(self.sections, parts)}
+        document = "\n\n".join(f"## {section}\n{body}" for section, body in bodies.items())
+        issues = self.check_consistency(outline, bodies)
+        self.timings["total"] = time.perf_counter() - start
+        return document, bodies, issues
+
+    @staticmethod
+    def extract(section, text):
+        """The body of `section` in a part, up to the next heading at its level or higher (sub-headings stay).
+
+        When the part has no heading matching `section` (the model skipped it or reworded it), the whole part is
+        kept, minus a leading heading line.
+        """
+        parser = SectionParser([section], last_section_paragraphs=None)
+        parser.feed(text)
+        parser.close()
+        for parsed in parser.sections:
+            if parsed.required:
+                return parsed.body
+        lines = text.strip().splitlines()
+        if lines and _LEADING_HEADING.match(lines[0]):
+            lines = lines[1:]
+        return "\n".join(lines).strip()
+
+    def check_consistency(self, outline, bodies):
+        """Cheap structural checks on the stitched document; returns a list of issues (empty when fine)."""
+        issues = []
+        outline_lines = {}
+        for line in outline.splitlines():
+            for section in self.sections:
+                if normalize_heading(section) in normalize_heading(line) and section not in outline_lines:
+                    outline_lines[section] = line
+        for section, body in bodies.items():
+            if not body.strip():
+                issues.append(f"'{section}' is empty")
+                continue
+            promised = _terms(outline_lines.get(section, "")) - _terms(section)
+            if promised:
+                coverage = len(promised & _terms(body)) / len(promised)
+                if coverage < self.min_coverage:
+                    issues.append(f"'{section}' covers {coverage:.0%} of its outline terms "
+                                  f"({', '.join(sorted(promised - _terms(body))[:5])} missing)")
+        names = list(bodies)
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                if _overlap(bodies[a], bodies[b]) > self.max_overlap:
+                    issues.append(f"'{a}' and '{b}' repeat each other")
+        return issues
+
+    def report(self):
+        """Wall time against the sequential cost and the slowest section."""
+        parts = [self.timings[s] for s in self.sections if s in self.timings]
+        if not parts:
+            return "[fanout] not run"
+        outline = self.timings.get("outline", 0.0)
+        return (f"[fanout] {len(parts)} sections in {self.timings['total']:.2f}s | outline {outline:.2f}s + "
+                f"slowest section {max(parts):.2f}s (sections one after another: {sum(parts):.2f}s)")
@@ -0,0 +1,219 @@
+"""
+FILE: config/finance.py
+DESCRIPTION: A NumPy financial engine: ROI, NPV, IRR, payback and discounted cash flows for whole portfolios.
+
+WHY THIS EXISTS: The ROI tools in Lessons 06 and 21 compute one ROI from
+two Python floats and return a sentence. Asked about a portfolio of
+hundreds of projects, the model has to call them once per project: hundreds
+of tool round trips, each one a full model call whose prompt grows with the
+previous results. The arithmetic is not the problem; the round trips are.
+
+This module evaluates a whole portfolio in one call. Every project becomes
+one row of a cash-flow matrix (year 0 is the investment, years 1..N the
+savings, optionally growing each year), and every metric is a vectorised
+operation over that matrix:
+
+  * ROI: first-year ROI, the same figure as the scalar tools, plus the ROI
+    over the whole horizon;
+  * NPV and the DCF value (present value of the savings) at a discount rate;
+  * IRR: safeguarded Newton on all rows at once (NaN where there is none);
+  * payback and discounted payback, in years, interpolated within the year.
+
+portfolio_financials() is the agent-facing batch tool. It takes the projects
+as text ("name, investment, annual_savings" per line, amounts such as "$3M"
+or "250,000" accepted), and returns a compact table: a portfolio summary,
+then one line per project, highest NPV first, truncated for large
+portfolios.
+"""
+import json
+import re
+
+import numpy as np
+
+DEFAULT_YEARS = 5
+DEFAULT_DISCOUNT_RATE = 0.08
+
+_UNITS = {"": 1.0, "k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6,
+          "b": 1e9, "bn": 1e9, "billion": 1e9}
+_AMOUNT = r"\$?\s*[-+]?\d+(?:,\d{3})*(?:\.\d+)?(?:e[-+]?\d+)?(?:\s*(?:thousand|million|billion|mm|bn|k|m|b)\b)?"
+_AMOUNT_PARTS = re.compile(r"\$?\s*([-+]?[\d,]*\.?\d+(?:e[-+]?\d+)?)\s*([a-z]*)", re.IGNORECASE)
+_PROJECT_LINE = re.compile(rf"\s*(?:(.*?)\s*[,:|\t]\s*)?({_AMOUNT})\s*[,;|\t]\s*({_AMOUNT})\s*", re.IGNORECASE)
+
+
+def parse_amount(value):
+    """3e6, "3000000", "$3M", "3,000,000" and "3 million" all give 3000000.0."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _AMOUNT_PARTS.fullmatch(str(value).strip())
+    if not match or match.group(2).lower() not in _UNITS:
+        raise ValueError(f"Not an amount: {value!r}")
+    return float(match.group(1).replace(",", "")) * _UNITS[match.group(2).lower()]
+
+
+def parse_projects(projects):
+    """(names, investments, savings) from text lines, a JSON list, or a list of (name, investment, savings)."""
+    if isinstance(projects, str):
+        text = projects.strip()
+        if text.startswith("["):
+            projects = json.loads(text)
+        else:
+            projects = []
+            for line in filter(None, (part.strip() for part in re.split(r"[\n;]", text))):
+                match = _PROJECT_LINE.fullmatch(line)
+                if not match:
+                    raise ValueError(f"Expected 'name, investment, annual_savings', got {line!r}")
+                projects.append(match.groups())
+    names, investments, savings = [], [], []
+    for i, project in enumerate(projects, 1):
+        if isinstance(project, dict):
+            project = (project.get("name"), project.get("investment"), project.get("annual_savings"))
+        name, investment, saving = project if len(project) == 3 else (None, *project)
+        names.append(str(name or f"Project {i}"))
+        investments.append(parse_amount(investment))
+        savings.append(parse_amount(saving))
+    return names, np.array(investments), np.array(savings)
+
+
+def cash_flows(investment, annual_savings, years=DEFAULT_YEARS, growth=0.0):
+    """An (n, years + 1) matrix: -investment in year 0, then savings growing by `growth` a year."""
+    investment = np.asarray(investment, dtype=float).reshape(-1)
+    savings = np.asarray(annual_savings, dtype=float).reshape(-1)
+    flows = np.empty((len(investment), years + 1))
+    flows[:, 0] = -investment
+    flows[:, 1:] = savings[:, None] * (1.0 + growth) ** np.arange(years)
+    return flows
+
+
+def discount_factors(rate, periods):
+    return (1.0 + rate) ** -np.arange(periods)
+
+
+def npv(flows, rate):
+    return flows @ discount_factors(rate, flows.shape[1])
+
+
+def irr(flows, low=-0.99, high=100.0, tolerance=1e-10, iterations=100):
+    """The rate where each row's NPV is zero, for all rows at once; NaN without a sign change in [low, high].
+
+    Newton steps, kept inside a bracket that shrinks every iteration: a step that
+    would leave it is replaced by bisection, so every row converges.
+    """
+    periods = np.arange(flows.shape[1])
+
+    def value(rate):
+        discount = (1.0 + rate[:, None]) ** -periods
+        return (flows * discount).sum(axis=1), -(periods * flows * discount).sum(axis=1) / (1.0 + rate)
+
+    lo, hi = np.full(len(flows), low), np.full(len(flows), high)
+    f_lo = value(lo)[0]
+    found = np.sign(f_lo) != np.sign(value(hi)[0])
+    # Start from the rate that grows the investment into the total inflows by their cash-weighted mean year.
+    inflows = np.clip(flows[:, 1:], 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_year = (inflows * periods[1:]).sum(axis=1) / inflows.sum(axis=1)
+        guess = (inflows.sum(axis=1) / -flows[:, 0]) ** (1 / mean_year) - 1
+    rate = np.where(np.isfinite(guess), np.clip(guess, low, high), 0.1)
+    done = ~found
+    for _ in range(iterations):
+        f, slope = value(rate)
+        above = np.sign(f) == np.sign(f_lo)  # The root is above `rate`.
+        lo, hi = np.where(above, rate, lo), np.where(above, hi, rate)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = rate - f / slope
+        converged = np.abs(newton - rate) < tolerance
+        inside = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        step = np.where(converged | inside, newton, (lo + hi) / 2)
+        rate = np.where(done, rate, step)  # Converged rows stay put.
+        done |= converged
+        if done.all():
+            break
+    return np.where(found, rate, np.nan)
+
+
+def payback(flows):
+    """Years until the cumulative cash flow turns non-negative, interpolated; inf if it never does."""
+    cumulative = np.cumsum(flows, axis=1)
+    recovered = cumulative >= 0
+    year = recovered.argmax(axis=1)
+    rows = np.arange(len(flows))
+    before = cumulative[rows, np.maximum(year - 1, 0)]
+    inflow = flows[rows, year]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        years = np.where(year > 0, year - 1 + -before / inflow, 0.0)
+    return np.where(recovered.any(axis=1), years, np.inf)
+
+
+def evaluate(investment, annual_savings, years=DEFAULT_YEARS, discount_rate=DEFAULT_DISCOUNT_RATE, growth=0.0):
+    """Every metric for every project, as a dict of arrays."""
+    flows = cash_flows(investment, annual_savings, years, growth)
+    invested, savings = -flows[:, 0], flows[:, 1:]
+    discounted = flows * discount_factors(discount_rate, flows.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(invested > 0, (savings[:, 0] - invested) / invested, np.nan)
+        total_roi = np.where(invested > 0, (savings.sum(axis=1) - invested) / invested, np.nan)
+    return {
+        "investment": invested, "annual_savings": savings[:, 0], "roi": roi, "total_roi": total_roi,
+        "pv_savings": discounted[:, 1:].sum(axis=1), "npv": discounted.sum(axis=1), "irr": irr(flows),
+        "payback": payback(flows), "discounted_payback": payback(discounted),
+    }
+
+
+def format_money(value):
+    sign, value = "-" if value < 0 else "", abs(value)
+    for unit, scale in (("B", 1e9), ("M", 1e6), ("k", 1e3)):
+        if value >= scale:
+            return f"{sign}${value / scale:.1f}{unit}"
+    return f"{sign}${value:.0f}"
+
+
+def _percent(value):
+    return "n/a" if np.isnan(value) else f"{value:.1%}"
+
+
+def _years(value):
+    return "never" if np.isinf(value) else f"{value:.1f}y"
+
+
+def format_table(names, metrics, years=DEFAULT_YEARS, discount_rate=DEFAULT_DISCOUNT_RATE, max_rows=20):
+    """A portfolio summary line, then one line per project by NPV (the best and the worst when truncated)."""
+    order = np.argsort(-metrics["npv"])
+    n = len(order)
+    lines = [f"PORTFOLIO: {n} projects | {years}-year horizon at {discount_rate:.0%} | invested "
+             f"{format_money(metrics['investment'].sum())} | NPV {format_money(metrics['npv'].sum())} | "
+             f"{int((metrics['npv'] < 0).sum())} with negative NPV | median IRR "
+             f"{_percent(np.nanmedian(metrics['irr'])) if np.isfinite(metrics['irr']).any() else 'n/a'}",
+             f"{'project':<24} {'invest':>8} {'save/yr':>8} {'ROI y1':>8} {'NPV':>8} {'IRR':>8} "
+             f"{'payback':>8} {'disc.pb':>8}"]
+    shown = order if n <= max_rows else np.concatenate([order[:max_rows - 5], order[-5:]])
+    for rank, i in enumerate(shown):
+        if n > max_rows and rank == max_rows - 5:
+            lines.append(f"... {n - max_rows} more ...")
+        lines.append(f"{names[i][:24]:<24} {format_money(metrics['investment'][i]):>8} "
+                     f"{format_money(metrics['annual_savings'][i]):>8} {_percent(metrics['roi'][i]):>8} "
+                     f"{format_money(metrics['npv'][i]):>8} {_percent(metrics['irr'][i]):>8} "
+                     f"{_years(metrics['payback'][i]):>8} {_years(metrics['discounted_payback'][i]):>8}")
+    return "\n".join(lines)
+
+
+def portfolio_financials(projects: str, years: int = DEFAULT_YEARS,
+                         discount_rate: float = DEFAULT_DISCOUNT_RATE) -> str:
+    """
+    Evaluates a whole portfolio of projects in one call: ROI, NPV, IRR and payback for each.
+    Use it instead of calling an ROI tool once per project.
+    Args:
+        projects: One project per line (or separated by ';') as "name, investment, annual_savings",
+            e.g. "AI Gateway, 3000000, 6500000". Amounts like "$3M" or "250,000" are accepted.
+        years: Horizon in years over which the annual savings accrue (default 5).
+        discount_rate: Annual discount rate for NPV, e.g. 0.08 for 8% (default 0.08).
+    """
+    try:
+        names, investments, savings = parse_projects(projects)
+        years, discount_rate = int(years), float(discount_rate)
+        if years < 1:
+            raise ValueError(f"years must be at least 1, got {years}")
+    except (ValueError, TypeError) as e:
+        return f"Error: {e}"
+    if not names:
+        return "Error: No projects given."
+    metrics = evaluate(investments, savings, years, discount_rate)
+    return format_table(names, metrics, years, discount_rate)
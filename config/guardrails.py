@@ -0,0 +1,402 @@
+"""
+FILE: config/guardrails.py
+DESCRIPTION: Local pre-model guardrails: reject or redirect clearly disallowed requests without a model call.
+
+WHY THIS EXISTS: Lesson 05 enforces its safeguard rules (no salaries or PII,
+no stock predictions, stay on IT strategy) through the system instruction
+alone. Every obviously disallowed question therefore still costs a full
+model round trip, and the answer depends on a small model obeying. Guardrail
+decides in microseconds, before the Runner calls the model:
+
+  * Terms: one compiled Aho-Corasick automaton over every rule's trigger
+    phrases ("salary", "share price", ...). It finds all of them in a single
+    pass over the text, matching whole words only.
+  * Entities: regexes for emails, employee IDs, salary figures, SSNs,
+    questions about a person's pay and stock tickers.
+  * Topics: a linear classifier over word and word-pair features, trained
+    at start-up on a small seed set (SEED_EXAMPLES), with one score per rule
+    category.
+
+Each rule scores its category's classifier probability plus a bonus per term
+or entity hit. At `block_at` or above, the rule's action applies: "block" or
+"redirect", with its canned policy response, but only when the request is
+clearly disallowed: an entity hit, or a term hit the classifier agrees with
+(probability >= `agree_at`) and no aggregate wording ("budget", "total",
+"benchmark", "vendor", ... in REVIEW_TERMS) or work context (a rule's own
+`review_terms`: a poem "about the cloud migration") around it. An email or
+employee ID alone is not enough ("Email jane@acme.com the roadmap"): it
+needs a term hit of the rule or the classifier's agreement. Otherwise, and
+between `review_at` and `block_at`, the verdict is "review": the request is
+ambiguous and goes to the model, whose instruction still carries the rules.
+Below `review_at`, the request is allowed.
+
+Rules are configurable per agent: GuardrailPlugin maps agent names to
+Guardrails and answers from `before_run_callback`, so a blocked request
+never reaches the model (get_runner attaches it when GUARDRAILS=1).
+"""
+import collections
+import math
+import re
+import time
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+_TOKEN = re.compile(r"[a-z0-9$']+")
+
+
+class AhoCorasick:
+    """A multi-pattern matcher: finds every occurrence of every pattern in one pass (case-insensitive)."""
+
+    def __init__(self, patterns):
+        """`patterns` is an iterable of (phrase, value) pairs; `value` is returned with each match."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for phrase, value in patterns:
+            state = 0
+            for ch in phrase.lower():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] += ((len(phrase), value),)
+        # Failure links, breadth first: the longest proper suffix that is also a prefix of some pattern.
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def step(self, state, ch):
+        """The state after reading `ch` (lower case) in `state`; 0 is the start state."""
+        goto, fail = self._goto, self._fail
+        while state and ch not in goto[state]:
+            state = fail[state]
+        return goto[state].get(ch, 0)
+
+    def outputs(self, state):
+        """(pattern length, value) for every pattern ending at `state`."""
+        return self._out[state]
+
+    def search(self, text, whole_words=True):
+        """Yields (start, end, value) for each match in `text`."""
+        lowered = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                start, end = i - length + 1, i + 1
+                if whole_words and ((start > 0 and lowered[start - 1].isalnum())
+                                    or (end < len(lowered) and lowered[end].isalnum())):
+                    continue
+                yield start, end, value
+
+
+ENTITY_PATTERNS = {
+    "email": re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b"),
+    "employee_id": re.compile(r"\b(?:EMP|EID|E)[-#]?\d{4,7}\b", re.IGNORECASE),
+    "salary_figure": re.compile(r"\$\s?\d{2,3}(?:,\d{3})+(?:\.\d+)?(?!\s*(?:m|mn|million|bn|billion)\b)|"
+                                r"\$\s?\d{2,3}(?:\.\d+)?\s?k\b", re.IGNORECASE),
+    "ssn": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "ticker": re.compile(r"\b(?:NASDAQ|NYSE)\s*:\s*[A-Z]{1,5}\b|\$[A-Z]{2,5}\b"),
+    # "How much does <someone> earn / make / get paid": a question about a person's pay, not a cost.
+    "pay_question": re.compile(r"\bhow much (?:does|do|did) [\w' .-]{1,40}? (?:earn|earns|make|makes|take home|"
+                               r"get paid)\b(?! back)", re.IGNORECASE),
+}
+
+
+def _features(text):
+    words = _TOKEN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+# A small seed set per topic; extend it (TopicClassifier.train) with real traffic for a given agent.
+SEED_EXAMPLES = {
+    "compensation_pii": [
+        "who are the highest paid engineers and what are their salaries",
+        "what is the salary of our head of cloud",
+        "list employee compensation for the data team",
+        "how much does jane earn per year",
+        "show me the bonus and pay of each manager",
+        "give me the home address and phone number of the cto",
+        "what is john's salary and social security number",
+        "share the payroll details for the infrastructure team",
+        "rank staff by total compensation",
+        "which developers got the largest raises this year",
+        "send me the personal email of every architect",
+        "what does the top earner in it make",
+    ],
+    "stock_prediction": [
+        "will our stock price go up next quarter",
+        "should i buy nvidia shares now",
+        "predict the share price after the ai announcement",
+        "is microsoft stock a good investment",
+        "what will the market cap be next year",
+        "forecast our ticker for the earnings call",
+        "which tech stocks will outperform in 2026",
+        "should we short the competitor's stock",
+        "give me a price target for the stock",
+        "is it a good time to sell my shares",
+    ],
+    "off_topic": [
+        "what is a good recipe for lasagna",
+        "who will win the football match tonight",
+        "write me a poem about the ocean",
+        "what's the weather tomorrow in paris",
+        "recommend a movie for the weekend",
+        "plan my holiday to spain",
+        "tell me a joke about cats",
+        "how do i fix my car's brakes",
+        "what are the best running shoes",
+        "help me with my chemistry homework",
+    ],
+    "it_strategy": [
+        "draft a roadmap for moving our erp to the cloud",
+        "what is the roi of agentic automation in finance",
+        "assess the risk of vendor lock in for our data platform",
+        "how should we split the ai innovation budget across pilots",
+        "compare rpa and agentic ai for operations",
+        "what are the key dependencies for a data governance program",
+        "summarize the technical debt in our legacy systems",
+        "how do we measure the business value of our it portfolio",
+        "what skills does the team need for ai adoption",
+        "should we build or buy the analytics platform",
+        "how much will the cloud migration cost and when does it pay back",
+        "how do salary trends in the market affect our hiring strategy",
+        "what does the market for ai platforms look like",
+        "how do we reduce infrastructure spend by 20 percent",
+        "what is the yearly running cost of the observability stack",
+        "what return will the data lake investment generate over three years",
+        "estimate the staffing cost of a platform engineering squad",
+        "what efficiency gains should the automation pilot deliver",
+        # Trigger words about the portfolio rather than a person or a trade; the benchmark's MUST_NOT_BLOCK
+        # questions are held out and must not be copied here.
+        "how big should the aggregate pay envelope be for the new data team",
+        "do market movements in supplier valuations change our contract strategy",
+        "compose a light rhyme for the quarterly town hall celebrating the data platform launch",
+        "prepare a friendly announcement for staff about the crm upgrade",
+    ],
+}
+
+
+class TopicClassifier:
+    """Multinomial logistic regression over word and word-pair features; prediction is pure Python."""
+
+    def __init__(self, labels, weights, bias):
+        self.labels = list(labels)
+        self.weights = weights  # feature -> per-label weights
+        self.bias = bias
+
+    @classmethod
+    def train(cls, examples, epochs=300, learning_rate=0.5, l2=1e-3):
+        """Fits on {label: [texts]} with batch gradient descent (numpy), then keeps the weights as dicts."""
+        import numpy as np
+        labels = list(examples)
+        vocabulary, rows, targets = {}, [], []
+        for index, label in enumerate(labels):
+            for text in examples[label]:
+                rows.append([vocabulary.setdefault(f, len(vocabulary)) for f in _features(text)])
+                targets.append(index)
+        x = np.zeros((len(rows), len(vocabulary)))
+        for i, row in enumerate(rows):
+            for j in row:
+                x[i, j] += 1.0
+        y = np.eye(len(labels))[targets]
+        w, b = np.zeros((len(vocabulary), len(labels))), np.zeros(len(labels))
+        for _ in range(epochs):
+            logits = x @ w + b
+            p = np.exp(logits - logits.max(axis=1, keepdims=True))
+            p /= p.sum(axis=1, keepdims=True)
+            grad = (p - y) / len(rows)
+            w -= learning_rate * (x.T @ grad + l2 * w)
+            b -= learning_rate * grad.sum(axis=0)
+        weights = {f: w[j].tolist() for f, j in vocabulary.items()}
+        return cls(labels, weights, b.tolist())
+
+    def predict(self, text):
+        """{label: probability}."""
+        scores = list(self.bias)
+        n = len(scores)
+        for feature in _features(text):
+            weights = self.weights.get(feature)
+            if weights is not None:
+                for i in range(n):
+                    scores[i] += weights[i]
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return {label: e / total for label, e in zip(self.labels, exps)}
+
+
+_DEFAULT_CLASSIFIER = None
+
+
+def default_classifier():
+    """The classifier trained on SEED_EXAMPLES, built once per process."""
+    global _DEFAULT_CLASSIFIER
+    if _DEFAULT_CLASSIFIER is None:
+        _DEFAULT_CLASSIFIER = TopicClassifier.train(SEED_EXAMPLES)
+    return _DEFAULT_CLASSIFIER
+
+
+class Rule:
+    """A policy: its topic, trigger phrases and entities, what to do, and the canned response."""
+
+    def __init__(self, category, action, response, terms=(), entities=(), review_terms=()):
+        self.category = category
+        self.action = action  # "block" or "redirect"
+        self.response = response
+        self.terms = tuple(terms)
+        self.entities = tuple(entities)
+        self.review_terms = tuple(review_terms)  # Context that leaves a term hit of this rule to the model.
+
+    def __repr__(self):
+        return f"Rule({self.category!r}, {self.action!r})"
+
+
+# The three safeguard rules of Lesson 05.
+DEFAULT_RULES = (
+    Rule("compensation_pii", "block",
+         "I can't share or estimate individual employees' salaries or other personal data. I can help with "
+         "aggregate compensation benchmarks or workforce strategy instead.",
+         # Only phrases about people's pay: "how much does", "earn" or "bonus" alone also open cost and ROI
+         # questions, so those count only as a pay_question ("how much does <someone> earn").
+         terms=("salary", "salaries", "compensation", "payroll", "highest-paid", "highest paid", "top earner",
+                "bonuses", "home address", "phone number", "social security", "personal email"),
+         entities=("email", "employee_id", "salary_figure", "ssn", "pay_question")),
+    Rule("stock_prediction", "block",
+         "I'm an internal strategy tool, not a financial advisor, so I can't make stock market predictions. "
+         "I can assess how market trends affect our IT strategy.",
+         terms=("stock price", "share price", "stocks", "shares", "buy shares", "sell shares", "price target",
+                "market cap", "short the", "ticker", "investment advice"),
+         entities=("ticker",)),
+    Rule("off_topic", "redirect",
+         "That's outside IT strategy. I can help with technology roadmaps, portfolio decisions, ROI and risk.",
+         terms=("recipe", "football", "weather", "movie", "poem", "joke", "holiday", "homework"),
+         # A poem or a joke about the migration, for the all-hands, is still work.
+         review_terms=("cloud", "migration", "erp", "roadmap", "platform", "data", "ai", "automation",
+                       "all-hands", "all hands", "town hall", "offsite", "kickoff", "launch")),
+)
+
+
+# Entities that also appear in ordinary requests (sending a document, naming a colleague): on their own they prove
+# nothing, so they block only with a term hit of the rule or the classifier's agreement.
+WEAK_ENTITIES = frozenset({"email", "employee_id"})
+
+# Aggregate or portfolio wording: a term hit next to one of these is about budgets and vendors, not a person or a
+# trade, so it is left to the model.
+REVIEW_TERMS = ("budget", "budgets", "total", "aggregate", "average", "benchmark", "benchmarks", "headcount",
+                "vendor", "vendors", "licensing", "market rate", "market rates")
+
+
+class Verdict:
+    """The outcome of a check: "allow", "review" (send to the model), "block" or "redirect"."""
+
+    __slots__ = ("action", "category", "score", "reasons", "response", "seconds")
+
+    def __init__(self, action, category=None, score=0.0, reasons=(), response=None, seconds=0.0):
+        self.action = action
+        self.category = category
+        self.score = score
+        self.reasons = reasons
+        self.response = response
+        self.seconds = seconds
+
+    @property
+    def blocked(self):
+        """Whether the canned response replaces the model call."""
+        return self.action in ("block", "redirect")
+
+    def __repr__(self):
+        return f"Verdict({self.action!r}, {self.category!r}, score={self.score:.2f}, reasons={list(self.reasons)})"
+
+
+class Guardrail:
+    """Checks a request against rules with one automaton pass, entity regexes and the topic classifier."""
+
+    def __init__(self, rules=DEFAULT_RULES, classifier=None, block_at=0.75, review_at=0.45, hit_bonus=0.35,
+                 agree_at=0.5, review_terms=REVIEW_TERMS):
+        self.rules = list(rules)
+        self.classifier = classifier or default_classifier()
+        self.block_at = block_at
+        self.review_at = review_at
+        self.hit_bonus = hit_bonus
+        self.agree_at = agree_at
+        self.automaton = AhoCorasick((term, rule.category) for rule in self.rules for term in rule.terms)
+        self.review_automaton = AhoCorasick(
+            [(term, (None, term)) for term in review_terms]
+            + [(term, (rule.category, term)) for rule in self.rules for term in rule.review_terms])
+        self.entities = {name: ENTITY_PATTERNS[name] for rule in self.rules for name in rule.entities}
+        self.stats = collections.Counter()
+
+    def check(self, text):
+        start = time.perf_counter()
+        hits = collections.defaultdict(list)
+        for s, e, category in self.automaton.search(text):
+            hits[category].append(text[s:e])
+        found = {name for name, pattern in self.entities.items() if pattern.search(text)}
+        context = [value for _, _, value in self.review_automaton.search(text)]
+        probabilities = self.classifier.predict(text)
+
+        best = None
+        for rule in self.rules:
+            terms = [f"term:{t.lower()}" for t in hits.get(rule.category, ())]
+            strong = [name for name in rule.entities if name in found and name not in WEAK_ENTITIES]
+            weak = [name for name in rule.entities if name in found and name in WEAK_ENTITIES]
+            reasons = terms + [f"entity:{name}" for name in strong + weak]
+            probability = probabilities.get(rule.category, 0.0)
+            score = min(1.0, probability + self.hit_bonus * min(len(reasons), 2))
+            # A term alone is not enough: the classifier has to agree, and aggregate or work context keeps it
+            # ambiguous.
+            agrees = probability >= self.agree_at
+            ambiguous = [f"context:{term}" for category, term in context if category in (None, rule.category)]
+            clear = bool(strong) or (bool(weak) and (bool(terms) or agrees)) or (agrees and not ambiguous)
+            if best is None or score > best[0]:
+                best = (score, rule, reasons + (ambiguous if reasons else []), clear)
+        score, rule, reasons, clear = best
+        if score >= self.block_at and clear:
+            verdict = Verdict(rule.action, rule.category, score, tuple(reasons), rule.response)
+        elif score >= self.review_at:
+            verdict = Verdict("review", rule.category, score, tuple(reasons))
+        else:
+            verdict = Verdict("allow", None, score)
+        verdict.seconds = time.perf_counter() - start
+        self.stats[verdict.action] += 1
+        return verdict
+
+
+def _message_text(content):
+    return "".join(part.text or "" for part in (content.parts or [])) if content else ""
+
+
+class GuardrailPlugin(BasePlugin):
+    """Answers blocked requests with the policy response before the agent runs; per-agent Guardrails."""
+
+    def __init__(self, policies, name="guardrails"):
+        super().__init__(name=name)
+        self.policies = dict(policies)  # agent name -> Guardrail
+        self.last_verdict = None
+        self.stats = collections.Counter()
+
+    async def before_run_callback(self, *, invocation_context):
+        guardrail = self.policies.get(invocation_context.agent.name)
+        if guardrail is None:
+            return None
+        verdict = self.last_verdict = guardrail.check(_message_text(invocation_context.user_content))
+        self.stats[verdict.action] += 1
+        if verdict.blocked:
+            return types.Content(role="model", parts=[types.Part(text=verdict.response)])
+        return None
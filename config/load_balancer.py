@@ -0,0 +1,269 @@
+"""
+FILE: config/load_balancer.py
+DESCRIPTION: Spreads model calls over a pool of Ollama endpoints.
+
+WHY THIS EXISTS: With a single OLLAMA_API_BASE, batch peaks saturate one box
+while the others sit idle. LoadBalancerLayer sits innermost in the model-call
+stack and picks the endpoint for every call. It rewrites the call's `api_base`
+and pooled `client`:
+
+  * Least-outstanding routing: each call goes to the healthy endpoint with the
+    fewest calls in progress (ties rotate).
+  * Health: a call that fails on an endpoint (connection error, timeout, 5xx)
+    counts against it. After `eject_after` consecutive failures the endpoint
+    is ejected and the call is retried elsewhere. A background check polls
+    `/api/version` every `health_interval` seconds and re-admits (or ejects)
+    endpoints.
+  * Hedging (optional): if no response arrives within the observed p95 (time
+    to first chunk when streaming, time to response otherwise), the same call
+    is sent to a second endpoint. The first to answer wins and the loser is
+    cancelled. Hedging waits for `hedge_min_samples` latencies first.
+"""
+import asyncio
+import collections
+import itertools
+import logging
+import time
+
+import httpx
+import litellm
+
+from config.model_layers import ModelClientLayer
+
+logger = logging.getLogger("strategy_suite.load_balancer")
+
+# Failures that say something about the endpoint rather than the request.
+_NODE_ERRORS = (
+    litellm.APIConnectionError, litellm.InternalServerError, litellm.ServiceUnavailableError,
+    litellm.Timeout, httpx.TransportError, ConnectionError,
+)
+
+
+class Endpoint:
+    """One Ollama server in the pool, with its client and running counters."""
+
+    def __init__(self, url, client):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.stats = {"calls": 0, "failures": 0, "ejections": 0}
+
+    def __repr__(self):
+        state = "up" if self.healthy else "EJECTED"
+        return f"Endpoint({self.url}, {state}, outstanding={self.outstanding})"
+
+
+class LoadBalancerLayer(ModelClientLayer):
+    """Routes each call to the least-busy healthy endpoint, with optional hedging."""
+
+    def __init__(self, clients, inner=None, hedge=False, hedge_quantile=0.95, hedge_min_samples=20,
+                 eject_after=3, health_interval=10.0):
+        super().__init__(inner)
+        self.endpoints = [Endpoint(url, client) for url, client in clients.items()]
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.eject_after = eject_after
+        self.health_interval = health_interval
+        # Recent latencies of successful calls, kept apart for streaming (first chunk) and whole responses.
+        self.latencies = {True: collections.deque(maxlen=500), False: collections.deque(maxlen=500)}
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+        self._rotation = itertools.count()
+        self._health_task = None
+
+    # --- Endpoint selection and health ---
+    def pick(self, exclude=()):
+        """The healthy endpoint with the fewest outstanding calls (any endpoint if none is healthy)."""
+        candidates = [e for e in self.endpoints if e not in exclude]
+        healthy = [e for e in candidates if e.healthy] or candidates
+        if not healthy:
+            return None
+        least = min(e.outstanding for e in healthy)
+        tied = [e for e in healthy if e.outstanding == least]
+        return tied[next(self._rotation) % len(tied)]
+
+    def _record_failure(self, endpoint, error):
+        endpoint.stats["failures"] += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.healthy and endpoint.consecutive_failures >= self.eject_after:
+            endpoint.healthy = False
+            endpoint.stats["ejections"] += 1
+            logger.warning("Ejected %s after %d failures: %s", endpoint.url, endpoint.consecutive_failures, error)
+
+    def _record_success(self, endpoint, stream, latency):
+        endpoint.consecutive_failures = 0
+        self.latencies[stream].append(latency)
+
+    async def check_health(self):
+        """Probes every endpoint once; ejects unreachable ones and re-admits recovered ones."""
+        for endpoint in self.endpoints:
+            try:
+                response = await endpoint.client.get(f"{endpoint.url}/api/version", timeout=5.0)
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            if ok and not endpoint.healthy:
+                logger.info("Re-admitted %s", endpoint.url)
+                endpoint.consecutive_failures = 0
+            elif not ok and endpoint.healthy:
+                endpoint.stats["ejections"] += 1
+                logger.warning("Ejected %s: health check failed", endpoint.url)
+            endpoint.healthy = ok
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    def hedge_delay(self, stream):
+        """The observed p95 latency, or None until enough calls have been seen."""
+        samples = self.latencies[stream]
+        if not self.hedge or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))]
+
+    # --- Calls ---
+    async def acompletion(self, model, messages, tools, **kwargs):
+        if self._health_task is None and self.health_interval:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+        self.stats["calls"] += 1
+        stream = bool(kwargs.get("stream"))
+
+        tried = []
+        while True:
+            endpoint = self.pick(exclude=tried)
+            tried.append(endpoint)
+            try:
+                return await self._hedged(endpoint, tried, model, messages, tools, stream, kwargs)
+            except _NODE_ERRORS:
+                # Retry on a different endpoint while there is one left.
+                if self.pick(exclude=tried) is None:
+                    raise
+                self.stats["retries"] += 1
+
+    async def _hedged(self, endpoint, tried, model, messages, tools, stream, kwargs):
+        """Runs the call on `endpoint`, adding a hedge elsewhere if it is slower than p95."""
+        primary = asyncio.ensure_future(self._attempt(endpoint, model, messages, tools, stream, kwargs))
+        attempts, winner = [primary], None
+        try:
+            delay = self.hedge_delay(stream)
+            if delay is not None:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                backup = None if done else self.pick(exclude=tried)
+                if backup is not None and backup.healthy:
+                    self.stats["hedges"] += 1
+                    tried.append(backup)
+                    attempts.append(asyncio.ensure_future(
+                        self._attempt(backup, model, messages, tools, stream, kwargs)))
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is not None:
+                    if winner is not primary:
+                        self.stats["hedge_wins"] += 1
+                    return winner.result()
+            return primary.result()  # Every attempt failed: surface the primary's error.
+        finally:
+            # Cancel the loser; if it also finished, close the stream it opened.
+            for task in attempts:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None and stream:
+                    await task.result().aclose()
+
+    async def _attempt(self, endpoint, model, messages, tools, stream, kwargs):
+        """One call on one endpoint. Streams are returned once their first chunk has arrived."""
+        call_kwargs = dict(kwargs, api_base=endpoint.url, client=endpoint.client)
+        endpoint.outstanding += 1
+        endpoint.stats["calls"] += 1
+        start = time.perf_counter()
+        handed_off = False
+        try:
+            response = await self.inner.acompletion(model=model, messages=messages, tools=tools, **call_kwargs)
+            if not stream:
+                self._record_success(endpoint, stream, time.perf_counter() - start)
+                return response
+            iterator = response.__aiter__()
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                # Cancelled (a losing hedge) or failed: hang up so the server stops generating.
+                if hasattr(iterator, "aclose"):
+                    await asyncio.shield(iterator.aclose())
+                raise
+            self._record_success(endpoint, stream, time.perf_counter() - start)
+            handed_off = True
+            return _TrackedStream(endpoint, iterator, first)
+        except _NODE_ERRORS as e:
+            self._record_failure(endpoint, e)
+            raise
+        finally:
+            if not handed_off:
+                endpoint.outstanding -= 1
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await super().aclose()
+
+
+class _TrackedStream:
+    """A stream whose first chunk was read during routing; releases its endpoint however it ends.
+
+    `aclose()` releases the slot whether or not iteration ever began (a losing hedge is closed unread), and
+    releasing twice is a no-op. A consumer that stops iterating without `aclose()` (breaking out of `async for`)
+    releases it when the stream is garbage collected.
+    """
+
+    def __init__(self, endpoint, iterator, first):
+        self.endpoint = endpoint
+        self._iterator = iterator
+        self._first = first
+        self._released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._released:
+            raise StopAsyncIteration
+        if self._first is not None:
+            chunk, self._first = self._first, None
+            return chunk
+        try:
+            return await self._iterator.__anext__()
+        except BaseException as e:
+            if isinstance(e, _NODE_ERRORS):
+                self.endpoint.stats["failures"] += 1
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        if self._release() and hasattr(self._iterator, "aclose"):
+            await self._iterator.aclose()
+
+    def _release(self):
+        """Gives the endpoint its slot back; True the first time only."""
+        if self._released:
+            return False
+        self._released = True
+        self._first = None
+        self.endpoint.outstanding -= 1
+        return True
+
+    def __del__(self):
+        if self._release() and hasattr(self._iterator, "aclose"):
+            try:
+                asyncio.get_running_loop().create_task(self._iterator.aclose())
+            except RuntimeError:
+                pass  # No loop left to hang up on; the connection goes with the process.
@@ -0,0 +1,128 @@
+"""
+FILE: config/model_layers.py
+DESCRIPTION: Composable layers at the model-call boundary.
+
+WHY THIS EXISTS: Every Agent built from get_model() sends its turns through
+one object: the LiteLLMClient that ADK's LiteLlm calls with the fully
+assembled request (model, messages, tools and generation parameters). Each
+layer here wraps the next one, so cross-cutting behaviour (caching,
+coalescing, routing, scheduling) can be stacked without touching the agents:
+
+    LiteLlm -> ResponseCacheLayer -> ... -> LiteLLMClient -> Ollama
+"""
+import asyncio
+import hashlib
+import json
+
+from google.adk.models.lite_llm import LiteLLMClient
+
+# Request arguments that change how a call is transported, not what it asks for.
+TRANSPORT_ARGS = {"client", "api_base", "api_key", "timeout", "keep_alive", "stream_options", "headers",
+                  "extra_headers", "drop_params"}
+
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return _jsonable(value.model_dump(exclude_none=True))
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+def request_key(model, messages, tools, **kwargs):
+    """A stable hash of everything that determines a model's answer.
+
+    Covers the model, the messages (system instruction and history included),
+    the tool schemas and the generation parameters; transport details such as
+    the endpoint or HTTP client are ignored.
+    """
+    payload = {
+        "model": model,
+        "messages": _jsonable(messages),
+        "tools": _jsonable(tools),
+        "params": _jsonable({k: v for k, v in kwargs.items() if k not in TRANSPORT_ARGS}),
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ModelClientLayer(LiteLLMClient):
+    """Base class for a layer; forwards every call to `inner` unchanged."""
+
+    def __init__(self, inner=None):
+        self.inner = inner or LiteLLMClient()
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+    async def aclose(self):
+        """Releases anything the layer holds (background tasks, files); chains inward."""
+        if isinstance(self.inner, ModelClientLayer):
+            await self.inner.aclose()
+
+
+class ModelInfoLayer(ModelClientLayer):
+    """Awaits `prepare(model, api_base)` before each call; for per-model setup that must not run at construction.
+
+    `prepare` is expected to cache its own result, so only the first call of a model pays for it.
+    """
+
+    def __init__(self, prepare, api_base, inner=None):
+        super().__init__(inner)
+        self.prepare = prepare
+        self.api_base = api_base
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        await self.prepare(model, kwargs.get("api_base") or self.api_base)
+        return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+
+class ReleasingStream:
+    """Wraps a response stream; calls `release()` exactly once, however the stream ends.
+
+    A layer that holds something for the life of a stream (a slot, a waiter count) cannot rely on the `finally`
+    of an async generator: a generator that never started ignores `aclose()`. This wrapper releases on
+    exhaustion, on an error, on `aclose()` whether or not iteration began, and when it is garbage collected
+    unclosed (a consumer that broke out of `async for`). The inner stream is closed the same way.
+    """
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._iterator = stream.__aiter__()
+        self._release_once = release
+        self._released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._released:
+            raise StopAsyncIteration
+        try:
+            return await self._iterator.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        if self._release() and hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+    def _release(self):
+        """True the first time only."""
+        if self._released:
+            return False
+        self._released = True
+        self._release_once()
+        return True
+
+    def __del__(self):
+        if self._release() and hasattr(self._stream, "aclose"):
+            try:
+                asyncio.get_running_loop().create_task(self._stream.aclose())
+            except RuntimeError:
+                pass  # No loop left; the stream goes with the process.
@@ -0,0 +1,387 @@
+"""
+FILE: config/output_scanner.py
+DESCRIPTION: Incremental PII scanning of streamed model output: redact or stop before a leak is printed.
+
+WHY THIS EXISTS: The guardrails in config/guardrails.py only screen the
+request. Nothing checks what the model writes back, and checking the full
+response after generation is too late when it is streamed: the reader has
+already seen the leaked text. Re-running the regexes over everything
+received so far on every chunk would fix that, at quadratic cost.
+
+OutputScanner sits between the stream and the screen. It reads each chunk
+one character at a time through a small state machine per entity, with
+the same shapes as ENTITY_PATTERNS in config/guardrails.py:
+
+  * email: a run of [\\w.+-], "@", then a domain with at least one dot;
+    when the domain ends on "@" or "+", the candidate restarts where the
+    regex would retry ("a@b@c.com" finds "b@c.com", "a@b.c-@x.com" finds
+    "a@b.c" and "-@x.com");
+  * employee_id: EMP / EID / E, an optional "-" or "#", then 4-7 digits;
+  * salary_figure: "$120,000" (not followed by "million" / "bn"), or
+    "$120k".
+
+Each machine keeps its state across chunk boundaries, so a figure split
+over three tokens ("$1", "20,", "000") is still one match, and does
+constant work per character. Text is released as soon as no machine could
+still be inside a match that starts in it. Only a possible match is held
+back (at most `max_hold` characters, typically one word), never the whole
+response.
+
+With action="redact", every match is replaced by "[REDACTED:<kind>]".
+With action="abort", the scanner releases the text up to the first match,
+sets `aborted` and drops everything after it; the caller stops reading,
+which cancels the generation (StreamRenderer does this).
+"""
+import collections
+import time
+
+DEFAULT_ENTITIES = ("email", "employee_id", "salary_figure")
+_BIG_UNITS = {"m", "mn", "million", "bn", "billion"}
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class _EmailMatcher:
+    kind = "email"
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = None
+        self.phase = None  # "local", "at" or "domain"
+        self.dot = False
+        self.good = None  # End of the longest valid address so far.
+        self.domain = None  # Start of the domain's first word character.
+
+    def feed(self, ch, pos, prev):
+        if self.phase == "local":
+            if _is_word(ch) or ch in ".+-":
+                return None
+            if ch == "@":
+                self.phase = "at"
+                return None
+        elif self.phase == "at":
+            if _is_word(ch) or ch == "-":
+                self.phase = "domain"
+                self.domain = pos if _is_word(ch) else None
+                return None
+        elif self.phase == "domain":
+            if _is_word(ch):
+                if self.domain is None:
+                    self.domain = pos
+                if self.dot:
+                    self.good = pos + 1
+                return None
+            if ch in ".-":
+                self.dot = self.dot or ch == "."
+                return None
+            if ch in "@+":
+                # "@" and "+" can be part of a local part, so the regex retries inside this candidate:
+                # right after the address it found, or else at the domain's first word character.
+                match = self.finish()
+                if self.good:
+                    start = self.good if self.good < pos or ch == "+" else None
+                else:
+                    start = self.domain
+                self.reset()
+                if start is not None:
+                    self.start, self.phase = start, "at" if ch == "@" else "local"
+                return match
+        match = None
+        if self.phase:  # `ch` ends the candidate.
+            match = self.finish()
+            self.reset()
+        if _is_word(ch) and not (prev and _is_word(prev)):
+            self.start, self.phase = pos, "local"
+        return match
+
+    def finish(self):
+        return (self.start, self.good) if self.good else None
+
+
+class _EmployeeIdMatcher:
+    kind = "employee_id"
+    _PREFIXES = ("e", "em", "emp", "ei", "eid")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = None
+        self.prefix = ""
+        self.sep = False
+        self.digits = 0
+        self.end = None
+
+    def feed(self, ch, pos, prev):
+        match = None
+        if self.start is not None:
+            if not self.digits:
+                if not self.sep and self.prefix + ch.lower() in self._PREFIXES:
+                    self.prefix += ch.lower()
+                    return None
+                if self.prefix in ("e", "emp", "eid"):
+                    if ch in "-#" and not self.sep:
+                        self.sep = True
+                        return None
+                    if ch.isdigit():
+                        self.digits, self.end = 1, pos + 1
+                        return None
+            elif ch.isdigit() and self.digits < 7:
+                self.digits, self.end = self.digits + 1, pos + 1
+                return None
+            if not _is_word(ch):  # The ID has to end at a word boundary.
+                match = self.finish()
+            self.reset()
+        if ch in "eE" and not (prev and _is_word(prev)):
+            self.start, self.prefix = pos, "e"
+        return match
+
+    def finish(self):
+        return (self.start, self.end) if 4 <= self.digits <= 7 else None
+
+
+class _SalaryMatcher:
+    kind = "salary_figure"
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = None
+        self.phase = None
+        self.spaced = False
+        self.lead = 0       # Digits before the first comma.
+        self.group = 0      # Digits in the current ",000" group.
+        self.groups = 0     # Complete ",000" groups.
+        self.end = None     # End of the figure, once it is long enough to count.
+        self.word = ""      # The word after a figure: a unit such as "million" cancels the match.
+
+    def feed(self, ch, pos, prev):
+        phase = self.phase
+        if phase == "dollar":
+            if ch == " " and not self.spaced:
+                self.spaced = True
+                return None
+            if ch.isdigit():
+                self.phase, self.lead = "lead", 1
+                return None
+        elif phase == "lead":
+            if ch.isdigit() and self.lead < 3:
+                self.lead += 1
+                return None
+            if self.lead >= 2:
+                if ch == ",":
+                    self.phase, self.group = "comma", 0
+                    return None
+                if ch == ".":
+                    self.phase = "dot"
+                    return None
+                self.end = pos
+                return self._after_number(ch, pos, prev)
+        elif phase == "comma":
+            if ch.isdigit():
+                self.group += 1
+                if self.group == 3:
+                    self.phase, self.groups, self.end = "group", self.groups + 1, pos + 1
+                return None
+            return self._settle(ch, pos, prev)
+        elif phase == "group":
+            if ch == ",":
+                self.phase, self.group = "comma", 0
+                return None
+            if ch == ".":
+                self.phase = "dot"
+                return None
+            if ch.isdigit():
+                return self._settle(ch, pos, prev)
+            return self._after_number(ch, pos, prev)
+        elif phase == "dot":
+            if ch.isdigit():
+                self.phase, self.end = "decimal", pos + 1
+                return None
+            return self._settle(ch, pos, prev)
+        elif phase == "decimal":
+            if ch.isdigit():
+                self.end = pos + 1
+                return None
+            return self._after_number(ch, pos, prev)
+        elif phase == "unit":
+            if ch.isalpha() and len(self.word) < 8:
+                self.word += ch.lower()
+                return None
+            if ch.isspace() and not self.word:
+                return None
+            if _is_word(ch) or self.word not in _BIG_UNITS:
+                return self._settle(ch, pos, prev)
+        elif phase == "k":
+            if ch == " " and not self.spaced:
+                self.spaced = True
+                return None
+            if ch in "kK":
+                self.phase, self.end = "k_end", pos + 1
+                return None
+        elif phase == "k_end":
+            if not _is_word(ch):
+                return self._settle(ch, pos, prev, match=(self.start, self.end))
+        return self._settle(ch, pos, prev, match=None)
+
+    def _after_number(self, ch, pos, prev):
+        """Re-reads `ch`, the first character after the digits, in the phase that follows a figure."""
+        if self.groups:
+            self.phase, self.word = "unit", ""
+        else:
+            self.phase, self.spaced = "k", False
+        return self.feed(ch, pos, prev)
+
+    def _settle(self, ch, pos, prev, match=()):
+        """Ends the candidate, then lets `ch` start a new one."""
+        if match == ():
+            match = (self.start, self.end) if self.groups else None
+        self.reset()
+        if ch == "$":
+            self.start, self.phase = pos, "dollar"
+        return match
+
+    def finish(self):
+        if self.phase == "k_end":
+            return self.start, self.end
+        if self.groups and not (self.phase == "unit" and self.word in _BIG_UNITS):
+            return self.start, self.end
+        return None
+
+
+MATCHERS = {"email": _EmailMatcher, "employee_id": _EmployeeIdMatcher, "salary_figure": _SalaryMatcher}
+
+
+class OutputScanner:
+    """Scans streamed text for PII and releases it, redacted, once no match can still start in it."""
+
+    def __init__(self, entities=DEFAULT_ENTITIES, action="redact", max_hold=96):
+        if action not in ("redact", "abort"):
+            raise ValueError(f"action must be 'redact' or 'abort', not {action!r}")
+        self.entities = tuple(entities)
+        self.action = action
+        self.max_hold = max_hold
+        self.findings = []  # (kind, text as received)
+        self.notice = None  # Why the last aborted stream stopped.
+        self.stats = {"chars": 0, "chunks": 0, "max_held": 0, "seconds": 0.0}
+        self._start_stream()
+
+    def _start_stream(self):
+        self._matchers = [MATCHERS[name]() for name in self.entities]
+        self._held = []    # Characters received but not released yet.
+        self._base = 0     # Stream offset of self._held[0].
+        self._prev = ""    # The last character received.
+        self._spans = []   # Redactions, as (start, end, kind) in stream offsets, sorted and disjoint.
+        self._abort_at = None
+        self.aborted = False  # The current stream hit a match with action="abort"; cleared by close().
+
+    def feed(self, text):
+        """Takes the next chunk; returns the text that is now safe to show."""
+        if self.aborted:
+            return ""
+        t0 = time.perf_counter()
+        pos, prev = self._base + len(self._held), self._prev
+        for ch in text:
+            self._held.append(ch)
+            for matcher in self._matchers:
+                match = matcher.feed(ch, pos, prev)
+                if match:
+                    self._found(matcher.kind, *match)
+            pos, prev = pos + 1, ch
+            if self.aborted:
+                break
+        self._prev = prev
+        self.stats["chars"] += len(text)
+        self.stats["chunks"] += 1
+        released = self._release()
+        self.stats["seconds"] += time.perf_counter() - t0
+        return released
+
+    def close(self):
+        """Ends the stream: returns the held-back text and readies the scanner for the next one."""
+        if not self.aborted:
+            for matcher in self._matchers:
+                match = matcher.finish()
+                if match:
+                    self._found(matcher.kind, *match)
+                matcher.reset()
+        released = self._release()
+        self._start_stream()
+        return released
+
+    def stream(self, chunks):
+        """Yields the safe text for an iterable of chunks, stopping at an abort."""
+        for chunk in chunks:
+            text = self.feed(chunk)
+            if text:
+                yield text
+            if self.aborted:
+                self.close()
+                return
+        text = self.close()
+        if text:
+            yield text
+
+    def _found(self, kind, start, end):
+        if self.aborted:
+            return
+        self.findings.append((kind, "".join(self._held[start - self._base:end - self._base])))
+        if self.action == "abort":
+            self.aborted = True
+            self._abort_at = start
+            self.notice = f"[Response stopped: it was about to disclose personal data ({kind}).]"
+            return
+        spans = []
+        for span in self._spans:  # Merge with overlapping redactions (an employee ID inside an email).
+            if span[1] <= start or span[0] >= end:
+                spans.append(span)
+            else:
+                start, end, kind = min(start, span[0]), max(end, span[1]), span[2]
+        spans.append((start, end, kind))
+        self._spans = sorted(spans)
+
+    def _release(self):
+        end = self._base + len(self._held)
+        cut = end
+        if self.aborted:
+            cut = self._abort_at
+        else:
+            for matcher in self._matchers:
+                if matcher.start is None:
+                    continue
+                if end - matcher.start > self.max_hold:
+                    matcher.reset()  # Too long to be one of our entities: stop holding it back.
+                else:
+                    cut = min(cut, matcher.start)
+            for start, stop, _ in self._spans:
+                if start < cut < stop:
+                    cut = start
+        parts, offset = [], self._base
+        while self._spans and self._spans[0][1] <= cut:
+            start, stop, kind = self._spans.pop(0)
+            parts.append("".join(self._held[offset - self._base:start - self._base]))
+            parts.append(f"[REDACTED:{kind}]")
+            offset = stop
+        parts.append("".join(self._held[offset - self._base:cut - self._base]))
+        if self.aborted:
+            self._held = []
+        else:
+            del self._held[:cut - self._base]
+        self._base = cut
+        self.stats["max_held"] = max(self.stats["max_held"], end - cut)
+        return "".join(parts)
+
+    def report(self):
+        chars = self.stats["chars"]
+        if not chars:
+            return "[output scan] no text scanned"
+        counts = collections.Counter(kind for kind, _ in self.findings)
+        found = ", ".join(f"{kind} x{n}" for kind, n in counts.items()) or "nothing"
+        verb = "stopped at" if self.action == "abort" else "redacted"
+        return (f"[output scan] {found} {verb} in {chars} chars / {self.stats['chunks']} chunks | at most "
+                f"{self.stats['max_held']} chars held back | {self.stats['seconds'] / chars * 1e6:.2f}us per char")
@@ -0,0 +1,28 @@
+"""
+FILE: config/priority.py
+DESCRIPTION: The priority class of the model calls made in the current context.
+
+WHY THIS EXISTS: Batch runners and eval suites tag their work with
+`with model_priority("batch"):` and the AdmissionLayer (config/admission.py)
+reads the tag when a call arrives. The tag lives here, apart from the
+admission machinery, so tagging work costs nothing at import time: no
+LiteLLM or ADK model import just to set a context variable.
+"""
+import contextlib
+import contextvars
+
+_PRIORITY = contextvars.ContextVar("model_priority", default=None)
+
+
+@contextlib.contextmanager
+def model_priority(name):
+    """Model calls made inside this block are admitted under priority class `name`."""
+    token = _PRIORITY.set(name)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority():
+    return _PRIORITY.get()
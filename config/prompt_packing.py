@@ -0,0 +1,196 @@
+"""
+FILE: config/prompt_packing.py
+DESCRIPTION: Micro-batched prompt packing: several short audits in one model call.
+
+WHY THIS EXISTS: Each single-proposal call pays the full per-request
+overhead: prefill of the system instruction, an HTTP round trip and a
+scheduling slot. Yet the answers are a few sentences ("Be brief"). PackedBatch
+puts `pack_size` proposals into one prompt:
+
+  * Each proposal is labelled with a short alias (P1, P2, ...) between
+    delimiters, and the model is asked for a JSON object mapping alias -> answer.
+  * The reply is parsed as JSON (code fences and surrounding prose are
+    tolerated). Failing that, it is split on "P1:" / "### P1" style headings.
+  * Any proposal whose answer cannot be recovered is re-asked on its own, so
+    every item still gets an answer. A pack whose call fails (after the
+    scheduler's retries) is re-run as single calls too; the other packs keep
+    their answers. The single calls run after the packs, concurrently under
+    their own scheduler, so a pack's recovered answers are kept and only the
+    missing items are retried. Items whose single call also fails are left
+    out of the result and listed in `errors`.
+
+`run_single()` runs the same items one call each, with identical stats, and
+`savings()` compares the two: tokens and wall time per proposal.
+
+`ask(prompt)` is the caller's coroutine. It runs one model turn and returns
+(text, {"prompt_tokens": int, "completion_tokens": int}).
+"""
+import json
+import re
+import time
+
+from config.batch_scheduler import BatchScheduler
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+
+def pack_prompt(instruction, proposals):
+    """Builds one prompt for [(alias, text), ...]."""
+    aliases = ", ".join(f'"{alias}"' for alias, _ in proposals)
+    blocks = "\n".join(f"<<<{alias}>>>\n{text}\n<<<END {alias}>>>" for alias, text in proposals)
+    return (
+        f"{instruction}\n"
+        f"There are {len(proposals)} proposals below, each between <<<ID>>> and <<<END ID>>> markers.\n"
+        f"Answer each one separately. Reply with ONLY a JSON object whose keys are exactly {aliases} "
+        f"and whose values are the answer for that proposal as a string.\n\n{blocks}"
+    )
+
+
+def unpack_response(text, aliases):
+    """Returns {alias: answer} for every alias whose answer can be recovered from `text`."""
+    answers = {}
+    cleaned = _FENCE.sub("", text.strip())
+    start, end = cleaned.find("{"), cleaned.rfind("}")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(cleaned[start:end + 1])
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
+            for alias in aliases:
+                value = parsed.get(alias)
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value)
+                if isinstance(value, str) and value.strip():
+                    answers[alias] = value.strip()
+            if answers:
+                return answers
+
+    # Fallback: sections introduced by the alias ("P1:", "**P1**", "### P1", "[P1]").
+    heading = re.compile(r"^[\s#*\[\-]*(%s)\b[\]*]*\s*[:.\-]?\s*" % "|".join(map(re.escape, aliases)),
+                         re.MULTILINE)
+    matches = list(heading.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        body = text[match.end():following.start() if following else len(text)].strip()
+        if body and match.group(1) not in answers:
+            answers[match.group(1)] = body
+    return answers
+
+
+class PackedBatch:
+    """Audits (id, text) items in packs of `pack_size`, falling back to single calls on parse or call failures."""
+
+    def __init__(self, ask, instruction, single_template="{instruction} {text}", pack_size=5,
+                 **scheduler_options):
+        self.ask = ask
+        self.instruction = instruction
+        self.single_template = single_template
+        self.pack_size = pack_size
+        self.scheduler_options = dict({"report": None}, **scheduler_options)
+        self.packed_stats = self._new_stats()
+        self.single_stats = self._new_stats()
+        self.errors = {}  # id -> error, for items without an answer after the last run().
+
+    @staticmethod
+    def _new_stats():
+        return {"items": 0, "calls": 0, "fallback_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "elapsed": 0.0}
+
+    async def _call(self, prompt, stats):
+        text, usage = await self.ask(prompt)
+        stats["calls"] += 1
+        stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        stats["completion_tokens"] += usage.get("completion_tokens") or 0
+        return text
+
+    async def _single(self, key, text, stats):
+        prompt = self.single_template.format(instruction=self.instruction, text=text)
+        return await self._call(prompt, stats)
+
+    async def _pack(self, _, pack):
+        """Returns ({id: answer} recovered from the reply, [(id, text)] of the items it did not answer)."""
+        aliases = {f"P{i + 1}": (key, text) for i, (key, text) in enumerate(pack)}
+        prompt = pack_prompt(self.instruction, [(alias, text) for alias, (_, text) in aliases.items()])
+        reply = await self._call(prompt, self.packed_stats)
+        parsed = unpack_response(reply, list(aliases))
+        answers, missing = {}, []
+        for alias, (key, text) in aliases.items():
+            if alias in parsed:
+                answers[key] = parsed[alias]
+            else:
+                missing.append((key, text))
+        return answers, missing
+
+    async def run(self, items):
+        """Packed mode. Returns {id: answer}; items that failed even as single calls are in `errors` instead."""
+        items = list(items.items() if isinstance(items, dict) else items)
+        packs = [items[i:i + self.pack_size] for i in range(0, len(items), self.pack_size)]
+        start = time.perf_counter()
+        results = await BatchScheduler(self._pack, **self.scheduler_options).run(list(enumerate(packs)))
+        answers, unanswered = {}, []
+        for result in results:
+            if result.ok:
+                answered, missing = result.value
+                answers.update(answered)
+                unanswered += missing
+            else:
+                unanswered += packs[result.key]  # A failed pack: its items are asked one by one.
+        self.errors = {}
+        if unanswered:
+            async def worker(key, text):
+                return await self._single(key, text, self.packed_stats)
+
+            self.packed_stats["fallback_calls"] += len(unanswered)
+            for result in await BatchScheduler(worker, **self.scheduler_options).run(unanswered):
+                if result.ok:
+                    answers[result.key] = result.value
+                else:
+                    self.errors[result.key] = result.error
+        self.packed_stats["elapsed"] += time.perf_counter() - start
+        self.packed_stats["items"] += len(items)
+        return answers
+
+    async def run_single(self, items):
+        """One call per item, for comparison. Returns {id: answer}."""
+        items = list(items.items() if isinstance(items, dict) else items)
+
+        async def worker(key, text):
+            return await self._single(key, text, self.single_stats)
+
+        start = time.perf_counter()
+        results = await BatchScheduler(worker, **self.scheduler_options).run(items)
+        self.single_stats["elapsed"] += time.perf_counter() - start
+        self.single_stats["items"] += len(items)
+        for result in results:
+            if not result.ok:
+                raise result.error
+        return {result.key: result.value for result in results}
+
+    def savings(self):
+        """Per-proposal tokens and wall time: single calls vs. packed (needs both modes to have run)."""
+        def per_item(stats):
+            n = stats["items"] or 1
+            return {"tokens": (stats["prompt_tokens"] + stats["completion_tokens"]) / n,
+                    "prompt_tokens": stats["prompt_tokens"] / n, "seconds": stats["elapsed"] / n}
+
+        single, packed = per_item(self.single_stats), per_item(self.packed_stats)
+        return {
+            "single": single, "packed": packed,
+            "tokens_saved": single["tokens"] - packed["tokens"],
+            "seconds_saved": single["seconds"] - packed["seconds"],
+            "fallback_rate": self.packed_stats["fallback_calls"] / (self.packed_stats["items"] or 1),
+        }
+
+    def report(self):
+        if not self.single_stats["items"]:  # Packed mode only: nothing to compare against.
+            s, n = self.packed_stats, self.packed_stats["items"] or 1
+            return (f"[packing] {s['items']} proposals in {s['calls']} model calls (x{self.pack_size} per call): "
+                    f"{(s['prompt_tokens'] + s['completion_tokens']) / n:.0f} tokens / {s['elapsed'] / n:.2f}s "
+                    f"per proposal ({s['fallback_calls']} fallback calls)")
+        s = self.savings()
+        return (
+            f"[packing] per proposal: single {s['single']['tokens']:.0f} tokens / {s['single']['seconds']:.2f}s, "
+            f"packed x{self.pack_size} {s['packed']['tokens']:.0f} tokens / {s['packed']['seconds']:.2f}s "
+            f"-> saved {s['tokens_saved']:.0f} tokens and {s['seconds_saved']:.2f}s per proposal "
+            f"({self.packed_stats['fallback_calls']} fallback calls)"
+        )
@@ -0,0 +1,258 @@
+"""
+FILE: config/prompt_prefix.py
+DESCRIPTION: Prefix-stable prompt assembly, and measurement of Ollama's KV-cache reuse.
+
+WHY THIS EXISTS: Ollama (llama.cpp) keeps the KV cache of each slot's last
+prompt, so a new prompt only pays prefill after the longest prefix it shares
+with that prompt. Anything volatile near the start of a prompt wastes that
+cache: a session ID, a user ID or a timestamp in the system instruction, tool
+schemas listed in a different order, or a changed context size. Everything
+after the first differing character is evaluated again.
+
+PrefixStableLayer assembles every request from the most stable content to
+the least:
+
+  1. System instruction, with volatile lines removed (UUIDs, timestamps,
+     "User ID: <value>" / "Session ID: <value>" lines; see VOLATILE_PATTERNS).
+     Only lines that carry such a value move: a rule that merely mentions
+     an ID ("you MUST use the provided user_id") stays in the instruction.
+  2. Tool schemas, sorted by name, with their keys in canonical order.
+  3. Pinned context: the compaction summary (config/compaction.py), if any.
+  4. History, unchanged.
+  5. The new turn: the newest user message, with a "[Session context]"
+     block holding the volatile lines appended after its text. Earlier
+     turns never carry it, so every message sent on one call is sent again
+     byte for byte on the next, up to the end of that turn's own text.
+
+It also pins generation options (by default Ollama's own sampling defaults
+and a fixed num_ctx) on calls that do not set them. A different num_ctx
+makes Ollama reload the model and drop every cache, and identical options
+also keep response-cache keys identical.
+
+PrefixReuseMeter measures the effect from Ollama's own numbers. A wrapping
+HTTP transport (PrefixMeterTransport) reads each /api/chat request and the
+prompt_eval_count / prompt_eval_duration of its final response chunk. With a
+prefix hit, Ollama evaluates only the uncached tokens. The meter estimates
+each prompt's full size (characters per token are calibrated on calls with
+nothing to reuse), and reports per call the tokens reused and the prefill
+time saved at that call's measured per-token prefill rate.
+"""
+import collections
+import json
+import re
+
+import httpx
+
+from config.compaction import SUMMARY_HEADER
+from config.model_layers import ModelClientLayer
+
+VOLATILE_PATTERNS = (
+    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b",   # UUIDs (session ids)
+    r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}",                                  # ISO timestamps
+    r"(?i)\b(?:user|session|request|trace|invocation)[ _-]?id\s*[:=]\s*\S",  # "User ID: <value>" lines
+    r"(?i)\b(?:current|today'?s?) (?:date|time)\s*(?::|=|is\b)\s*\S",      # "Current date: <value>" lines
+)
+
+# Ollama's sampling defaults, plus a fixed context size (changing it reloads the model).
+DEFAULT_OPTIONS = {"temperature": 0.8, "top_k": 40, "top_p": 0.9, "num_ctx": 4096}
+
+CONTEXT_HEADER = "[Session context]"
+_EVAL_COUNT = re.compile(rb'"prompt_eval_count"\s*:\s*(\d+)')
+_EVAL_DURATION = re.compile(rb'"prompt_eval_duration"\s*:\s*(\d+)')
+
+
+def parse_options(spec):
+    """Parses "temperature=0.8,num_ctx=4096" into {"temperature": 0.8, "num_ctx": 4096}."""
+    options = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, value = item.split("=", 1)
+        number = float(value)
+        options[name.strip()] = int(number) if number.is_integer() and "." not in value else number
+    return options
+
+
+def _message_text(message):
+    content = message.get("content")
+    if isinstance(content, list):
+        return "".join(part.get("text") or "" for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def _canonical(value):
+    return json.loads(json.dumps(value, sort_keys=True))
+
+
+def render_prompt(body):
+    """The prompt as Ollama caches it: system messages, tool schemas, then the rest."""
+    messages = body.get("messages") or []
+    system = [m for m in messages if m.get("role") == "system"]
+    rest = [m for m in messages if m.get("role") != "system"]
+    return json.dumps(system) + json.dumps(body.get("tools") or []) + json.dumps(rest)
+
+
+def _shared_prefix(a, b):
+    n = min(len(a), len(b))
+    lo, hi = 0, n
+    while lo < hi:  # Binary search on slice equality: C-speed compares instead of a char loop.
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class PrefixStableLayer(ModelClientLayer):
+    """Orders each request from most to least stable content and pins generation options."""
+
+    def __init__(self, inner=None, options=None, volatile_patterns=VOLATILE_PATTERNS):
+        super().__init__(inner)
+        self.options = DEFAULT_OPTIONS if options is None else options
+        self.volatile = [re.compile(p) for p in volatile_patterns]
+        self.stats = {"calls": 0, "volatile_lines_moved": 0, "tools_reordered": 0}
+
+    def _split_volatile(self, text):
+        stable, volatile = [], []
+        for line in text.split("\n"):
+            (volatile if any(p.search(line) for p in self.volatile) else stable).append(line)
+        return "\n".join(stable), volatile
+
+    def assemble(self, messages, tools):
+        """(messages, tools) reordered for prefix reuse; the inputs are not modified."""
+        system, pinned, rest, moved = [], [], [], []
+        for message in messages or []:
+            if message.get("role") == "system":
+                text, volatile = self._split_volatile(_message_text(message))
+                moved += volatile
+                system.append(dict(message, content=text) if volatile else message)
+            elif message.get("role") == "user" and _message_text(message).startswith(SUMMARY_HEADER):
+                pinned.append(message)
+            else:
+                rest.append(message)
+        if moved:
+            self.stats["volatile_lines_moved"] += len(moved)
+            context = "\n\n" + "\n".join([CONTEXT_HEADER] + moved)
+            last_user = max((i for i, m in enumerate(rest) if m.get("role") == "user"), default=None)
+            if last_user is None:
+                rest.append({"role": "user", "content": context.lstrip()})
+            else:
+                message = rest[last_user]
+                content = message.get("content")
+                if isinstance(content, list):
+                    content = content + [{"type": "text", "text": context}]
+                else:
+                    content = (content or "") + context
+                rest[last_user] = dict(message, content=content)
+        if tools:
+            ordered = sorted(tools, key=lambda t: (t.get("function") or {}).get("name") or "")
+            if ordered != list(tools):
+                self.stats["tools_reordered"] += 1
+            tools = [_canonical(tool) for tool in ordered]
+        return system + pinned + rest, tools
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        self.stats["calls"] += 1
+        messages, tools = self.assemble(messages, tools)
+        for name, value in self.options.items():
+            kwargs.setdefault(name, value)
+        return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+
+class PrefixReuseMeter:
+    """Per-call prefix reuse, from each request body and Ollama's prompt_eval_count/duration."""
+
+    def __init__(self, slots=4, max_calls=1000):
+        self.slots = slots
+        self.calls = collections.deque(maxlen=max_calls)  # Newest last.
+        self._recent = {}  # endpoint -> deque of the last prompts it evaluated
+        self._chars_per_token = None
+        self.totals = {"calls": 0, "prompt_tokens": 0.0, "evaluated": 0, "reused": 0.0, "saved_seconds": 0.0}
+
+    def start(self, endpoint, body):
+        """Records a request; returns the callback for its final response chunk."""
+        prompt = render_prompt(body)
+        recent = self._recent.setdefault(endpoint, collections.deque(maxlen=self.slots))
+        expected = max((_shared_prefix(prompt, previous) for previous in recent), default=0)
+        recent.append(prompt)
+
+        def finish(evaluated, duration_ns):
+            self._observe(len(prompt), expected, evaluated, duration_ns)
+        return finish
+
+    def _observe(self, chars, expected_chars, evaluated, duration_ns):
+        if not expected_chars and evaluated:
+            # Nothing could be reused, so the whole prompt was evaluated: calibrate.
+            ratio = chars / evaluated
+            self._chars_per_token = ratio if self._chars_per_token is None else (
+                0.8 * self._chars_per_token + 0.2 * ratio)
+        per_token = self._chars_per_token or 4.0
+        total = max(chars / per_token, evaluated)
+        reused = total - evaluated
+        rate = duration_ns / 1e9 / evaluated if evaluated else 0.0
+        call = {"prompt_tokens": round(total), "evaluated": evaluated, "reused": round(reused),
+                "expected_prefix": expected_chars / chars if chars else 0.0,
+                "hit_rate": reused / total if total else 0.0, "prefill_seconds": duration_ns / 1e9,
+                "saved_seconds": reused * rate}
+        self.calls.append(call)
+        self.totals["calls"] += 1
+        self.totals["prompt_tokens"] += total
+        self.totals["evaluated"] += evaluated
+        self.totals["reused"] += reused
+        self.totals["saved_seconds"] += call["saved_seconds"]
+
+    def report(self, per_call=False):
+        t = self.totals
+        if not t["calls"]:
+            return "[prefix] no Ollama calls measured"
+        lines = [f"[prefix] {t['calls']} calls | {t['reused']:.0f} of {t['prompt_tokens']:.0f} prompt tokens "
+                 f"reused from the KV cache ({t['reused'] / t['prompt_tokens']:.0%}) | ~{t['saved_seconds']:.2f}s of "
+                 f"prefill avoided"]
+        if per_call:
+            for i, c in enumerate(self.calls, 1):
+                lines.append(f"  call {i:>3}: {c['evaluated']:>6} evaluated, {c['reused']:>6} reused "
+                             f"({c['hit_rate']:.0%}, prefix expected {c['expected_prefix']:.0%}) | "
+                             f"prefill {c['prefill_seconds']:.3f}s, saved ~{c['saved_seconds']:.3f}s")
+        return "\n".join(lines)
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Passes a response body through, then reads the prompt-eval counters from its last bytes."""
+
+    def __init__(self, stream, finish):
+        self.stream = stream
+        self.finish = finish
+
+    async def __aiter__(self):
+        tail = b""
+        async for chunk in self.stream:
+            tail = (tail + chunk)[-2048:]  # The counters are in the final JSON object.
+            yield chunk
+        count, duration = _EVAL_COUNT.search(tail), _EVAL_DURATION.search(tail)
+        if count:
+            self.finish(int(count.group(1)), int(duration.group(1)) if duration else 0)
+
+    async def aclose(self):
+        await self.stream.aclose()
+
+
+class PrefixMeterTransport(httpx.AsyncBaseTransport):
+    """An httpx transport that reports every Ollama generation to a PrefixReuseMeter."""
+
+    def __init__(self, meter, inner):
+        self.meter = meter
+        self.inner = inner
+
+    async def handle_async_request(self, request):
+        response = await self.inner.handle_async_request(request)
+        if request.url.path.endswith("/api/chat") and response.status_code == 200:
+            try:
+                body = json.loads(request.content)
+            except ValueError:
+                return response
+            if body.get("messages"):
+                endpoint = f"{request.url.scheme}://{request.url.netloc.decode()}"
+                response.stream = _MeteredStream(response.stream, self.meter.start(endpoint, body))
+        return response
+
+    async def aclose(self):
+        await self.inner.aclose()
@@ -0,0 +1,158 @@
+"""
+FILE: config/response_cache.py
+DESCRIPTION: Persistent, exact-match response cache for model turns.
+
+WHY THIS EXISTS: Many Strategy Suite calls are exact repeats: the same
+instruction, history and prompt (the fixed memo in Lesson 03, the usage probe
+in Lesson 13, the QA suite in Lesson 14). Each one costs tens of seconds on a
+local model. This layer keys every model call on a stable hash of the model,
+messages (system instruction and history), tool schemas and generation
+parameters. On a hit it replays the stored response, usage metadata included,
+so the Runner emits the same events without touching Ollama.
+
+The store is a small SQLite file with an LRU size limit (entries and bytes),
+an optional TTL and hit/miss counters. Wrap a call in `bypass_response_cache()`
+to force a fresh answer.
+"""
+import contextlib
+import contextvars
+import json
+import sqlite3
+import time
+
+import litellm
+
+from config.model_layers import ModelClientLayer, request_key
+
+_BYPASS = contextvars.ContextVar("bypass_response_cache", default=False)
+
+
+@contextlib.contextmanager
+def bypass_response_cache():
+    """Model calls made inside this block skip the cache (and do not refresh it)."""
+    token = _BYPASS.set(True)
+    try:
+        yield
+    finally:
+        _BYPASS.reset(token)
+
+
+class ResponseCache:
+    """An on-disk key/value store with LRU eviction, TTL and hit/miss counters."""
+
+    def __init__(self, path="response_cache.db", max_entries=10_000, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (last_access)")
+        self._conn.commit()
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def get(self, key):
+        row = self._conn.execute("SELECT value, size, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        value, size, created = row
+        if self.ttl is not None and time.time() - created > self.ttl:
+            self._delete(key, size)
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        self.stats["hits"] += 1
+        return json.loads(value)
+
+    def put(self, key, value):
+        blob = json.dumps(value)
+        old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if old:
+            self._count -= 1
+            self._bytes -= old[0]
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, blob, len(blob), now, now),
+        )
+        self._count += 1
+        self._bytes += len(blob)
+        self.stats["stores"] += 1
+        self._evict()
+        self._conn.commit()
+
+    def _delete(self, key, size):
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._conn.commit()
+        self._count -= 1
+        self._bytes -= size
+
+    def _evict(self):
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._count -= 1
+            self._bytes -= row[1]
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+        self._count = self._bytes = 0
+
+    def close(self):
+        self._conn.close()
+
+
+class ResponseCacheLayer(ModelClientLayer):
+    """Serves repeated model calls from a ResponseCache; records misses as they complete."""
+
+    def __init__(self, cache, inner=None):
+        super().__init__(inner)
+        self.cache = cache
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        if _BYPASS.get():
+            return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+        stream = bool(kwargs.get("stream"))
+        key = request_key(model, messages, tools, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if stream:
+                return self._replay_stream(cached["chunks"])
+            return litellm.ModelResponse(**cached["response"])
+
+        response = await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+        if stream:
+            return self._record_stream(key, response)
+        self.cache.put(key, {"response": response.model_dump()})
+        return response
+
+    async def _replay_stream(self, chunks):
+        for chunk in chunks:
+            yield litellm.ModelResponseStream(**chunk)
+
+    async def _record_stream(self, key, stream):
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        # Only a stream that ran to completion is worth replaying.
+        self.cache.put(key, {"chunks": chunks})
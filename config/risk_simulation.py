@@ -0,0 +1,187 @@
+"""
+FILE: config/risk_simulation.py
+DESCRIPTION: Monte Carlo ROI risk: percentiles, probability of loss and VaR from a million draws per question.
+
+WHY THIS EXISTS: The ROI tools return a single point estimate. When the CFO
+persona (Lesson 10) is asked about downside risk, there is nothing to ground
+the answer in, so the model invents probabilities. RiskSimulator gives it
+real ones.
+
+Each of investment, annual savings and rollout delay (months) is a
+triangular distribution (low, most likely, high), the usual shape of a
+business estimate. For every draw, savings accrue only after the delay, over
+a horizon of `years`:
+
+    ROI = (annual_savings * max(0, years - delay / 12) - investment) / investment
+
+The draws are split into a fixed number of chunks. Each chunk gets its own
+child of one SeedSequence, so a given seed produces the same result with any
+number of workers. With more than one worker the chunks run in a persistent
+ProcessPoolExecutor; each chunk is plain NumPy over arrays of draws. Its
+workers start from a forkserver (spawn where that is unavailable), never by
+forking the agent process with its event loop, threads and open sockets.
+Results are cached per parameter set, so a repeated question is answered
+from memory.
+
+simulate_roi_risk() is the agent-facing tool. It is async: the simulation
+runs in a worker thread (RiskSimulator.arun), so the event loop keeps
+serving the other agents meanwhile. It returns ROI percentiles, P(ROI < 0),
+the value at risk (the loss exceeded in only the worst 5% of draws) and the
+expected shortfall beyond it.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from config.finance import format_money, parse_amount
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _triangular(rng, spec, size):
+    low, likely, high = spec
+    if low == high:
+        return np.full(size, float(low))
+    return rng.triangular(low, likely, high, size)
+
+
+def simulate_chunk(investment, savings, delay_months, years, seed, draws):
+    """ROI and net value in dollars (float32) for one chunk of draws; runs in a worker process."""
+    rng = np.random.default_rng(seed)
+    invested = _triangular(rng, investment, draws)
+    realised = _triangular(rng, savings, draws) * np.clip(years - _triangular(rng, delay_months, draws) / 12, 0, years)
+    net = realised - invested
+    return (net / invested).astype(np.float32), net.astype(np.float32)
+
+
+def _check(name, spec):
+    low, likely, high = (float(v) for v in spec)
+    if not low <= likely <= high:
+        raise ValueError(f"{name} must satisfy low <= most likely <= high, got {spec}")
+    return low, likely, high
+
+
+class RiskSimulator:
+    """Runs (and caches) Monte Carlo ROI simulations, across worker processes when there are several."""
+
+    def __init__(self, workers=None, draws=1_000_000, chunks=16, seed=2026, confidence=0.95, cache_size=128):
+        self.workers = workers or os.cpu_count() or 1
+        self.draws = draws
+        self.chunks = chunks
+        self.seed = seed
+        self.confidence = confidence
+        self._pool = None
+        self._lock = threading.Lock()  # run() may be called from several threads (arun).
+        self._cache = collections.OrderedDict()
+        self.cache_size = cache_size
+        self.stats = {"runs": 0, "cache_hits": 0, "seconds": 0.0}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def run(self, investment, savings, delay_months=(0, 0, 0), years=3, draws=None, seed=None):
+        """Returns a dict of ROI statistics; each distribution is (low, most likely, high)."""
+        investment = _check("investment", investment)
+        savings = _check("savings", savings)
+        delay_months = _check("delay_months", delay_months)
+        if investment[0] <= 0:
+            raise ValueError("investment must be greater than zero")
+        if years <= 0:
+            raise ValueError(f"years must be greater than zero, got {years}")
+        draws, seed = int(draws or self.draws), self.seed if seed is None else seed
+        key = (investment, savings, delay_months, float(years), draws, seed)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return dict(self._cache[key], cached=True)
+
+        t0 = time.perf_counter()
+        children = np.random.SeedSequence(seed).spawn(self.chunks)
+        sizes = [draws // self.chunks + (i < draws % self.chunks) for i in range(self.chunks)]
+        jobs = [(investment, savings, delay_months, years, child, size) for child, size in zip(children, sizes)]
+        if self.workers > 1:
+            parts = list(self._executor().map(simulate_chunk, *zip(*jobs)))
+        else:
+            parts = [simulate_chunk(*job) for job in jobs]
+        roi = np.concatenate([part[0] for part in parts])
+        net = np.concatenate([part[1] for part in parts])
+
+        tail = 100 * (1 - self.confidence)
+        cutoff = np.percentile(net, tail)
+        result = {
+            "draws": draws, "seed": seed, "years": years, "mean": float(roi.mean()),
+            "percentiles": dict(zip(PERCENTILES, (float(v) for v in np.percentile(roi, PERCENTILES)))),
+            "p_negative": float((roi < 0).mean()), "confidence": self.confidence,
+            "value_at_risk": max(0.0, -float(cutoff)),
+            "expected_shortfall": max(0.0, -float(net[net <= cutoff].mean())),
+        }
+        result["seconds"] = time.perf_counter() - t0
+        with self._lock:
+            self.stats["runs"] += 1
+            self.stats["seconds"] += result["seconds"]
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(result, cached=False)
+
+    async def arun(self, *args, **kwargs):
+        """run() in a worker thread, so a simulation never blocks the event loop."""
+        return await asyncio.to_thread(self.run, *args, **kwargs)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+def format_result(result):
+    p = result["percentiles"]
+    return (f"MONTE CARLO ({result['draws']:,} draws, {result['years']}-year horizon, seed {result['seed']}): "
+            f"ROI P5 {p[5]:.1%} | P25 {p[25]:.1%} | P50 {p[50]:.1%} | P75 {p[75]:.1%} | P95 {p[95]:.1%} | "
+            f"mean {result['mean']:.1%}. P(ROI < 0) = {result['p_negative']:.1%}. "
+            f"{result['confidence']:.0%} VaR: {format_money(result['value_at_risk'])} (the project loses at least "
+            f"this in the worst {1 - result['confidence']:.0%} of outcomes; expected shortfall there "
+            f"{format_money(result['expected_shortfall'])}).")
+
+
+async def simulate_roi_risk(investment_low: float, investment_likely: float, investment_high: float,
+                      savings_low: float, savings_likely: float, savings_high: float,
+                      delay_months_low: float = 0, delay_months_likely: float = 0, delay_months_high: float = 0,
+                      years: int = 3) -> str:
+    """
+    Simulates one million scenarios of a project's ROI to quantify downside risk.
+    Use it for any question about risk, probability of loss or worst cases, instead of estimating.
+    Args:
+        investment_low: Lowest plausible total investment.
+        investment_likely: Most likely total investment.
+        investment_high: Highest plausible total investment.
+        savings_low: Lowest plausible annual savings once live.
+        savings_likely: Most likely annual savings once live.
+        savings_high: Highest plausible annual savings once live.
+        delay_months_low: Shortest rollout delay in months before savings start (default 0).
+        delay_months_likely: Most likely rollout delay in months (default 0).
+        delay_months_high: Longest rollout delay in months (default 0).
+        years: Horizon in years over which savings accrue (default 3).
+    """
+    from config.settings import get_risk_simulator
+
+    try:
+        result = await get_risk_simulator().arun(
+            tuple(map(parse_amount, (investment_low, investment_likely, investment_high))),
+            tuple(map(parse_amount, (savings_low, savings_likely, savings_high))),
+            tuple(map(float, (delay_months_low, delay_months_likely, delay_months_high))), int(years))
+    except (ValueError, TypeError) as e:
+        return f"Error: {e}"
+    return format_result(result)
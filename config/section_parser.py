@@ -0,0 +1,181 @@
+"""
+FILE: config/section_parser.py
+DESCRIPTION: Incremental parser for templated (## HEADING) outputs, with early termination.
+
+WHY THIS EXISTS: Lesson 03 asks for four fixed `##` sections. Small local
+models often keep going after the last one: an extra "## NEXT STEPS", a
+sign-off, a restatement. All of that costs decode time and is thrown away.
+SectionParser reads the stream as it arrives:
+
+  * A heading line (`## RISK MITIGATION`, `**Risk Mitigation:**`, ...) that
+    matches a required heading starts that section. Any other `#` heading
+    starts an extra section.
+  * The first `#` heading of a required section sets the template's level
+    (`##` in Lesson 03). Inside a section, a deeper heading (`### Vendor
+    lock-in`) is part of the body; only a heading at that level or higher
+    ends the section.
+  * A section is complete once the next heading starts. `feed()` returns
+    each completed Section right away, so the caller can render or store it
+    while the rest is still being written.
+  * The last required section has no next heading to wait for. It is
+    complete at a clear end signal: a heading at the template's level or
+    higher, or a sign-off paragraph
+    ("Let me know if...", "Best regards", a "---" rule), which is left out.
+    Otherwise it runs to the end of the text. With `last_section_paragraphs`
+    set, it is also complete after that many paragraphs, each ending at a
+    blank line; a paragraph whose last line ends in ":" or is a list item
+    announces more and does not count.
+  * `done` turns true when every required section is complete. The caller
+    then stops reading, which cancels the generation (StreamRenderer does
+    this). `missing()` lists required headings that never appeared.
+"""
+import re
+
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s*)?(?:\*\*|__)?\s*(?P<title>[^*_#][^*_]*?)\s*:?\s*(?:\*\*|__)?\s*:?\s*$")
+_SIGN_OFF = re.compile(
+    r"^\s*(?:[-*_]{3,}\s*$|[*_]*(?:let me know|please let me know|feel free to|i hope this|hope this helps|"
+    r"best regards|kind regards|regards,|sincerely|thank you|thanks[,!.]))", re.IGNORECASE)
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+\u2022]|\d+[.)])\s")
+_HASHES = re.compile(r"^\s*(#{1,6})")
+
+
+def normalize_heading(text):
+    """Upper case, with punctuation and runs of whitespace collapsed ("Current State vs. Future State")."""
+    return " ".join(re.sub(r"[^\w#&/]+", " ", text).upper().split())
+
+
+class Section:
+    """One section of a templated answer."""
+
+    __slots__ = ("heading", "body", "required")
+
+    def __init__(self, heading, body="", required=True):
+        self.heading = heading
+        self.body = body
+        self.required = required
+
+    def as_dict(self):
+        return {"heading": self.heading, "body": self.body, "required": self.required}
+
+    def __repr__(self):
+        return f"Section({self.heading!r}, {len(self.body)} chars)"
+
+
+class SectionParser:
+    """Feeds on streamed text; returns Sections as they complete and reports when the template is done."""
+
+    def __init__(self, required_headings, last_section_paragraphs=None):
+        self.required = {normalize_heading(h): h for h in required_headings}
+        self.last_section_paragraphs = last_section_paragraphs
+        self.sections = []          # Completed sections, in output order.
+        self.preamble = ""          # Text before the first heading.
+        self.consumed = ""          # Every character up to the end of the last completed section.
+        self._completed = set()     # Normalised required headings already complete.
+        self._current = None        # (normalised heading, Section) being written.
+        self._level = None          # `#` count of the required headings, once one has been seen.
+        self._paragraphs = 0
+        self._paragraph_open = False
+        self._last_text = ""        # The last non-blank line of the section being written.
+        self._line = ""
+        self._pending = ""          # Raw text of the section being written.
+
+    @property
+    def done(self):
+        return len(self._completed) == len(self.required)
+
+    def missing(self):
+        """Required headings that have not been completed."""
+        return [heading for key, heading in self.required.items() if key not in self._completed]
+
+    def _match(self, line):
+        """("required" | "extra", normalised title, `#` level or None) for a heading line, or None."""
+        match = _HEADING.match(line)
+        if not match:
+            return None
+        title = normalize_heading(match.group("title"))
+        hashes = _HASHES.match(line)
+        level = len(hashes.group(1)) if hashes else None
+        if self._current is not None and self._level and level and level > self._level:
+            return None  # A sub-heading inside the section being written.
+        if title in self.required:
+            return "required", title, level
+        if level:
+            return "extra", title, level
+        return None
+
+    def _finish_current(self):
+        if self._current is None:
+            return []
+        key, section = self._current
+        section.body = section.body.strip()
+        self.sections.append(section)
+        self.consumed += self._pending
+        self._pending = ""
+        if section.required:
+            self._completed.add(key)
+        self._current = None
+        return [section]
+
+    def _on_last_required(self):
+        return (self._current is not None and self._current[1].required
+                and len(self._completed) == len(self.required) - 1)
+
+    def _process_line(self, line):
+        completed = []
+        heading = self._match(line)
+        if heading is not None:
+            kind, key, level = heading
+            completed += self._finish_current()
+            if self.done:
+                return completed
+            if kind == "required" and key not in self._completed:
+                self._current = (key, Section(self.required[key]))
+                if self._level is None and level:
+                    self._level = level
+            else:
+                self._current = (key, Section(line.strip().lstrip("#").strip(), required=False))
+            self._pending = line
+            self._paragraphs, self._paragraph_open, self._last_text = 0, False, ""
+            return completed
+
+        if self._current is None:
+            self.preamble += line
+            self.consumed += line
+            return completed
+        if not self._paragraph_open and self._on_last_required() and _SIGN_OFF.match(line):
+            return completed + self._finish_current()  # The sign-off is not part of the section.
+        self._current[1].body += line
+        self._pending += line
+        if line.strip():
+            self._paragraph_open = True
+            self._last_text = line.strip()
+        elif self._paragraph_open:
+            self._paragraph_open = False
+            if self._last_text.endswith(":") or _LIST_ITEM.match(self._last_text):
+                return completed  # An introduction or a list: more of the paragraph follows.
+            self._paragraphs += 1
+            if (self.last_section_paragraphs and self._on_last_required()
+                    and self._paragraphs >= self.last_section_paragraphs):
+                completed += self._finish_current()
+        return completed
+
+    def feed(self, text):
+        """Consumes a chunk; returns the sections it completed. Ignores input once `done`."""
+        completed = []
+        self._line += text
+        while "\n" in self._line and not self.done:
+            line, self._line = self._line.split("\n", 1)
+            completed += self._process_line(line + "\n")
+        return completed
+
+    def close(self):
+        """Ends the stream: completes the section still open. Returns it, if any."""
+        completed = []
+        if self._line and not self.done:
+            completed += self._process_line(self._line)
+        self._line = ""
+        return completed + self._finish_current()
+
+    def text(self):
+        """The answer up to the end of the last completed section."""
+        return self.consumed.strip()
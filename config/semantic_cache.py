@@ -0,0 +1,381 @@
+"""
+FILE: config/semantic_cache.py
+DESCRIPTION: Opt-in semantic (embedding-similarity) cache for first-turn questions.
+
+WHY THIS EXISTS: Executives ask the same question in different words ("Should
+we migrate to serverless?" vs. "Is a serverless migration worth it?"). The
+exact-match ResponseCache misses these. This layer embeds the user's question,
+searches a NumPy similarity index and replays the stored answer when the best
+match clears a threshold.
+
+Safety rules, because a wrong hit returns a confident wrong answer:
+  * Only first turns are cached (one user message, no history or tool results).
+    Later turns depend on the conversation, not just on the wording.
+  * The index is scoped by model, system instruction (which carries the
+    agent's identity), tool schemas and generation parameters. An answer is
+    never shared between agents.
+  * Both questions must mention the same numbers ("$50k" vs. "$60k" never match).
+  * Only plain text answers are stored; tool calls are always recomputed.
+
+Embeddings come from a local Ollama embedding model (`/api/embed`) or from the
+dependency-free HashingEmbedder. The index (vectors) and the answers are
+bounded by `max_entries` (least-recently-used first out) and persisted to
+`<directory>/index.npz` and `<directory>/answers.json`. Rows live in
+preallocated arrays that double when full. Writes are batched: the layer
+saves a snapshot in a worker thread every `save_every` changes or
+`save_interval` seconds, and cleanup() saves whatever is left.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import httpx
+import litellm
+import numpy as np
+
+from config.model_layers import ModelClientLayer, request_key
+
+logger = logging.getLogger("strategy_suite.semantic_cache")
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can could do does for from has have how i in is it its me my of on or our "
+    "should so that the their this to us was we were what when which who why will with would you your".split()
+)
+
+
+class HashingEmbedder:
+    """Bag of words, word bigrams and character 4-grams, hashed into a fixed-size vector.
+
+    No model and no network, so it always works. It scores on shared wording,
+    so at a safe threshold (~0.9) it catches rewordings (case, punctuation,
+    word order, filler words) but not true paraphrases; those need an Ollama
+    embedding model. Lowering the threshold to reach them makes questions on
+    the same template ("our AI strategy" / "our cloud strategy") collide.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text):
+        words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+        for word in words:
+            yield "w:" + word
+            padded = f"<{word}>"
+            for i in range(len(padded) - 3):
+                yield "c:" + padded[i:i + 4]
+        for first, second in zip(words, words[1:]):
+            yield f"b:{first}_{second}"
+
+    async def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vector[h % self.dim] += 1.0 if h >> 63 else -1.0
+        return _normalize(vector)
+
+    async def aclose(self):
+        pass
+
+
+class OllamaEmbedder:
+    """Embeds text with a local Ollama embedding model (e.g. nomic-embed-text)."""
+
+    def __init__(self, model="nomic-embed-text", api_base="http://localhost:11434", timeout=30.0):
+        self.model = model
+        self.name = f"ollama:{model}"
+        self._client = httpx.AsyncClient(base_url=api_base, timeout=timeout)
+
+    async def embed(self, text):
+        response = await self._client.post("/api/embed", json={"model": self.model, "input": text})
+        response.raise_for_status()
+        return _normalize(np.asarray(response.json()["embeddings"][0], dtype=np.float32))
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def _normalize(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _numbers(text):
+    return sorted(n.replace(",", "") for n in _NUMBER.findall(text))
+
+
+class SemanticIndex:
+    """A bounded cosine-similarity index of (scope, question) -> answer, persisted to a directory."""
+
+    def __init__(self, directory="semantic_cache", embedder_name="hashing-512", max_entries=2000,
+                 save_every=50, save_interval=30.0):
+        self.directory = directory
+        self.embedder_name = embedder_name
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.entries = []          # [{"question", "numbers", "response"}], row-aligned with vectors
+        self.evictions = 0
+        self.dirty = 0             # Changes since the last save.
+        self._saved_at = time.monotonic()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._vector_buffer = None  # (capacity, dim) float32; rows past len(entries) are unused.
+        self._last_used_buffer = np.zeros(0, dtype=np.float64)
+        self._scope_buffer = np.zeros(0, dtype=object)
+        self._views()
+
+    def _views(self):
+        n = len(self.entries)
+        self.vectors = None if self._vector_buffer is None else self._vector_buffer[:n]  # (n, dim), unit rows
+        self.last_used = self._last_used_buffer[:n]
+        self.scopes = self._scope_buffer[:n]
+
+    def _grow(self, dim):
+        """Doubles the row capacity (up to max_entries), so filling the index is amortised O(1) per add."""
+        n = len(self.entries)
+        capacity = min(self.max_entries, max(16, 2 * n))
+        vectors = np.empty((capacity, dim), dtype=np.float32)
+        last_used = np.zeros(capacity, dtype=np.float64)
+        scopes = np.empty(capacity, dtype=object)
+        if n:
+            vectors[:n], last_used[:n], scopes[:n] = self.vectors, self.last_used, self.scopes
+        self._vector_buffer, self._last_used_buffer, self._scope_buffer = vectors, last_used, scopes
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, "index.npz")
+
+    @property
+    def _answers_path(self):
+        return os.path.join(self.directory, "answers.json")
+
+    def _load(self):
+        if not (os.path.exists(self._index_path) and os.path.exists(self._answers_path)):
+            return
+        with np.load(self._index_path, allow_pickle=False) as data:
+            if str(data["embedder"]) != self.embedder_name:
+                logger.info("Semantic cache at %s was built with %s; starting empty.",
+                            self.directory, data["embedder"])
+                return
+            vectors, last_used, scopes = data["vectors"], data["last_used"], data["scopes"]
+        with open(self._answers_path, encoding="utf-8") as f:
+            entries = json.load(f)
+        if len(entries) != len(vectors):
+            logger.warning("Semantic cache at %s is inconsistent; starting empty.", self.directory)
+            return
+        self._vector_buffer, self._last_used_buffer = vectors.copy(), last_used.copy()
+        self._scope_buffer = scopes.astype(object)
+        self.entries = entries
+        self._views()
+
+    @property
+    def needs_save(self):
+        """True once `save_every` changes or `save_interval` seconds of unsaved changes have built up."""
+        return self.dirty >= self.save_every or (
+            self.dirty > 0 and time.monotonic() - self._saved_at >= self.save_interval)
+
+    def snapshot(self):
+        """A copy of the index to write from another thread while the loop keeps changing it."""
+        if self.vectors is None:
+            return None
+        return (self.vectors.copy(), self.last_used.copy(), self.scopes.astype(str), list(self.entries), self.dirty)
+
+    def write(self, snapshot):
+        """Writes a snapshot atomically (temp file + rename); safe to run in a worker thread."""
+        vectors, last_used, scopes, entries, _ = snapshot
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_index = self._index_path + ".tmp.npz"
+        np.savez(tmp_index, vectors=vectors, last_used=last_used, scopes=scopes,
+                 embedder=np.array(self.embedder_name))
+        tmp_answers = self._answers_path + ".tmp"
+        with open(tmp_answers, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_index, self._index_path)
+        os.replace(tmp_answers, self._answers_path)
+
+    def mark_saved(self, snapshot):
+        self.dirty = max(0, self.dirty - snapshot[4])
+        self._saved_at = time.monotonic()
+
+    def save(self):
+        """Writes any unsaved changes now, on the calling thread (cleanup, or when not under a loop)."""
+        snapshot = self.snapshot() if self.dirty else None
+        if snapshot is not None:
+            self.write(snapshot)
+            self.mark_saved(snapshot)
+
+    async def save_async(self):
+        """Writes a snapshot in a worker thread, without blocking the event loop."""
+        snapshot = self.snapshot() if self.dirty else None
+        if snapshot is not None:
+            await asyncio.to_thread(self.write, snapshot)
+            self.mark_saved(snapshot)
+
+    def search(self, scope, vector, numbers, threshold):
+        """Returns (best similarity or None, entry if it clears `threshold` else None)."""
+        if not self.entries:
+            return None, None
+        rows = np.flatnonzero(self.scopes == scope)
+        rows = [r for r in rows if self.entries[r]["numbers"] == numbers]
+        if not rows:
+            return None, None
+        similarities = self.vectors[rows] @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            return float(similarities[best]), None
+        row = rows[best]
+        self.last_used[row] = time.time()
+        self.dirty += 1
+        return float(similarities[best]), self.entries[row]
+
+    def add(self, scope, vector, question, numbers, response):
+        entry = {"question": question, "numbers": numbers, "response": response}
+        if len(self.entries) >= self.max_entries:
+            # Overwrite the least recently used row in place.
+            row = int(np.argmin(self.last_used))
+            self.vectors[row], self.scopes[row], self.entries[row] = vector, scope, entry
+            self.last_used[row] = time.time()
+            self.evictions += 1
+        else:
+            n = len(self.entries)
+            if self._vector_buffer is None or n == len(self._vector_buffer):
+                self._grow(vector.shape[0])
+            self._vector_buffer[n], self._scope_buffer[n], self._last_used_buffer[n] = vector, scope, time.time()
+            self.entries.append(entry)
+            self._views()
+        self.dirty += 1
+
+    def clear(self):
+        self.entries = []
+        self.dirty = 0
+        self._reset()
+        for path in (self._index_path, self._answers_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _text(content):
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(p.get("text", "") for p in content if isinstance(p, dict) and p.get("type") == "text")
+    return ""
+
+
+def _first_turn_question(messages):
+    """The user's question if this is the first turn of a conversation, else None."""
+    roles = [m.get("role") for m in messages]
+    if roles.count("user") != 1 or any(r not in ("system", "developer", "user") for r in roles):
+        return None
+    question = _text(next(m for m in messages if m.get("role") == "user").get("content"))
+    return question.strip() or None
+
+
+def _scope(model, messages, tools, kwargs):
+    instruction = [m for m in messages if m.get("role") in ("system", "developer")]
+    params = {k: v for k, v in kwargs.items() if k != "stream"}
+    return request_key(model, instruction, tools, **params)
+
+
+class SemanticCacheLayer(ModelClientLayer):
+    """Answers first-turn questions from a SemanticIndex when a similar one was seen before."""
+
+    def __init__(self, index, embedder, threshold=0.9, inner=None):
+        super().__init__(inner)
+        self.index = index
+        self.embedder = embedder
+        self.threshold = threshold
+        self.stats = {"lookups": 0, "hits": 0, "stores": 0, "errors": 0}
+        self._saving = None  # The batched save in flight, if any.
+
+    @property
+    def hit_rate(self):
+        return self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        question = _first_turn_question(messages)
+        if question is None:
+            return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+        stream = bool(kwargs.get("stream"))
+        scope = _scope(model, messages, tools, kwargs)
+        numbers = _numbers(question)
+        try:
+            vector = await self.embedder.embed(question)
+        except Exception as e:
+            # The cache is an optimisation; a broken embedder must not break the turn.
+            self.stats["errors"] += 1
+            logger.warning("Semantic cache embedding failed: %s", e)
+            return await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+        self.stats["lookups"] += 1
+        similarity, entry = self.index.search(scope, vector, numbers, self.threshold)
+        if entry is not None:
+            self.stats["hits"] += 1
+            logger.info("Semantic cache HIT (similarity %.3f, hit rate %.1f%%): %r ~ %r",
+                        similarity, 100 * self.hit_rate, question[:80], entry["question"][:80])
+            response = litellm.ModelResponse(**entry["response"])
+            return self._replay_stream(response) if stream else response
+        logger.info("Semantic cache miss (best similarity %s, hit rate %.1f%%): %r",
+                    "n/a" if similarity is None else f"{similarity:.3f}", 100 * self.hit_rate, question[:80])
+
+        response = await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+        if stream:
+            return self._record_stream(scope, vector, question, numbers, response)
+        self._store(scope, vector, question, numbers, response)
+        return response
+
+    def _store(self, scope, vector, question, numbers, response):
+        message = response.choices[0].message if response.choices else None
+        if message is None or message.tool_calls or not message.content:
+            return  # Only final text answers are reusable.
+        self.index.add(scope, vector, question, numbers, response.model_dump())
+        self.stats["stores"] += 1
+        if self.index.needs_save and (self._saving is None or self._saving.done()):
+            self._saving = asyncio.ensure_future(self.index.save_async())
+
+    async def _replay_stream(self, response):
+        choice = response.choices[0]
+        yield litellm.ModelResponseStream(
+            model=response.model,
+            choices=[{"index": 0, "delta": {"role": "assistant", "content": choice.message.content},
+                      "finish_reason": choice.finish_reason or "stop"}],
+            usage=response.get("usage"),
+        )
+
+    async def _record_stream(self, scope, vector, question, numbers, stream):
+        text, finish_reason, usage, model, tool_call = [], None, None, None, False
+        async for chunk in stream:
+            for choice in chunk.choices:
+                text.append(choice.delta.content or "")
+                tool_call = tool_call or bool(choice.delta.tool_calls)
+                finish_reason = choice.finish_reason or finish_reason
+            usage = chunk.get("usage") or usage
+            model = chunk.model or model
+            yield chunk
+        # Only a stream that ran to completion is worth storing.
+        if tool_call:
+            return
+        self._store(scope, vector, question, numbers, litellm.ModelResponse(
+            model=model, usage=usage,
+            choices=[{"index": 0, "message": {"role": "assistant", "content": "".join(text)},
+                      "finish_reason": finish_reason or "stop"}],
+        ))
+
+    async def aclose(self):
+        if self._saving is not None:
+            await self._saving
+        self.index.save()
+        await super().aclose()
@@ -1,44 +1,470 @@
 """
 FILE: config/settings.py
 DESCRIPTION: Centralized configuration and service provider for the Strategy Suite.
+
+STARTUP COST: Importing this module only reads configuration. The heavy
+dependencies (litellm, the ADK LiteLlm wrapper, Runner and the session
+services) are imported on first use of get_model(), get_runner() or
+initialize_session(), so scripts that never reach the model start fast.
+Track it with `python -m benchmarks.import_benchmark`.
 """
+import contextlib
 import os
+import sys
 import uuid
 import logging
 import warnings
-import litellm  # Added for explicit cleanup
 
 # Silence the Pydantic noise
 os.environ["PYDANTIC_SKIP_VALIDATION"] = "1"
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
-from google.adk.models.lite_llm import LiteLlm 
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-
+# python-dotenv is light (~10ms) and every setting below depends on it, so it stays eager.
 from dotenv import load_dotenv
 load_dotenv()
 
 APP_NAME = "CIO_Strategy_Accelerator_2026"
 OLLAMA_BASE_URL = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
+# Comma-separated pool of Ollama servers to load-balance across (see config/load_balancer.py).
+OLLAMA_BASE_URLS = [u.strip() for u in os.getenv("OLLAMA_BASE_URLS", OLLAMA_BASE_URL).split(",") if u.strip()]
 MODEL_ID = os.getenv("MODEL_NAME", "ollama_chat/llama3.2")
 
-_SESSION_SERVICE = InMemorySessionService()
+# Session storage: "memory" (default, process-local), "sqlite" (durable, WAL mode)
+# or "bounded" (in-process with LRU/TTL eviction and optional spill-to-disk).
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "strategy_sessions.db")
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "0")) or None  # seconds; 0 disables
+SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR") or None
+
+def _build_session_service(backend=SESSION_BACKEND):
+    if backend == "sqlite":
+        from config.sqlite_sessions import SQLiteSessionService
+        return SQLiteSessionService(db_path=SESSION_DB_PATH)
+    if backend == "bounded":
+        from config.bounded_sessions import BoundedSessionService
+        return BoundedSessionService(
+            max_sessions=SESSION_MAX_SESSIONS, max_bytes=SESSION_MAX_BYTES,
+            idle_ttl=SESSION_IDLE_TTL, spill_dir=SESSION_SPILL_DIR,
+        )
+    if backend == "memory":
+        from google.adk.sessions import InMemorySessionService
+        return InMemorySessionService()
+    raise ValueError(f"Unknown SESSION_BACKEND '{backend}'. Use 'memory', 'sqlite' or 'bounded'.")
+
+_SESSION_SERVICE = None
+
+def get_session_service():
+    """Returns the process-wide session service, building it on first use."""
+    global _SESSION_SERVICE
+    if _SESSION_SERVICE is None:
+        _SESSION_SERVICE = _build_session_service()
+    return _SESSION_SERVICE
+
+# Model connection pool: one keep-alive HTTP client per (model, endpoint), shared
+# by every Agent and Runner in the process.
+MODEL_MAX_CONNECTIONS = int(os.getenv("MODEL_MAX_CONNECTIONS", "16"))
+MODEL_KEEPALIVE_EXPIRY = float(os.getenv("MODEL_KEEPALIVE_EXPIRY", "120"))
+MODEL_TIMEOUT = float(os.getenv("MODEL_TIMEOUT", "600"))
+
+_CLIENT_POOL = {}  # (model, api_base) -> litellm AsyncHTTPHandler
+_MODELS = {}       # (model, tuple of endpoints) -> LiteLlm
+
+# Endpoint pool routing: least-outstanding calls, ejection of failing servers and,
+# optionally, hedging a slow call onto a second server at the observed p95 latency.
+MODEL_HEDGE = os.getenv("MODEL_HEDGE", "0") == "1"
+MODEL_HEDGE_QUANTILE = float(os.getenv("MODEL_HEDGE_QUANTILE", "0.95"))
+MODEL_HEDGE_MIN_SAMPLES = int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20"))
+ENDPOINT_EJECT_AFTER = int(os.getenv("ENDPOINT_EJECT_AFTER", "3"))
+ENDPOINT_HEALTH_INTERVAL = float(os.getenv("ENDPOINT_HEALTH_INTERVAL", "10"))
+
+# Model warm-up: pre-load Ollama models when the suite starts and keep them resident,
+# so the first executive query does not pay the model-load latency.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+WARMUP_INTERVAL = float(os.getenv("WARMUP_INTERVAL", "0")) or None  # seconds; 0 disables re-warming
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "").split(",") if m.strip()]
+
+_WARMERS = {}  # api_base -> ModelWarmer
+
+def _is_ollama(model):
+    return model.startswith(("ollama/", "ollama_chat/"))
+
+def get_warmer(api_base=OLLAMA_BASE_URL):
+    """Returns the ModelWarmer for an Ollama endpoint; its `metrics` hold per-model load times."""
+    if api_base not in _WARMERS:
+        from config.warmup import ModelWarmer
+        models = [MODEL_ID, *WARMUP_MODELS] if api_base in (OLLAMA_BASE_URL, *OLLAMA_BASE_URLS) else []
+        _WARMERS[api_base] = ModelWarmer(
+            api_base, [m for m in models if _is_ollama(m)],
+            keep_alive=OLLAMA_KEEP_ALIVE, interval=WARMUP_INTERVAL,
+        )
+    return _WARMERS[api_base]
+
+def _start_warmup(api_base=OLLAMA_BASE_URL):
+    """Kicks off background warm-up once an event loop is running."""
+    if not MODEL_WARMUP:
+        return
+    try:
+        get_warmer(api_base).start()
+    except RuntimeError:
+        pass  # No running loop yet; initialize_session() will start it.
+
+# Response cache: replay exact repeats of a model call (same model, instruction,
+# history, tools and generation config) from disk instead of re-hitting Ollama.
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "response_cache.db")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0")) or None  # seconds; 0 = never expire
+
+_RESPONSE_CACHE = None
+
+def get_response_cache():
+    """Returns the on-disk response cache (its `stats` hold hit/miss counters)."""
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        from config.response_cache import ResponseCache
+        _RESPONSE_CACHE = ResponseCache(
+            RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=RESPONSE_CACHE_MAX_BYTES, ttl=RESPONSE_CACHE_TTL,
+        )
+    return _RESPONSE_CACHE
+
+# Semantic cache: replay the answer to a first-turn question that is worded
+# differently but means the same ("Should we migrate to serverless?" vs. "Is a
+# serverless migration worth it?"). Scoped per agent instruction and tools.
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR", "semantic_cache")
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+# "hashing" needs no model; any other value names an Ollama embedding model (e.g. nomic-embed-text).
+SEMANTIC_CACHE_EMBEDDER = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing")
+# Cosine similarity needed for a hit. Lower it with care: a false hit is a wrong answer.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+
+_SEMANTIC_INDEX = None
+_SEMANTIC_EMBEDDER = None
+
+def get_semantic_index():
+    """Returns the on-disk semantic cache index, shared by every model."""
+    global _SEMANTIC_INDEX, _SEMANTIC_EMBEDDER
+    if _SEMANTIC_INDEX is None:
+        from config.semantic_cache import HashingEmbedder, OllamaEmbedder, SemanticIndex
+        if SEMANTIC_CACHE_EMBEDDER == "hashing":
+            _SEMANTIC_EMBEDDER = HashingEmbedder()
+        else:
+            _SEMANTIC_EMBEDDER = OllamaEmbedder(SEMANTIC_CACHE_EMBEDDER, OLLAMA_BASE_URL)
+        _SEMANTIC_INDEX = SemanticIndex(SEMANTIC_CACHE_DIR, _SEMANTIC_EMBEDDER.name, SEMANTIC_CACHE_MAX_ENTRIES)
+    return _SEMANTIC_INDEX
+
+# Coalescing: concurrent identical model calls (asyncio.gather fan-outs, many
+# users on one dashboard prompt) share a single upstream call. Set to 0 to
+# make every caller sample its own answer.
+MODEL_COALESCE = os.getenv("MODEL_COALESCE", "1") == "1"
+
+async def wait_for_warmup():
+    """Waits for the initial warm-up pass on every endpoint that has started one."""
+    for warmer in list(_WARMERS.values()):
+        await warmer.wait()
+
+# Streaming output: lessons built on config/streaming.py print tokens as they
+# arrive and report time-to-first-token, inter-token latency and tokens/s.
+STREAM_OUTPUT = os.getenv("STREAM_OUTPUT", "1") == "1"
+
+# Prefix-stable prompts: requests are assembled from the most to the least stable
+# content (instruction, sorted tools, pinned summary, history, then volatile
+# session context and the new turn) so Ollama can reuse its KV cache, with
+# generation options pinned. Reuse is measured from Ollama's prompt_eval_count.
+PREFIX_STABLE = os.getenv("PREFIX_STABLE", "0") == "1"
+PREFIX_OPTIONS = os.getenv("PREFIX_OPTIONS", "temperature=0.8,top_k=40,top_p=0.9,num_ctx=4096")
+
+_PREFIX_METER = None
+
+def get_prefix_meter():
+    """Returns the KV-cache reuse meter shared by every endpoint (`calls`, `totals`, `report()`)."""
+    global _PREFIX_METER
+    if _PREFIX_METER is None:
+        from config.prompt_prefix import PrefixReuseMeter
+        _PREFIX_METER = PrefixReuseMeter(slots=ADMISSION_SLOTS)
+    return _PREFIX_METER
+
+# Admission control: every upstream call takes one of ADMISSION_SLOTS generation
+# slots per endpoint. Interactive calls are admitted ahead of batch and eval work
+# (weighted fair queuing, per-class caps). Classes are "name:weight[:cap per endpoint]".
+MODEL_ADMISSION = os.getenv("MODEL_ADMISSION", "0") == "1"
+ADMISSION_SLOTS = int(os.getenv("ADMISSION_SLOTS", "4"))  # Match OLLAMA_NUM_PARALLEL.
+ADMISSION_CLASSES = os.getenv("ADMISSION_CLASSES", "interactive:8,batch:1:3,eval:1:2")
+ADMISSION_PREEMPT = os.getenv("ADMISSION_PREEMPT", "1") == "1"
 
-def get_model():
-    return LiteLlm(model=MODEL_ID, api_base=OLLAMA_BASE_URL)
+_ADMISSION = {}  # tuple of endpoints -> AdmissionScheduler
+
+def get_admission_scheduler(endpoints=None):
+    """Returns the admission scheduler shared by every model on these endpoints (`stats()`, `report()`).
+
+    `endpoints` defaults to OLLAMA_BASE_URLS, like get_model().
+    """
+    endpoints = tuple(OLLAMA_BASE_URLS if endpoints is None else endpoints)
+    if endpoints not in _ADMISSION:
+        from config.admission import AdmissionScheduler, parse_classes
+        classes = parse_classes(ADMISSION_CLASSES)
+        for c in classes:
+            if c.max_concurrency is not None:
+                c.max_concurrency *= len(endpoints)
+        _ADMISSION[endpoints] = AdmissionScheduler(
+            capacity=ADMISSION_SLOTS * len(endpoints), classes=classes, preempt=ADMISSION_PREEMPT,
+        )
+    return _ADMISSION[endpoints]
+
+def _build_llm_client(model=MODEL_ID, endpoints=(OLLAMA_BASE_URL,)):
+    """Stacks the enabled model-call layers (see config/model_layers.py), innermost first."""
+    from config.model_layers import ModelInfoLayer
+    # Innermost, so only calls that reach a server look up the model's capabilities.
+    client = ModelInfoLayer(_ensure_model_info, endpoints[0])
+    if len(endpoints) > 1:
+        from config.load_balancer import LoadBalancerLayer
+        client = LoadBalancerLayer(
+            {url: get_http_client(model, url) for url in endpoints}, client,
+            hedge=MODEL_HEDGE, hedge_quantile=MODEL_HEDGE_QUANTILE, hedge_min_samples=MODEL_HEDGE_MIN_SAMPLES,
+            eject_after=ENDPOINT_EJECT_AFTER, health_interval=ENDPOINT_HEALTH_INTERVAL,
+        )
+    if MODEL_ADMISSION:
+        # Below the caches and coalescing, so only real upstream calls take a slot.
+        from config.admission import AdmissionLayer
+        client = AdmissionLayer(get_admission_scheduler(endpoints), client)
+    if SEMANTIC_CACHE:
+        from config.semantic_cache import SemanticCacheLayer
+        index = get_semantic_index()
+        client = SemanticCacheLayer(index, _SEMANTIC_EMBEDDER, SEMANTIC_CACHE_THRESHOLD, client)
+    if RESPONSE_CACHE:
+        from config.response_cache import ResponseCacheLayer
+        client = ResponseCacheLayer(get_response_cache(), client)
+    if MODEL_COALESCE:
+        # Outside the caches, so cache lookups and stores also happen once per flight.
+        from config.singleflight import SingleflightLayer
+        client = SingleflightLayer(client)
+    if PREFIX_STABLE:
+        # Outermost, so every layer below sees (and keys on) the assembled request.
+        from config.prompt_prefix import PrefixStableLayer, parse_options
+        client = PrefixStableLayer(client, options=parse_options(PREFIX_OPTIONS))
+    return client
+
+def get_http_client(model=MODEL_ID, api_base=OLLAMA_BASE_URL):
+    """Returns the pooled keep-alive HTTP client for a model endpoint."""
+    key = (model, api_base)
+    if key not in _CLIENT_POOL:
+        import httpx
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+        limits = httpx.Limits(
+            max_connections=MODEL_MAX_CONNECTIONS,
+            max_keepalive_connections=MODEL_MAX_CONNECTIONS,
+            keepalive_expiry=MODEL_KEEPALIVE_EXPIRY,
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+        if PREFIX_STABLE:
+            from config.prompt_prefix import PrefixMeterTransport
+            transport = PrefixMeterTransport(get_prefix_meter(), transport)
+        _CLIENT_POOL[key] = AsyncHTTPHandler(timeout=MODEL_TIMEOUT, transport=transport)
+    return _CLIENT_POOL[key]
+
+_MODEL_INFO = {}  # model -> task registering its capabilities with LiteLLM
+
+def _register_model_info(model, api_base):
+    """Looks up an Ollama model's capabilities once, so LiteLLM stops calling /api/show on every turn.
+
+    A blocking HTTP call: run it through _ensure_model_info, never while building an agent.
+    Returns False when the server could not tell, so the lookup is tried again.
+    """
+    import litellm
+    if not _is_ollama(model) or model in litellm.model_cost:
+        return True
+    from litellm.llms.ollama.common_utils import OllamaModelInfo
+    info = OllamaModelInfo().get_runtime_model_info(model, api_base=api_base)
+    if "supports_function_calling" not in info:  # absent when the server could not be reached
+        return False
+    info.pop("key", None)
+    litellm.register_model({model: info})
+    return True
+
+async def _ensure_model_info(model, api_base):
+    """Registers a model's capabilities before its first call, in a worker thread; later calls reuse the task.
+
+    A lookup that did not register the model (Ollama unreachable, an error) is forgotten, so the next call retries.
+    """
+    import asyncio
+    task = _MODEL_INFO.get(model)
+    if task is None:
+        task = _MODEL_INFO[model] = asyncio.ensure_future(asyncio.to_thread(_register_model_info, model, api_base))
+
+        def forget_failure(done):
+            failed = done.cancelled() or done.exception() is not None or not done.result()
+            if failed and _MODEL_INFO.get(model) is done:
+                del _MODEL_INFO[model]
+        task.add_done_callback(forget_failure)
+    await asyncio.shield(task)
+
+def get_model(model=MODEL_ID, api_base=None):
+    """Returns the shared LiteLlm for a model endpoint, wired to the pooled HTTP client.
+
+    `api_base` may be one URL or a list of them; it defaults to OLLAMA_BASE_URLS.
+    With more than one endpoint, every call is routed by the load balancer.
+    """
+    if api_base is None:
+        api_base = OLLAMA_BASE_URLS
+    endpoints = (api_base,) if isinstance(api_base, str) else tuple(api_base)
+    key = (model, endpoints)
+    if key not in _MODELS:
+        from google.adk.models.lite_llm import LiteLlm
+        extra = {}
+        if _is_ollama(model):
+            # Every call renews residency, so real traffic never lets the model unload early.
+            extra["keep_alive"] = OLLAMA_KEEP_ALIVE
+            for url in endpoints:
+                get_warmer(url).register(model)
+        _MODELS[key] = LiteLlm(
+            model=model, api_base=endpoints[0], client=get_http_client(model, endpoints[0]),
+            llm_client=_build_llm_client(model, endpoints), **extra,
+        )
+    for url in endpoints:
+        _start_warmup(url)
+    return _MODELS[key]
+
+# Context compaction: once a request passes COMPACTION_BUDGET estimated tokens, its
+# oldest turns are folded into a running summary kept in session state. Money
+# amounts and "PIN:" lines from folded user turns stay verbatim.
+COMPACTION = os.getenv("COMPACTION", "0") == "1"
+COMPACTION_BUDGET = int(os.getenv("COMPACTION_BUDGET", "2048"))
+COMPACTION_KEEP_RECENT = int(os.getenv("COMPACTION_KEEP_RECENT", "6"))  # Contents never folded.
+
+_COMPACTION = None
+
+def get_compaction_plugin():
+    """Returns the compaction plugin every runner shares (its `stats` and `report()` cover all of them)."""
+    global _COMPACTION
+    if _COMPACTION is None:
+        from config.compaction import CompactionPlugin
+        _COMPACTION = CompactionPlugin(budget=COMPACTION_BUDGET, keep_recent=COMPACTION_KEEP_RECENT)
+    return _COMPACTION
+
+# Guardrails: requests to the agents named in GUARDRAIL_AGENTS are checked locally
+# (terms, entities, topic classifier) before the agent runs. Clearly disallowed
+# ones get the canned policy response without a model call.
+GUARDRAILS = os.getenv("GUARDRAILS", "0") == "1"
+GUARDRAIL_AGENTS = [a.strip() for a in os.getenv("GUARDRAIL_AGENTS", "Governed_Strategist").split(",") if a.strip()]
+
+_GUARDRAILS = None
+
+def get_guardrail_plugin():
+    """Returns the guardrail plugin shared by every runner (`stats`, `last_verdict`)."""
+    global _GUARDRAILS
+    if _GUARDRAILS is None:
+        from config.guardrails import Guardrail, GuardrailPlugin
+        guardrail = Guardrail()
+        _GUARDRAILS = GuardrailPlugin({name: guardrail for name in GUARDRAIL_AGENTS})
+    return _GUARDRAILS
+
+# Monte Carlo risk tool (config/risk_simulation.py): draws per question, worker
+# processes (0 = one per CPU; 1 runs in-process) and the seed that makes runs reproducible.
+SIMULATION_DRAWS = int(os.getenv("SIMULATION_DRAWS", "1000000"))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", "0"))
+SIMULATION_SEED = int(os.getenv("SIMULATION_SEED", "2026"))
+
+_RISK_SIMULATOR = None
+
+def get_risk_simulator():
+    """Returns the shared RiskSimulator; its process pool and result cache outlive single tool calls."""
+    global _RISK_SIMULATOR
+    if _RISK_SIMULATOR is None:
+        from config.risk_simulation import RiskSimulator
+        _RISK_SIMULATOR = RiskSimulator(workers=SIMULATION_WORKERS or None, draws=SIMULATION_DRAWS,
+                                        seed=SIMULATION_SEED)
+    return _RISK_SIMULATOR
+
+# Tool memoization (config/tool_memo.py): tools marked @pure answer repeated calls
+# (same arguments after canonicalisation) from a shared LRU; a path persists it across runs.
+TOOL_MEMO = os.getenv("TOOL_MEMO", "1") == "1"
+TOOL_MEMO_MAX_ENTRIES = int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "4096"))
+TOOL_MEMO_PATH = os.getenv("TOOL_MEMO_PATH", "")  # "" keeps results in memory only
+
+_TOOL_MEMO = None
+
+def get_tool_memo():
+    """Returns the shared ToolMemo (its `stats` hold per-tool hits), or None when TOOL_MEMO=0."""
+    global _TOOL_MEMO
+    if not TOOL_MEMO:
+        return None
+    if _TOOL_MEMO is None:
+        from config.tool_memo import ToolMemo
+        _TOOL_MEMO = ToolMemo(max_entries=TOOL_MEMO_MAX_ENTRIES, path=TOOL_MEMO_PATH or None)
+    return _TOOL_MEMO
 
 def get_runner(agent):
-    return Runner(agent=agent, app_name=APP_NAME, session_service=_SESSION_SERVICE)
+    from google.adk.runners import Runner
+    plugins = [get_guardrail_plugin()] if GUARDRAILS else []
+    if COMPACTION:
+        plugins.append(get_compaction_plugin())
+    return Runner(agent=agent, app_name=APP_NAME, session_service=get_session_service(), plugins=plugins)
 
 async def initialize_session(user_id="strategy_pro"):
+    for url in OLLAMA_BASE_URLS:
+        _start_warmup(url)
     session_id = str(uuid.uuid4())
-    await _SESSION_SERVICE.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    await get_session_service().create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
     return user_id, session_id
 
+# While a shared runtime is held (see shared_runtime()), lesson-level cleanup()
+# calls only flush sessions; pooled clients and warmers stay up for the next lesson.
+_RUNTIME_HOLDS = 0
+
+@contextlib.asynccontextmanager
+async def shared_runtime():
+    """Keeps the model pool, warmers and session service alive across many lessons."""
+    global _RUNTIME_HOLDS
+    _RUNTIME_HOLDS += 1
+    try:
+        yield
+    finally:
+        _RUNTIME_HOLDS -= 1
+        if _RUNTIME_HOLDS == 0:
+            await cleanup()
+
 async def cleanup():
     """FIX: Manually awaits the LiteLLM cleanup coroutine to stop the warning."""
+    global _SEMANTIC_INDEX, _SEMANTIC_EMBEDDER
+    # Durable backends buffer writes; make sure the last turns hit disk.
+    if _SESSION_SERVICE is not None:
+        await _SESSION_SERVICE.flush()
+    if _RUNTIME_HOLDS:
+        return
+    for warmer in _WARMERS.values():
+        await warmer.stop()
+    # Worker processes exit; the cached results stay for the next lesson.
+    if _RISK_SIMULATOR is not None:
+        _RISK_SIMULATOR.close()
+    # Drain the model connection pool; the next get_model() builds fresh clients.
+    clients = list(_CLIENT_POOL.values())
+    models = list(_MODELS.values())
+    _CLIENT_POOL.clear()
+    _MODELS.clear()
+    _ADMISSION.clear()  # Its queues belong to this event loop.
+    _MODEL_INFO.clear()  # So are these tasks; a registered model stays in litellm.model_cost.
+    for llm in models:
+        await llm.llm_client.aclose()  # Stops layer background work (e.g. health checks).
+    # Saves are batched, so write what is left; the embedder's HTTP client belongs to this event loop.
+    if _SEMANTIC_EMBEDDER is not None:
+        _SEMANTIC_INDEX.save()
+        await _SEMANTIC_EMBEDDER.aclose()
+        _SEMANTIC_INDEX = _SEMANTIC_EMBEDDER = None
+    for client in clients:
+        try:
+            await client.close()
+        except Exception:
+            pass
+    # Nothing to close if the model layer was never loaded.
+    if "litellm" not in sys.modules:
+        return
     try:
+        import litellm
         await litellm.close_litellm_async_clients()
     except Exception:
         pass
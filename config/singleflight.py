@@ -0,0 +1,137 @@
+"""
+FILE: config/singleflight.py
+DESCRIPTION: Coalesces identical in-flight model calls into one upstream call.
+
+WHY THIS EXISTS: When a lesson fans out with asyncio.gather (Lessons 11 and
+16), or several users ask the same dashboard prompt at once, identical
+requests reach Ollama in parallel. Each one takes a scarce generation slot
+and they all produce the same kind of answer. Here the first caller (the
+leader) makes the upstream call, and every identical request that arrives
+while it is running joins it:
+
+  * Non-streaming callers all receive the leader's response.
+  * Streaming callers each get their own iterator over the shared stream; a
+    caller that joins late first replays the chunks it missed.
+
+Requests are identical when their `request_key` matches (model, messages,
+tools and generation parameters). Streaming and non-streaming calls never mix.
+
+Each caller can cancel on its own. The upstream call is cancelled only when
+every caller waiting on it has gone. `stats["saved"]` counts the upstream calls avoided.
+"""
+import asyncio
+import copy
+
+from config.model_layers import ModelClientLayer, ReleasingStream, request_key
+
+
+class _Flight:
+    """One upstream call and the callers waiting on it."""
+
+    def __init__(self, key):
+        self.key = key
+        self.task = None
+        self.waiters = 0
+        self.chunks = []          # Streaming only: every chunk received so far.
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Condition()
+
+
+class SingleflightLayer(ModelClientLayer):
+    """Shares one upstream call between concurrent identical requests."""
+
+    def __init__(self, inner=None):
+        super().__init__(inner)
+        self._flights = {}
+        self.stats = {"calls": 0, "upstream": 0, "saved": 0, "cancelled_upstream": 0}
+
+    @property
+    def in_flight(self):
+        return len(self._flights)
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        self.stats["calls"] += 1
+        key = request_key(model, messages, tools, **kwargs)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._start(key, model, messages, tools, kwargs)
+            leader = True
+        else:
+            self.stats["saved"] += 1
+            leader = False
+
+        if kwargs.get("stream"):
+            # Counted now, not on first iteration, so an early leaver cannot
+            # cancel a stream that the other callers have yet to read. The
+            # wrapper gives the count back even if this stream is never read.
+            flight.waiters += 1
+            return ReleasingStream(self._subscribe(flight), lambda: self._release(flight))
+        response = await self._wait(flight)
+        # Followers get their own copy so no caller sees another's mutations.
+        return response if leader else copy.deepcopy(response)
+
+    def _start(self, key, model, messages, tools, kwargs):
+        flight = _Flight(key)
+        self._flights[key] = flight
+        self.stats["upstream"] += 1
+        call = self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+        if kwargs.get("stream"):
+            flight.task = asyncio.ensure_future(self._pump(flight, call))
+        else:
+            flight.task = asyncio.ensure_future(call)
+        # New requests start a fresh flight once this one has finished.
+        flight.task.add_done_callback(lambda _: self._forget(flight))
+        return flight
+
+    def _forget(self, flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    def _release(self, flight):
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            # Nobody is left to use the answer; free the generation slot.
+            self._forget(flight)
+            flight.task.cancel()
+            self.stats["cancelled_upstream"] += 1
+
+    async def _wait(self, flight):
+        flight.waiters += 1
+        try:
+            # shield(): cancelling one caller must not cancel the shared call.
+            return await asyncio.shield(flight.task)
+        finally:
+            self._release(flight)
+
+    async def _pump(self, flight, call):
+        """Reads the upstream stream into the flight's buffer and wakes subscribers."""
+        try:
+            async for chunk in await call:
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            flight.done = True
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    @staticmethod
+    async def _subscribe(flight):
+        """Replays the flight's chunks, then follows it live. The caller's ReleasingStream drops the waiter."""
+        position = 0
+        while True:
+            async with flight.changed:
+                await flight.changed.wait_for(
+                    lambda position=position, flight=flight: position < len(flight.chunks) or flight.done)
+            while position < len(flight.chunks):
+                yield flight.chunks[position]
+                position += 1
+            if flight.done and position == len(flight.chunks):
+                if flight.error is not None:
+                    raise flight.error
+                return
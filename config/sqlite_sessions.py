@@ -0,0 +1,306 @@
+"""
+FILE: config/sqlite_sessions.py
+DESCRIPTION: Durable, SQLite-backed ADK session service for the Strategy Suite.
+
+WHY THIS EXISTS: The InMemorySessionService keeps every executive session in
+one process's heap, so history dies with the process. This service stores
+sessions in a single SQLite file in WAL mode:
+  * Events are append-only rows, so a turn costs one INSERT regardless of
+    how long the history already is.
+  * Lookups go through the (app_name, user_id, session_id) primary key.
+  * Writes are committed in batches (every `batch_size` events or
+    `flush_interval` seconds) instead of one fsync per event. A timer on
+    the event loop commits a partial batch once it is `flush_interval` old,
+    so the last turns of a quiet session still reach disk.
+"""
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.state import State
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session
+    ON events (app_name, user_id, session_id, seq);
+
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+def _split_state(state):
+    """Splits a state dict into app-, user- and session-scoped deltas (temp keys are dropped)."""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+class SQLiteSessionService(BaseSessionService):
+    """A drop-in replacement for InMemorySessionService that persists to SQLite."""
+
+    def __init__(self, db_path="strategy_sessions.db", batch_size=64, flush_interval=0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._timer = None  # (loop, TimerHandle) of the scheduled commit, if any.
+
+        # isolation_level=None lets us open/close the write transaction ourselves.
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- Write batching ---
+    def _begin_write(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if (self._pending >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.flush_interval):
+            self._commit()
+        else:
+            self._schedule_commit()
+
+    def _schedule_commit(self):
+        """Commits the open batch after `flush_interval`, even if no further write arrives."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop to time it; the next write, flush() or close() commits.
+        if self._timer is not None and self._timer[0] is loop:
+            return
+        delay = max(0.0, self.flush_interval - (time.monotonic() - self._last_commit))
+        self._timer = (loop, loop.call_later(delay, self._commit))
+
+    def _commit(self):
+        if self._timer is not None:
+            self._timer[1].cancel()
+            self._timer = None
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    async def flush(self):
+        """Commits any buffered writes."""
+        self._commit()
+
+    def close(self):
+        self._commit()
+        self._conn.close()
+
+    # --- Scoped state helpers ---
+    def _load_scoped_state(self, app_name, user_id):
+        merged = {}
+        row = self._conn.execute(
+            "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+        ).fetchone()
+        if row:
+            for key, value in json.loads(row[0]).items():
+                merged[State.APP_PREFIX + key] = value
+        row = self._conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        if row:
+            for key, value in json.loads(row[0]).items():
+                merged[State.USER_PREFIX + key] = value
+        return merged
+
+    def _merge_scoped_state(self, app_name, user_id, app_delta, user_delta):
+        if app_delta:
+            row = self._conn.execute(
+                "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+            ).fetchone()
+            state = json.loads(row[0]) if row else {}
+            state.update(app_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state)),
+            )
+        if user_delta:
+            row = self._conn.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchone()
+            state = json.loads(row[0]) if row else {}
+            state.update(user_delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+
+    # --- BaseSessionService API ---
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        exists = self._conn.execute(
+            "SELECT 1 FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if exists:
+            raise ValueError(f"Session with id {session_id} already exists.")
+
+        app_delta, user_delta, session_state = _split_state(state)
+        now = time.time()
+        self._begin_write()
+        self._merge_scoped_state(app_name, user_id, app_delta, user_delta)
+        self._conn.execute(
+            "INSERT INTO sessions (app_name, user_id, session_id, state, last_update_time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (app_name, user_id, session_id, json.dumps(session_state), now),
+        )
+        self._maybe_commit()
+
+        session = Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=session_state, last_update_time=now,
+        )
+        session.state.update(self._load_scoped_state(app_name, user_id))
+        return session
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        row = self._conn.execute(
+            "SELECT state, last_update_time FROM sessions "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        # Only the requested window of history is read and decoded.
+        where = "app_name = ? AND user_id = ? AND session_id = ?"
+        params = [app_name, user_id, session_id]
+        if config and config.after_timestamp is not None:
+            where += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        if config and config.num_recent_events is not None:
+            query = (f"SELECT payload FROM (SELECT seq, payload FROM events WHERE {where} "
+                     "ORDER BY seq DESC LIMIT ?) ORDER BY seq")
+            params.append(config.num_recent_events)
+        else:
+            query = f"SELECT payload FROM events WHERE {where} ORDER BY seq"
+        events = [Event.model_validate_json(payload) for (payload,) in self._conn.execute(query, params)]
+
+        state = json.loads(row[0])
+        state.update(self._load_scoped_state(app_name, user_id))
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=state, events=events, last_update_time=row[1],
+        )
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        if user_id is None:
+            rows = self._conn.execute(
+                "SELECT user_id, session_id, state, last_update_time FROM sessions "
+                "WHERE app_name = ? ORDER BY last_update_time",
+                (app_name,),
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                "SELECT user_id, session_id, state, last_update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? ORDER BY last_update_time",
+                (app_name, user_id),
+            ).fetchall()
+
+        sessions = []
+        for uid, sid, state, last_update_time in rows:
+            merged = json.loads(state)
+            merged.update(self._load_scoped_state(app_name, uid))
+            sessions.append(Session(
+                app_name=app_name, user_id=uid, id=sid,
+                state=merged, last_update_time=last_update_time,
+            ))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        self._begin_write()
+        self._conn.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        )
+        self._conn.execute(
+            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        )
+        self._commit()
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+
+        # The base class applies the delta to the caller's in-memory session.
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        app_delta, user_delta, session_delta = {}, {}, {}
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+
+        self._begin_write()
+        self._conn.execute(
+            "INSERT INTO events (app_name, user_id, session_id, timestamp, payload) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session.app_name, session.user_id, session.id, event.timestamp,
+             event.model_dump_json(exclude_none=True)),
+        )
+        if session_delta:
+            # Only a state change rewrites the session row; plain turns touch the timestamp.
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (session.app_name, session.user_id, session.id),
+            ).fetchone()
+            stored = json.loads(row[0]) if row else {}
+            stored.update(session_delta)
+            self._conn.execute(
+                "UPDATE sessions SET state = ?, last_update_time = ? "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (json.dumps(stored), event.timestamp, session.app_name, session.user_id, session.id),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE sessions SET last_update_time = ? "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (event.timestamp, session.app_name, session.user_id, session.id),
+            )
+        self._merge_scoped_state(session.app_name, session.user_id, app_delta, user_delta)
+        self._maybe_commit()
+        return event
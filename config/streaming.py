@@ -0,0 +1,196 @@
+"""
+FILE: config/streaming.py
+DESCRIPTION: Token-streaming output for lessons, with time-to-first-token metrics.
+
+WHY THIS EXISTS: Every lesson loop waits for `event.is_final_response()` and
+then prints the whole answer at once. For long outputs (the 5-year roadmap,
+the executive memo), the reader stares at a blank screen for the entire
+decode. StreamRenderer runs the turn in ADK's SSE streaming mode, which
+LiteLLM maps to Ollama's streaming API, and prints each partial event's text
+as it arrives.
+
+For every model call in the turn it records a StreamMetrics:
+
+  * TTFT: time from the start of the call to its first visible text. This
+    is the latency the reader actually perceives.
+  * Inter-token latency: the gaps between successive chunks (Ollama sends
+    roughly one token per chunk), summarised as p50/p99.
+  * Tokens/s: decode rate after the first token. It uses the model's
+    reported completion token count when present, the chunk count otherwise.
+
+With streaming off (STREAM_OUTPUT=0), the renderer prints the final text
+the usual way. TTFT then equals the full response time, which makes the two
+modes easy to compare.
+
+Given a SectionParser (config/section_parser.py), the renderer collects the
+templated sections as they complete. Once the last required section is done
+it stops reading, which closes the stream and cancels the rest of the
+generation.
+
+Given an OutputScanner (config/output_scanner.py), every chunk goes through
+the scanner first: the renderer prints only what the scanner releases, with
+personal data redacted, and stops reading the same way when the scanner
+aborts.
+"""
+import sys
+import time
+
+from config.settings import STREAM_OUTPUT
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class StreamMetrics:
+    """Timing of one model call as seen by the reader."""
+
+    def __init__(self, start):
+        self.start = start
+        self.first_token = None
+        self.last_token = None
+        self.chunks = 0
+        self.tokens = None  # Completion tokens reported by the model, if any.
+        self.gaps = []
+
+    def observe(self, now):
+        if self.first_token is None:
+            self.first_token = now
+        else:
+            self.gaps.append(now - self.last_token)
+        self.last_token = now
+        self.chunks += 1
+
+    @property
+    def ttft(self):
+        return self.first_token - self.start if self.first_token is not None else None
+
+    @property
+    def total(self):
+        return (self.last_token or self.start) - self.start
+
+    @property
+    def tokens_per_second(self):
+        decode = (self.last_token or 0.0) - (self.first_token or 0.0)
+        tokens = (self.tokens or self.chunks) - 1  # The first token is part of TTFT.
+        return tokens / decode if decode > 0 and tokens > 0 else 0.0
+
+    def as_dict(self):
+        return {"ttft": self.ttft, "total": self.total, "tokens": self.tokens or self.chunks,
+                "tokens_per_second": self.tokens_per_second, "inter_token_p50": _percentile(self.gaps, 0.5),
+                "inter_token_p99": _percentile(self.gaps, 0.99)}
+
+    def summary(self):
+        if self.ttft is None:
+            return "[stream] no text received"
+        if not self.gaps:
+            return (f"[stream] TTFT {self.ttft:.2f}s (whole response at once) | "
+                    f"{self.tokens or self.chunks} tokens in {self.total:.2f}s")
+        return (f"[stream] TTFT {self.ttft:.2f}s | {self.tokens_per_second:.1f} tokens/s | inter-token p50 "
+                f"{_percentile(self.gaps, 0.5) * 1000:.0f}ms p99 {_percentile(self.gaps, 0.99) * 1000:.0f}ms | "
+                f"{self.tokens or self.chunks} tokens in {self.total:.2f}s")
+
+
+class StreamRenderer:
+    """Runs one turn and prints its text as it arrives; `calls` holds a StreamMetrics per model call."""
+
+    def __init__(self, stream=None, out=None):
+        self.stream = STREAM_OUTPUT if stream is None else stream
+        self.out = out or sys.stdout
+        self.calls = []
+        self.sections = []  # Completed sections, when run with a SectionParser.
+        self.stopped_early = False
+
+    def run_config(self):
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        return RunConfig(streaming_mode=StreamingMode.SSE if self.stream else StreamingMode.NONE)
+
+    async def run(self, runner, user_id, session_id, new_message, parser=None, scanner=None):
+        """Returns the final response text, having printed it (incrementally when streaming).
+
+        With a `parser`, returns the text up to the end of the last required section. With a
+        `scanner`, prints and returns the text as the scanner releases it.
+        """
+        final_text = ""
+        call = StreamMetrics(time.perf_counter())
+        streamed = False  # Whether the current call's text has already been printed chunk by chunk.
+        scanned = ""  # The current call's text as released by the scanner.
+        parsed_stream, parsed_chars = False, 0
+        events = runner.run_async(user_id=user_id, session_id=session_id, new_message=new_message,
+                                  run_config=self.run_config())
+        try:
+            async for event in events:
+                text = "".join(part.text or "" for part in (event.content.parts if event.content else []) or [])
+                if event.partial:
+                    if text:
+                        call.observe(time.perf_counter())
+                        streamed = True
+                        if scanner is not None:
+                            text = scanner.feed(text)
+                            scanned += text
+                            if scanner.aborted:
+                                self.out.write(text)
+                                return self._abort(call, scanner, scanned)
+                        if parser is not None:
+                            parsed_stream = True
+                            self.sections += parser.feed(text)
+                            if parser.done:
+                                # Every required section is in: print up to its end and stop reading,
+                                # which cancels the generation.
+                                self.out.write(text[:max(0, len(parser.consumed) - parsed_chars)].rstrip() + "\n")
+                                self.stopped_early = True
+                                self.calls.append(call)
+                                return parser.text()
+                            parsed_chars += len(text)
+                        self.out.write(text)
+                        self.out.flush()
+                    continue
+                # A complete event closes the current model call (text, tool call or final answer).
+                if scanner is not None and (text or streamed):
+                    if streamed:
+                        released = scanner.close()
+                    else:
+                        call.observe(time.perf_counter())
+                        released = scanner.feed(text)
+                        released += "" if scanner.aborted else scanner.close()
+                    scanned += released
+                    self.out.write(released)
+                    if scanner.aborted:
+                        return self._abort(call, scanner, scanned)
+                    text, streamed = scanned, True  # Printed: report the released text, not the model's.
+                if text and not streamed:
+                    call.observe(time.perf_counter())
+                    self.out.write(text)
+                if text:
+                    self.out.write("\n")
+                    self.out.flush()
+                if event.usage_metadata and event.usage_metadata.candidates_token_count:
+                    call.tokens = event.usage_metadata.candidates_token_count
+                if event.content and event.author != "user":
+                    self.calls.append(call)
+                    call, streamed, scanned = StreamMetrics(time.perf_counter()), False, ""
+                if event.is_final_response() and text:
+                    final_text = text
+        finally:
+            await events.aclose()
+        if parser is not None:
+            # Not streamed, or the model stopped by itself: parse the complete answer.
+            if not parsed_stream:
+                self.sections += parser.feed(final_text)
+            self.sections += parser.close()
+            return parser.text() if parser.done else final_text
+        return final_text
+
+    def _abort(self, call, scanner, text):
+        """Stops the turn where the scanner aborted; reading no further cancels the generation."""
+        self.out.write("\n" + scanner.notice + "\n")
+        self.out.flush()
+        scanner.close()
+        self.stopped_early = True
+        self.calls.append(call)
+        return text
+
+    def report(self):
+        """One summary line per model call that produced text."""
+        return "\n".join(call.summary() for call in self.calls if call.ttft is not None)
@@ -0,0 +1,240 @@
+"""
+FILE: config/tool_memo.py
+DESCRIPTION: Memoization for pure agent tools: canonical argument keys, a bounded LRU, TTLs and hit metrics.
+
+WHY THIS EXISTS: Tools such as calculate_ai_roi (Lesson 06), calculate_roi
+and fetch_history (Lesson 21) or fetch_historical_lessons (Lesson 17) are
+pure: the same arguments always give the same answer. The model still calls
+them again and again, on every turn that revisits a number, in every new
+session and for every item of a batch. Plain functools.lru_cache does not
+help much, because the model rarely spells an argument the same way twice:
+3000000, 3e6, "3000000" and "$3M" are one investment.
+
+Mark a tool with @pure (or @pure(ttl=...) for data that goes stale, such as
+market research) and every call is keyed on:
+
+  * the tool name and a fingerprint of its code, so an edited tool never
+    serves results computed by the old version;
+  * its arguments bound to the signature, defaults applied, with numeric
+    parameters (annotated float / int, or not annotated at all) parsed by
+    config.finance.parse_amount and rounded to 12 significant digits. The
+    tool receives those canonical values too, so "$3M" and 3e6 really are
+    the same call.
+
+Results live in a bounded LRU shared by every agent in the process and,
+with a path, in a small SQLite file that survives restarts. Per-tool counters
+record calls, hits, expiries and the tool time saved. The wrapper keeps the
+signature and docstring (functools.wraps), so the ADK builds the same tool
+declaration as for the undecorated function.
+"""
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+
+REGISTRY = {}  # Tool name -> the @pure wrapper.
+
+
+def _stable_repr(const):
+    """repr() of a code constant, with set members sorted: a frozenset's order changes with PYTHONHASHSEED."""
+    if inspect.iscode(const):
+        return _fingerprint(const)
+    if isinstance(const, frozenset):
+        return "frozenset({" + ", ".join(sorted(_stable_repr(c) for c in const)) + "})"
+    if isinstance(const, tuple):
+        return "(" + ", ".join(_stable_repr(c) for c in const) + ("," if len(const) == 1 else "") + ")"
+    return repr(const)
+
+
+def _fingerprint(code):
+    """A digest of a function's bytecode and constants, stable across processes."""
+    digest = hashlib.sha256(code.co_code)
+    for const in code.co_consts:
+        digest.update(_stable_repr(const).encode())
+    return digest.hexdigest()[:16]
+
+
+def canonical(value, annotation=inspect.Parameter.empty):
+    """3e6, "3000000" and "$3M" give 3000000.0 for a numeric parameter; anything else is kept as is."""
+    if isinstance(value, bool) or annotation not in (float, int, inspect.Parameter.empty):
+        return value
+    if not isinstance(value, (int, float, str)):
+        return value
+    from config.finance import parse_amount  # numpy; only loaded once a memoized tool is called.
+    try:
+        number = parse_amount(value)
+    except ValueError:
+        return value
+    number = float(f"{number:.12g}")  # "$2.55M" parses to 2549999.9999999995.
+    return int(number) if annotation is int and number.is_integer() else number
+
+
+class ToolMemo:
+    """An LRU of tool results (optionally mirrored to SQLite) with per-tool TTLs and hit metrics."""
+
+    def __init__(self, max_entries=4096, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.stats = collections.defaultdict(lambda: {"calls": 0, "hits": 0, "expired": 0, "saved": 0.0})
+        self._entries = collections.OrderedDict()  # key -> (value, created, seconds)
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results ("
+                " key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL,"
+                " created REAL NOT NULL, seconds REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_results_age ON tool_results (created)")
+            self._conn.commit()
+
+    def get(self, tool, key, ttl=None):
+        """(True, value) for a live entry, else (False, None); counts the call either way."""
+        stats = self.stats[tool]
+        stats["calls"] += 1
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._conn is not None:
+                entry = self._load(key)
+            if entry is not None and ttl is not None and time.time() - entry[1] > ttl:
+                stats["expired"] += 1
+                self._drop(key)
+                entry = None
+            if entry is None:
+                return False, None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        stats["hits"] += 1
+        stats["saved"] += entry[2]
+        return True, entry[0]
+
+    def put(self, tool, key, value, seconds):
+        entry = (value, time.time(), seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self._conn is None:
+                return
+            try:
+                text = json.dumps(value)
+            except (TypeError, ValueError):
+                return  # Kept in memory only.
+            self._conn.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?, ?)",
+                               (key, tool, text, entry[1], seconds))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM tool_results").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM tool_results WHERE key IN"
+                    " (SELECT key FROM tool_results ORDER BY created LIMIT ?)", (count - self.max_entries,))
+            self._conn.commit()
+
+    def _load(self, key):
+        row = self._conn.execute("SELECT value, created, seconds FROM tool_results WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1], row[2]) if row else None
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM tool_results WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self, tool=None):
+        """Forgets every result, or only those of one tool."""
+        with self._lock:
+            if tool is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if json.loads(k)[0] == tool]:
+                    del self._entries[key]
+            if self._conn is not None:
+                if tool is None:
+                    self._conn.execute("DELETE FROM tool_results")
+                else:
+                    self._conn.execute("DELETE FROM tool_results WHERE tool = ?", (tool,))
+                self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def report(self):
+        if not self.stats:
+            return "[tool memo] no pure tool calls"
+        parts = [f"{tool} {s['hits']}/{s['calls']} hits" + (f" ({s['expired']} expired)" if s["expired"] else "")
+                 for tool, s in self.stats.items()]
+        saved = sum(s["saved"] for s in self.stats.values())
+        return f"[tool memo] {' | '.join(parts)} | {saved * 1000:.1f}ms of tool time saved"
+
+
+def _memo():
+    from config.settings import get_tool_memo
+
+    return get_tool_memo()
+
+
+def pure(fn=None, *, ttl=None):
+    """Marks a tool as pure: same canonical arguments, same result. ttl (seconds) bounds a result's age."""
+    if fn is None:
+        return functools.partial(pure, ttl=ttl)
+
+    name = fn.__name__
+    signature = inspect.signature(fn, eval_str=True)
+    version = _fingerprint(fn.__code__)
+
+    def prepare(args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        for param, value in bound.arguments.items():
+            bound.arguments[param] = canonical(value, signature.parameters[param].annotation)
+        key = json.dumps([name, version, bound.arguments], sort_keys=True, default=repr)
+        return bound, key
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            memo = _memo()
+            if memo is None:
+                return await fn(*args, **kwargs)
+            bound, key = prepare(args, kwargs)
+            found, value = memo.get(name, key, ttl)
+            if found:
+                return value
+            t0 = time.perf_counter()
+            value = await fn(*bound.args, **bound.kwargs)
+            memo.put(name, key, value, time.perf_counter() - t0)
+            return value
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            memo = _memo()
+            if memo is None:
+                return fn(*args, **kwargs)
+            bound, key = prepare(args, kwargs)
+            found, value = memo.get(name, key, ttl)
+            if found:
+                return value
+            t0 = time.perf_counter()
+            value = fn(*bound.args, **bound.kwargs)
+            memo.put(name, key, value, time.perf_counter() - t0)
+            return value
+
+    wrapper.memo_ttl = ttl
+    REGISTRY[name] = wrapper
+    return wrapper
+
+
+def is_pure(tool):
+    return getattr(tool, "__name__", None) in REGISTRY and REGISTRY[tool.__name__] is tool
@@ -0,0 +1,131 @@
+"""
+FILE: config/warmup.py
+DESCRIPTION: Model warm-up and keep_alive manager for the Ollama backend.
+
+WHY THIS EXISTS: Ollama loads a model into memory on the first request that
+names it, which costs several seconds for llama3.2 (more for vision models).
+Without a warm-up, that cost lands on the first executive query of every
+script. The ModelWarmer sends Ollama's load-only request (a /api/generate
+call without a prompt) for every registered model, asks Ollama to keep them
+resident for `keep_alive`, optionally re-warms them on an interval, and
+records how long each load took. A model registered once the warmer is
+running (a lesson asking for a second model) is warmed straight away rather
+than on the next pass, which never comes without an interval.
+"""
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger("strategy_suite.warmup")
+
+
+def ollama_model_name(model):
+    """Strips the LiteLLM provider prefix: 'ollama_chat/llama3.2' -> 'llama3.2'."""
+    for prefix in ("ollama_chat/", "ollama/"):
+        if model.startswith(prefix):
+            return model[len(prefix):]
+    return model
+
+
+class ModelWarmer:
+    """Pre-loads Ollama models and keeps them resident."""
+
+    def __init__(self, api_base, models=(), keep_alive="30m", interval=None, timeout=300.0):
+        self.api_base = api_base.rstrip("/")
+        self.keep_alive = keep_alive
+        self.interval = interval
+        self.timeout = timeout
+        # model -> {"load_seconds", "server_load_seconds", "warmed_at", "warm_count", "last_error"}
+        self.metrics = {}
+        self._task = None
+        self._first_pass = asyncio.Event()
+        self._late = set()  # Warm-ups of models registered after start().
+        self.models = []
+        for model in models:
+            self.register(model)
+
+    def register(self, model):
+        """Adds a model (with or without its LiteLLM prefix) to the warm set; warms it now if already running."""
+        name = ollama_model_name(model)
+        if name in self.models:
+            return
+        self.models.append(name)
+        if self._task is not None:
+            task = asyncio.get_running_loop().create_task(self.warm(name))
+            self._late.add(task)
+            task.add_done_callback(self._late.discard)
+
+    async def warm(self, model, client=None):
+        """Loads one model and returns the wall-clock load time in seconds."""
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                return await self.warm(model, client)
+
+        name = ollama_model_name(model)
+        stats = self.metrics.setdefault(name, {"warm_count": 0})
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{self.api_base}/api/generate", json={"model": name, "keep_alive": self.keep_alive}
+            )
+            response.raise_for_status()
+        except Exception as e:
+            stats["last_error"] = str(e)
+            logger.warning("Warm-up of %s failed: %s", name, e)
+            return None
+
+        elapsed = time.perf_counter() - start
+        # Ollama reports its own model-load time in nanoseconds (0 when already resident).
+        server_load = response.json().get("load_duration", 0) / 1e9
+        stats.update(load_seconds=elapsed, server_load_seconds=server_load,
+                     warmed_at=time.time(), last_error=None)
+        stats["warm_count"] += 1
+        logger.info("Warmed %s in %.2fs (server load %.2fs)", name, elapsed, server_load)
+        return elapsed
+
+    async def warm_all(self):
+        """Loads every registered model concurrently; returns {model: seconds or None}."""
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            results = await asyncio.gather(*(self.warm(m, client) for m in self.models))
+        return dict(zip(self.models, results))
+
+    async def _run(self):
+        while True:
+            await self.warm_all()
+            self._first_pass.set()
+            if not self.interval:
+                return
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Starts warming in the background (and re-warming every `interval` seconds, if set).
+
+        Calling it again is a no-op until `stop()`.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def wait(self):
+        """Waits for the initial warm-up pass started by `start()`, and for models registered since."""
+        if self._task is not None:
+            await self._first_pass.wait()
+            if self._late:
+                await asyncio.gather(*self._late)
+
+    async def stop(self):
+        late = list(self._late)
+        for task in late:
+            task.cancel()
+        await asyncio.gather(*late, return_exceptions=True)
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._late.clear()
+        self._task = None
+        self._first_pass = asyncio.Event()
@@ -0,0 +1,151 @@
+"""
+SUITE LAUNCHER: Run many lessons on one warm runtime.
+DESCRIPTION: Imports Lessons/NN_*.py as plugins and runs their main()
+coroutines inside a single event loop, sharing the session service, the
+pooled model clients and the warmed model.
+
+WHY THIS IS IMPORTANT: Running each lesson as its own process re-imports ADK,
+rebuilds the model client and re-warms the model 21 times. Here that setup is
+paid once, so nightly suite time is dominated by model time.
+
+USAGE:
+    python run_suite.py                      # every non-interactive lesson, in order
+    python run_suite.py 01 03 06             # selected lessons
+    python run_suite.py --concurrent --max-parallel 4
+    python run_suite.py --list
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import glob
+import importlib.util
+import io
+import os
+import sys
+import time
+
+from config import settings
+
+LESSONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Lessons")
+
+# Lessons that block on input() and would stall the shared event loop.
+INTERACTIVE_LESSONS = {"12"}
+
+
+class _TaskLocalStdout(io.TextIOBase):
+    """Routes print() from each concurrently running lesson into its own buffer."""
+
+    def __init__(self, console):
+        self.console = console
+        self.buffer_var = contextvars.ContextVar("lesson_stdout", default=None)
+
+    def write(self, text):
+        buffer = self.buffer_var.get()
+        return (buffer if buffer is not None else self.console).write(text)
+
+    def flush(self):
+        self.console.flush()
+
+
+def discover_lessons():
+    """Returns {"01": path, ...} for every lesson script."""
+    lessons = {}
+    for path in sorted(glob.glob(os.path.join(LESSONS_DIR, "[0-9][0-9]_*.py"))):
+        lessons[os.path.basename(path)[:2]] = path
+    return lessons
+
+
+def load_lesson(number, path):
+    """Imports a lesson module without running it (its main() is guarded by __name__)."""
+    spec = importlib.util.spec_from_file_location(f"lesson_{number}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_lesson(number, module, stdout=None, limiter=None):
+    """Runs one lesson's main() and returns (number, seconds, error, captured output)."""
+    captured = None
+    if stdout is not None:
+        captured = io.StringIO()
+        stdout.buffer_var.set(captured)
+
+    async with limiter or contextlib.nullcontext():
+        start = time.perf_counter()
+        error = None
+        try:
+            await module.main()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+    return number, elapsed, error, captured.getvalue() if captured else None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run many lessons on one warm runtime.")
+    parser.add_argument("lessons", nargs="*", help="Lesson numbers (default: all non-interactive).")
+    parser.add_argument("--concurrent", action="store_true", help="Run lessons concurrently in one event loop.")
+    parser.add_argument("--max-parallel", type=int, default=0, help="Cap on concurrently running lessons.")
+    parser.add_argument("--list", action="store_true", help="List available lessons and exit.")
+    args = parser.parse_args()
+
+    available = discover_lessons()
+    if args.list:
+        for number, path in available.items():
+            flag = " (interactive)" if number in INTERACTIVE_LESSONS else ""
+            print(f"{number}  {os.path.basename(path)}{flag}")
+        return
+
+    selected = args.lessons or [n for n in available if n not in INTERACTIVE_LESSONS]
+    unknown = [n for n in selected if n not in available]
+    if unknown:
+        parser.error(f"Unknown lesson(s): {', '.join(unknown)}")
+
+    # 1. Shared setup: imports, model warm-up and session service, paid once.
+    setup_start = time.perf_counter()
+    modules = {n: load_lesson(n, available[n]) for n in selected}
+    results = []
+    async with settings.shared_runtime():
+        settings.get_model()
+        await settings.wait_for_warmup()
+        setup_time = time.perf_counter() - setup_start
+        print(f"--- SUITE RUNTIME READY in {setup_time:.2f}s ({len(modules)} lessons) ---\n")
+
+        # 2. Run the lessons.
+        suite_start = time.perf_counter()
+        if args.concurrent:
+            stdout = _TaskLocalStdout(sys.stdout)
+            limiter = asyncio.Semaphore(args.max_parallel) if args.max_parallel else None
+            sys.stdout = stdout
+            try:
+                tasks = [asyncio.create_task(run_lesson(n, m, stdout, limiter)) for n, m in modules.items()]
+                for finished in asyncio.as_completed(tasks):
+                    number, elapsed, error, output = await finished
+                    stdout.console.write(f"===== LESSON {number} ({elapsed:.2f}s) =====\n{output}\n")
+                    results.append((number, elapsed, error))
+            finally:
+                sys.stdout = stdout.console
+        else:
+            for number, module in modules.items():
+                print(f"===== LESSON {number} =====")
+                number, elapsed, error, _ = await run_lesson(number, module)
+                results.append((number, elapsed, error))
+                print()
+        suite_time = time.perf_counter() - suite_start
+
+    # 3. Report per-lesson wall time.
+    print("--- SUITE REPORT ---")
+    for number, elapsed, error in sorted(results):
+        status = "OK" if error is None else f"FAILED ({error})"
+        print(f"  {number}  {os.path.basename(available[number]):<40} {elapsed:8.2f}s  {status}")
+    print(f"  Setup {setup_time:.2f}s | Lessons {suite_time:.2f}s | Total {setup_time + suite_time:.2f}s")
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass